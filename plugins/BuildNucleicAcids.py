@@ -10,7 +10,9 @@ DART version:		1.2  (25-11-2008)
 DART plugin: 		BuildNucleicAcids.py
 Input:				A 3DNA PAR data file or a sequence and any of the allowed options,
 					any order and combination.
-Output:				A PDB or alchemy file of the generated structure.
+Output:				A PDB or alchemy file of the generated structure. Structures rebuilt
+					from a list of PAR files can be collected in one DART ensemble
+					container (.dens) instead.
 Plugin excecution:	Either command line driven (use -h/--help for the option) or as 
 					part of a DART batch sequence.	
 Plugin function:	Build a nucleic acid structure of a user defined type and sequence 
@@ -19,7 +21,9 @@ Plugin function:	Build a nucleic acid structure of a user defined type and seque
 					(uses the "rebuild" module of 3DNA).
 Examples:			BuildNucleicAcids -f test.par -at ADNA
 					BuildNucleicAcids -s AAGTCGGTC -dn test.alc
-Dependencies:		Standard python2.3 or higher modules, 3DNA
+					BuildNucleicAcids -f *.par -g -n models
+Dependencies:		Standard python2.3 or higher modules, 3DNA, NumPy. DART package
+					(PDBeditor plugin and Ensemble module)
 
 ==========================================================================================
 """
@@ -33,6 +37,9 @@ base, dirs = os.path.split(os.path.dirname(os.path.join(os.getcwd(), __file__)))
 if base in sys.path: pass
 else: sys.path.append(base)
 
+from PDBeditor import PDBeditor
+from system.Ensemble import EnsembleContainer, ENSEMBLEEXT
+
 def PluginXML():
 	
 	PluginXML = """ 
@@ -54,6 +61,7 @@ def PluginXML():
  <option type="block1" form="checkbox" text="One block per base-pair/base in ALCHEMY format">False</option>
  <option type="block2" form="checkbox" text="Two blocks per base-pair in ALCHEMY format">False</option>
  <option type="negx" form="checkbox" text="reverse the direction of x- and z-axes (for Z-DNA)">False</option>
+ <option type="ensemble" form="checkbox" text="Collect rebuilt PDB structures in one DART ensemble container">False</option>
 </parameters>"""
 	
 	return PluginXML
@@ -92,7 +100,13 @@ def PluginCore(paramdict, inputlist):
 	elif inputlist:
 
 		#Building nucleic acid structure from .par file, This is basically a wrapper around the "rebuild" command
-		#of 3DNA.
+		#of 3DNA. Rebuilt PDB structures can be collected as models of one ensemble container.
+		
+		container = None
+		if paramdict.get('ensemble'):
+			containerfile = os.path.splitext(paramdict['name'] or 'ensemble')[0]+ENSEMBLEEXT
+			print "    * Collecting rebuilt structures in ensemble container: %s" % containerfile
+			container = EnsembleContainer(containerfile)
 		
 		for inputfile in inputlist:
 			
@@ -129,6 +143,8 @@ def PluginCore(paramdict, inputlist):
 					get_Atomic(natype)
 				
 				RebuildNA(option, inputfile, outputfile)
+				if container is not None:
+					AddToContainer(container, inputfile, outputfile)
 			
 			option = None
 			
@@ -156,6 +172,9 @@ def PluginCore(paramdict, inputlist):
 					get_Atomic(natype)	
 				
 				RebuildNA(option, inputfile, outputfile)
+		
+		if container is not None:
+			container.Close()
 				
 	else:
 		print "    * ERROR: You have neither given a sequence to build or a .par file to rebuild. Stopping"
@@ -206,6 +225,7 @@ class CommandlineOptionParser:
 		parser.add_option( "-c", "--block1", action="store_true", dest="block1", default=False, help="one block per base-pair/base in ALCHEMY format (default)")
 		parser.add_option( "-d", "--block2", action="store_true", dest="block2", default=False, help="two blocks per base-pair in ALCHEMY format")
 		parser.add_option( "-e", "--negx", action="store_true", dest="negx", default=False, help="reverse the direction of x- and z-axes (for Z-DNA)")
+		parser.add_option( "-g", "--ensemble", action="store_true", dest="ensemble", default=False, help="collect rebuilt PDB structures in one DART ensemble container (name.dens)")
 		
 		(options, args) = parser.parse_args()
 		
@@ -220,6 +240,7 @@ class CommandlineOptionParser:
 		self.option_dict['block1'] = options.block1
 		self.option_dict['block2'] = options.block2
 		self.option_dict['negx'] = options.negx
+		self.option_dict['ensemble'] = options.ensemble
 			
 		if not self.option_dict['input'] == None:
 			parser.remove_option('-f')
@@ -312,6 +333,23 @@ def RebuildNA(option, inputfile, outputfile):
 	cmd = "rebuild " + str(option)+" " + (inputfile)+" " + (outputfile) 
 	output = commands.getoutput(cmd)
 	
+def AddToContainer(container, inputfile, outputfile):
+
+	"""Add a rebuilt structure as next model to the ensemble container, the PDB file is removed"""
+
+	if not os.path.isfile(outputfile):
+		print "    * ERROR: no structure rebuilt from", os.path.basename(inputfile)
+		return
+
+	pdb = PDBeditor()
+	pdb.ReadPDB(outputfile)
+	try:
+		container.AddModel(pdb.atoms, records={'header':pdb.header, 'title':pdb.title, 'footer':pdb.footer}, name=os.path.basename(inputfile))
+		print "    * Added structure rebuilt from %s as model %i" % (os.path.basename(inputfile), len(container.models))
+	except ValueError, error:
+		print "    * ERROR: structure rebuilt from %s not added to the ensemble container, %s" % (os.path.basename(inputfile), error)
+	os.remove(outputfile)
+
 def use_Custom(curdir):
 	
 	"""Use custom supplied atomic models for the bases "A,T,C,G,U". Must be present in /DART/third-party/X3DNA/CUSTOM/"""
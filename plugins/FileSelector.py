@@ -20,6 +20,7 @@ Dependencies:		Standard python2.3 or higher modules
 
 """Import modules"""
 import os, shutil
+from system.Archive import InputExists, ArchivePath, OpenInput
 
 def PluginXML():
 	
@@ -46,11 +47,18 @@ def PluginCore(paramdict, inputlist):
 
 		jobdir = os.getcwd()
 		for files in inputlist:
-			if os.path.isfile(files):
+			if InputExists(files):
 				print("    * Found: %s" % files)	
 				fname = os.path.basename(files)
 				destination = os.path.join(jobdir,fname)
-				shutil.copyfile(files,destination)
+				if ArchivePath(files) is None:
+					shutil.copyfile(files,destination)
+				else:
+					member = OpenInput(files)		# Archive members are copied out of the archive
+					outfile = open(destination,'wb')
+					shutil.copyfileobj(member,outfile)
+					outfile.close()
+					member.close()
 			else:
 				print("    * Not found: %s" % files)		
 
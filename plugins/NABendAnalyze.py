@@ -40,10 +40,11 @@ if base in sys.path: pass
 else: sys.path.append(base)
 
 """Import DART specific modules"""
-from QueryPDB import GetSequence, NAsummery
+from QueryPDB import GetSequence, NAsummery, Structure
 from PDBeditor import PDBeditor
 from system.NAfunctionLib import ConvertSeq, UnitvecToDegree, AccTwist, Angle
 from system.IOlib import InputOutputControl
+from system.Archive import OpenInput
 from system.Constants import *
 
 def PluginXML():
@@ -815,7 +816,7 @@ class MeasureBend:
 		
 		for infile in files:
 			print "    * Running global bend analysis on file: %s" % os.path.basename(infile)
-			readfile = file(infile,'r')
+			readfile = OpenInput(infile)
 			lines = readfile.readlines()	
 			linecount = 1
 			countstart = []
@@ -846,7 +847,7 @@ class MeasureBend:
 			print "    * Running global bend analysis on file: %s" % os.path.basename(infile)
 			self.bpstep[infile] = []
 			self.pairs[infile] = []
-			readfile = file(infile, 'r')
+			readfile = OpenInput(infile)
 			lines = readfile.readlines()
 			resnr = []
 			sequence = []
@@ -902,12 +903,12 @@ class MeasureBend:
 		
 		pdb = PDBeditor()
 		pdb.ReadPDB(master)	
-		xml = pdb.PDB2XML().xml()
+		structure = Structure(pdb)
 		
 		sequence = GetSequence()
-		sequence.GetSequence(pdbxml=xml)
+		sequence.GetSequence(structure=structure)
 		
-		naeval = NAsummery(pdbxml=xml,sequence=sequence.seqlib)
+		naeval = NAsummery(structure=structure,sequence=sequence.seqlib,verbose=self.verbose)
 		naeval.Evaluate()	
 
 		self.basechainlib = naeval.chainlib
@@ -12,16 +12,33 @@ Plugin function:	Analyze contacts between protein and nucleic acids. Optional is
 					a multicontact analysis. It uses nucplot for the actual 
 					calculation of the contacts. Note that for nucplot to work the 
 					chain ID has to be placed in the default location.
-Dependencies:		Nucplot
+Dependencies:		Nucplot, NumPy, DART PDBeditor plugin and Selection module
 
 ==========================================================================================
 """
 
 """Import modules"""
 import os, sys, re
-from math import sqrt
+import numpy
 from time import ctime
 
+"""Setting pythonpath variables if run from the command line"""
+base, dirs = os.path.split(os.path.dirname(os.path.join(os.getcwd(), __file__)))
+
+if base in sys.path:
+	pass
+else:
+	sys.path.append(base)
+
+from PDBeditor import IterStructures, ModelFiles
+from system.Constants import NAres1, NAres3, AAres3
+from system.Selection import Select
+
+"""Residue names of nucleic-acid and protein chains, atoms compared in blocks of CHUNK"""
+NUCLEIC = set([resid.strip() for resid in NAres1+NAres3]) - set(['-','---'])
+PEPTIDE = set([resid.strip() for resid in AAres3]) - set(['---'])
+CHUNK = 1024
+
 def PluginXML():
 	PluginXML = """ 
 <metadata>
@@ -59,7 +76,7 @@ def PluginCore(paramdict, metadict, inputlist):
 		propper place otherwise nucplot will fail.
 		"""
 		
-		for files in inputlist: 							
+		for ensemble, model, files in ModelFiles(inputlist): 							
 			NucplotAnalyze(files)									
 						
 	if paramdict['contact'] == 'True' or paramdict['contact'] == True:
@@ -73,25 +90,14 @@ def PluginCore(paramdict, metadict, inputlist):
 		else:
 			pass
 			
-		for files in inputlist:
-			pdb = Structure(files)
-			mol = []
+		for files, model, pdb in IterStructures(inputlist):
+			if model is not None:
+				print "--> Contacts for model %i of %s" % (model, os.path.basename(files))
+			contacts = CustomContact(pdb, float(paramdict['cutoff']))
 			
-			nrchain = 0
-			for chain in pdb.nucleotide_chains:
-				nrchain = nrchain+1
-				mol.append(molecule_assign(nrchain,chain))
-			for chain in pdb.peptide_chains:
-				nrchain = nrchain+1
-				mol.append(molecule_assign(nrchain,chain))
-				
-			contacts=CustomContact(mol[0],mol[1],mol[2],mol[3],paramdict['cutoff'])
-
- 			for i in contacts.iterkeys():
+ 			for i in sorted(contacts.iterkeys()):
   				print i[0],i[1],i[2],i[3],i[4],i[5],contacts[i][0],contacts[i][1],contacts[i][2]
 
-								
-
 #================================================================================================================================#
 # 					PLUGIN SPECIFIC DEFINITIONS BELOW THIS LINE						 #
 #================================================================================================================================#
@@ -116,49 +122,58 @@ def NucplotAnalyze(files):
 	else:										
 		pass						
 
-class Molecule:
-
-	def __init__(self,id,chain):
-   		self.id = id
-   		self.chain=chain
-
-def molecule_assign(nr,chain):
-	return Molecule(nr,chain)
-
 def FileRootRename(infile,extension,basename):
 	outfile = basename+extension
 	os.rename(infile,outfile)
 
-def calc_dist(vect1,vect2):
- 	d=0.0
- 	for i in range(3):
-  		d=d+(vect1[i]-vect2[i])**2
-
- 	d=sqrt(d)
- 	return d  
+def CustomContact(pdb, cutoff):
 
-def CustomContact(molecule1,molecule2,molecule3,molecule4,cutoff):
-    chain1=molecule1.chain
-    chain2=molecule2.chain
-    chain3=molecule3.chain
-    chain4=molecule4.chain
-    dict={}
-    for i in chain1.residues:
-        for atom1 in i:
-            for p in chain3.residues:
-                for atom2 in p:
-		  if (not (atom1.name[0]=="H") and (not atom2.name[0]=="H")):
-		     d=calc_dist(atom1.position,atom2.position)
-       	             if (d<cutoff):
-		      if not dict.has_key((molecule1.id,i.name,i.number,molecule2.id,p.name,p.number)):
-		       dict.update({(molecule1.id,i.name,i.number,molecule2.id,p.name,p.number):(d,atom1.name,atom2.name)})
-                       #print molecule1.id,i.name,i.number,atom1.name,molecule2.id,p.name,p.number,atom2.name,d
-		      else:
-		       tmp=dict[(molecule1.id,i.name,i.number,molecule2.id,p.name,p.number)]
-		       if (d<tmp[0]):
-		        newtmp=(d,atom1.name,atom2.name)
-		        dict.update({(molecule1.id,i.name,i.number,molecule2.id,p.name,p.number):newtmp})
-    return dict	
+	"""Shortest heavy atom distance between every residue pair of a nucleic-acid and a protein
+	   chain within cutoff. Molecules are numbered from 1, nucleic-acid chains first. Returns
+	   {(molecule1, resid1, resnr1, molecule2, resid2, resnr2): (distance, atom1, atom2)}"""
+	
+	atoms = pdb.atoms
+	index = pdb.index
+	resname = numpy.char.strip(atoms.resname)
+	atname = numpy.char.strip(atoms.atname)
+	heavy = Select(atoms, "not name H*")
+	
+	chains, first = numpy.unique(atoms.chain[index.start], return_index=True)
+	nucleic = []
+	peptide = []
+	for chain in chains[numpy.argsort(first)].tolist():
+		names = set(resname[index.start[index.Chain(chain)]].tolist())
+		if len(names & NUCLEIC):
+			nucleic.append(chain)
+		elif len(names & PEPTIDE):
+			peptide.append(chain)
+	
+	molecules = {}
+	for chain in nucleic+peptide:
+		molecules[chain] = len(molecules)+1
+	
+	resnames = resname.tolist()
+	atnames = atname.tolist()
+	resnums = atoms.resnum.tolist()
+	
+	contacts = {}
+	for chain1 in nucleic:
+		sel1 = index.Rows(index.Chain(chain1))
+		sel1 = sel1[heavy[sel1]]
+		for chain2 in peptide:
+			sel2 = index.Rows(index.Chain(chain2))
+			sel2 = sel2[heavy[sel2]]
+			for first in range(0, len(sel1), CHUNK):
+				block = sel1[first:first+CHUNK]
+				distance = numpy.sqrt(((atoms.coord[block][:,None,:]-atoms.coord[sel2][None,:,:])**2).sum(axis=2))
+				for i, j in zip(*numpy.nonzero(distance < cutoff)):
+					atom1 = block[i]
+					atom2 = sel2[j]
+					key = (molecules[chain1],resnames[atom1],resnums[atom1],molecules[chain2],resnames[atom2],resnums[atom2])
+					if not contacts.has_key(key) or distance[i,j] < contacts[key][0]:
+						contacts[key] = (float(distance[i,j]),atnames[atom1],atnames[atom2])
+	
+	return contacts	
 
 class CommandlineOptionParser:
 	
@@ -16,7 +16,8 @@ Plugin function:	Generates a HADDOCK dna-rna_restraint.def file from a PDB file.
 					it uses 3DNA to find the watson-Crick pairs in the structure. By
 					default the most commen settings are used. You can change them if
 					needed have a look at the options.
-Plugin dependencies:	Standard python2.3 or higher modules, 3DNA
+Plugin dependencies:	Standard python2.3 or higher modules, 3DNA, DART PDBeditor plugin
+			and Selection module
 Examples:		NABrestraint -f *.pdb	
 
 for further information, please contact:
@@ -38,6 +39,9 @@ if base in sys.path:
 else:
 	sys.path.append(base)
 
+from PDBeditor import PDBeditor
+from system.Selection import Compile
+
 def PluginXML():
 	
 	PluginXML = """ 
@@ -286,6 +290,7 @@ class NArestraints:
 		self.resnr1 = []
 		self.resnr2 = []
 		self.seglib = {}
+		self.structure = None
 	
 	def getzones(self):
 
@@ -344,8 +349,14 @@ class NArestraints:
 	
 	def readpdb(self,pdb):
 	
-		"""Run 3DNA find_pair on pdb file. Only generate .inp file and pass to 'importinp'"""
+		"""Run 3DNA find_pair on pdb file. Only generate .inp file and pass to 'importinp'.
+		   The structure is only read to check the restraint selections when base planarity
+		   is restrained"""
 	
+		if self.paramdict['bplan'] == True:
+			self.structure = PDBeditor()
+			self.structure.ReadPDB(pdb)
+		
 		os.system("find_pair -t %s output.inp" % pdb)
 	
 		if os.path.isfile('output.inp'): self.importinp('output.inp')
@@ -377,6 +388,17 @@ class NArestraints:
 	
 		self.getzones()
 		
+	def cnsselection(self, expression):
+		
+		"""CNS selection string of an atom selection (system.Selection), with a warning if
+		   it selects no atoms of the structure"""
+		
+		selection = Compile(expression)
+		if self.structure is not None and not selection.Mask(self.structure).any():
+			print "    * WARNING: restraint selection (%s) selects no atoms in the structure" % selection.CNS()
+		
+		return selection.CNS()
+	
 	def writedef(self):
 	
 		if self.paramdict['verbose']: outfile = sys.stdout
@@ -406,21 +428,16 @@ class NArestraints:
 		outfile.write ("{============================================== base planarity =============================================}\n\n")
 		outfile.write ("{* Restrain base planarity. This selection must only include nucleotide residues *}\n\n")
 		
-		zone = ""
+		zones = []
 		for segid in self.seglib:
-			resids = ""
-			for n in self.seglib[segid]:
-				if len(resids) == 0:
-					resids = "resid "+str(n[0])+":"+str(n[-1])
-				else:
-					resids = resids+" or resid "+str(n[0])+":"+str(n[-1])
-			if len(zone) == 0:
-				zone = "("+resids+") and segid "+segid
-			else:
-				zone = zone+" or ("+resids+") and segid "+segid
+			if len(self.seglib[segid]):
+				resids = ','.join(["%i:%i" % (n[0],n[-1]) for n in self.seglib[segid]])
+				zones.append("resnum %s and chain %s" % (resids,segid))
 		
-		if self.paramdict['bplan'] == True:	
-			outfile.write ("{===>} bases_planar=(%s);\n\n" % zone)	
+		if self.paramdict['bplan'] == True and len(zones):	
+			outfile.write ("{===>} bases_planar=(%s);\n\n" % self.cnsselection(' or '.join(zones)))	
+		elif self.paramdict['bplan'] == True:
+			outfile.write ("{===>} bases_planar=();\n\n")	
 		else:
 			outfile.write ("{* Base planarity not restraint *}\n\n")
 		
@@ -438,8 +455,7 @@ class NArestraints:
 			pucker = []
 			for segid in self.seglib:
 				for n in self.seglib[segid]:
-					zone = "resid "+str(n[0])+":"+str(n[-1])+" and segid "+segid
-					pucker.append(zone)
+					pucker.append(self.cnsselection("resnum %i:%i and chain %s" % (n[0],n[-1],segid)))
 	    	
 			puckercount = 1
 			for pucker_group in pucker:
@@ -478,8 +494,9 @@ class NArestraints:
 					for n in self.seglib:
 						if self.paramdict['puck_%i_start' % puck] in self.seglib[n][0] and self.paramdict['puck_%i_end' % puck] in self.seglib[n][0]: segid = n
 					
-					outfile.write("{===>} pucker_%i=(resid %i:%i and segid %s);\n\n" % 
-					             (puck,int(self.paramdict['puck_%i_start' % puck]),int(self.paramdict['puck_%i_end' % puck]), segid))
+					pucker = self.cnsselection("resnum %i:%i and chain %s" % 
+					                           (int(self.paramdict['puck_%i_start' % puck]),int(self.paramdict['puck_%i_end' % puck]), segid))
+					outfile.write("{===>} pucker_%i=(%s);\n\n" % (puck,pucker))
 
 					outfile.write("{* conformation of group %i *}\n" % puck)
 					outfile.write('{+ choice: "a-form" "b-form" "other" +}\n')
@@ -515,8 +532,7 @@ class NArestraints:
 			bacdih = []
 			for segid in self.seglib:
 				for n in self.seglib[segid]:
-					zone = "resid "+str(n[0])+":"+str(n[-1])+" and segid "+segid
-					bacdih.append(zone)
+					bacdih.append(self.cnsselection("resnum %i:%i and chain %s" % (n[0],n[-1],segid)))
 		
 			bacdihcount = 1
 			for bacdih_group in bacdih:
@@ -567,8 +583,9 @@ class NArestraints:
 					for n in self.seglib:
 						if self.paramdict['dih_%i_start' % dih] in self.seglib[n][0] and self.paramdict['dih_%i_end' % dih] in self.seglib[n][0]: segid = n
 
-					outfile.write("{===>} dihedral_%i=(resid %i:%i and segid %s);\n\n" % 
-					             (dih,int(self.paramdict['dih_%i_start' % dih]),int(self.paramdict['dih_%i_end' % dih]), segid))
+					dihedral = self.cnsselection("resnum %i:%i and chain %s" % 
+					                             (int(self.paramdict['dih_%i_start' % dih]),int(self.paramdict['dih_%i_end' % dih]), segid))
+					outfile.write("{===>} dihedral_%i=(%s);\n\n" % (dih,dihedral))
 					
 					outfile.write("{* conformation of group %i *}\n" % dih)
 					outfile.write('{+ choice: "a-form" "b-form" "other" +}\n')
@@ -634,9 +651,9 @@ class NArestraints:
 		for basepair in self.paramdict['pairs']:
 			
 			outfile.write("{* selection for pair %i base A *}\n" % paircount)
-			outfile.write("{===>} base_a_%i=(resid %i and segid %s);\n" % (paircount,basepair[2],basepair[0]))
+			outfile.write("{===>} base_a_%i=(%s);\n" % (paircount,self.cnsselection("resnum %i and chain %s" % (basepair[2],basepair[0]))))
 			outfile.write("{* selection for pair %i base B *}\n" % paircount)
-			outfile.write("{===>} base_b_%i=(resid %i and segid %s);\n\n" % (paircount,basepair[5],basepair[3]))
+			outfile.write("{===>} base_b_%i=(%s);\n\n" % (paircount,self.cnsselection("resnum %i and chain %s" % (basepair[5],basepair[3]))))
 		
 			paircount += 1
 		
@@ -12,7 +12,7 @@ Plugin excecution:	Either command line driven (use -h/--help for the option) or
 					DART batch sequence.
 Plugin function:	This plugin is a basic wrapper around the functionality of the least-square
 					fitting program 'Profit'. 
-Dependencies:		PROFIT in ../DART/third-party/profit/
+Dependencies:		PROFIT in ../DART/third-party/profit/, DART PDBeditor plugin and Selection module
 
 ====================================================================================================
 """
@@ -28,6 +28,9 @@ if base in sys.path:
 	pass
 else:
 	sys.path.append(base)
+
+from PDBeditor import ModelFiles
+from system.Selection import Compile
 	
 def PluginXML():
 	PluginXML = """ 
@@ -55,33 +58,56 @@ def PluginGui():
 		
 def PluginCore(paramdict, metadict, inputlist):
 	
-	"""Some definitions"""
+	"""Some definitions, fittings as atom selection language (system.Selection) written as
+	   ProFit atoms and zone"""
 	
-	DNABASE = "^P,O1P,O2P,O5',O4',O3',C5',C4',C3',C2',C1'"
-	DNABB = "P,O1P,O2P,O5',O4',O3',C5',C4',C3',C2',C1'"
-	PROTBB = "N,CA,C,O"
-	PROTSIDE = "^N,CA,C,O"
-	ALLHEAVY = "P,N*,C*,O*"
+	DNABB = "name P,O1P,O2P,O5',O4',O3',C5',C4',C3',C2',C1'"
+	PROTBB = "name N,CA,C,O"
+	ALLHEAVY = "name P,N*,C*,O*"
 	
 	if paramdict['default'] == 'True' or paramdict['default'] == True:
 		print "--> Performig default set of protein-DNA fittings"
-		print "    * Calculating rmsd full"
-		rmsdfull = ProFitting(input1=paramdict['reference'], input2=inputlist, atoms=ALLHEAVY, writefit=paramdict['writefit'], metadict=metadict).rmsd
-		print "    * Calculating rmsd dna full"
-		rmsddnaall = ProFitting(input1=paramdict['reference'], input2=inputlist, atoms=ALLHEAVY, zone='B*', writefit=paramdict['writefit'], metadict=metadict).rmsd
-		print "    * Calculating rmsd protein all"
-		rmsdprotall = ProFitting(input1=paramdict['reference'], input2=inputlist, atoms=ALLHEAVY, zone='A*', writefit=paramdict['writefit'], metadict=metadict).rmsd
-		print "    * Calculating rmsd dna backbone"
-		rmsddnabb = ProFitting(input1=paramdict['reference'], input2=inputlist, atoms=DNABB, zone='B*', writefit=paramdict['writefit'], metadict=metadict).rmsd
-		print "    * Calculating rmsd protein backbone"
-		rmsdprotbb = ProFitting(input1=paramdict['reference'], input2=inputlist, atoms=PROTBB, zone='A*', writefit=paramdict['writefit'], metadict=metadict).rmsd
-		print "    * Calculating rmsd dna base-pairs"
-		rmsddnabase = ProFitting(input1=paramdict['reference'], input2=inputlist, atoms=DNABASE, zone='B*', writefit=paramdict['writefit'], metadict=metadict).rmsd
-		print "    * Calculating rmsd protein side-chains"   
-		rmsdprotside = ProFitting(input1=paramdict['reference'], input2=inputlist, atoms=PROTSIDE, zone='A*', writefit=paramdict['writefit'], metadict=metadict).rmsd
+		
+		"""Fittings as (name, selection). The models of an ensemble are fitted one at a time"""
+		fittings = [('full',ALLHEAVY),('dnaall',"chain B and "+ALLHEAVY),('protall',"chain A and "+ALLHEAVY),
+		            ('dnabb',"chain B and "+DNABB),('protbb',"chain A and "+PROTBB),('dnabase',"chain B and not "+DNABB),
+		            ('protside',"chain A and not "+PROTBB)]
+		
+		structures = []
+		rmsd = {}
+		for fitting, selection in fittings:
+			rmsd[fitting] = {}
+		
+		for ensemble, model, files in ModelFiles(inputlist):
+			print "    * Calculating rmsd full, dna, protein, backbone, base-pair and side-chain for", os.path.basename(files)
+			structures.append(files)
+			for fitting, selection in fittings:
+				atoms, zone = Compile(selection).ProFit()
+				rmsd[fitting].update(ProFitting(input1=paramdict['reference'], input2=[files], atoms=atoms, zone=zone, writefit=paramdict['writefit'], metadict=metadict).rmsd)
+		
+		print "    * Write output to rmsd.stat"
+		WriteOutput(structures,rmsd['full'],rmsd['dnaall'],rmsd['protall'],rmsd['dnabb'],rmsd['protbb'],rmsd['dnabase'],rmsd['protside'])
+	
+	elif paramdict['atoms']:
+		print "--> Performing fitting on atoms %s" % paramdict['atoms']
+		
+		if paramdict['zone']:
+			zone = paramdict['zone']
+		else:
+			zone = None
+		
+		structures = []
+		rmsd = {}
+		for ensemble, model, files in ModelFiles(inputlist):
+			print "    * Calculating rmsd for", os.path.basename(files)
+			structures.append(files)
+			rmsd.update(ProFitting(input1=paramdict['reference'], input2=[files], atoms=paramdict['atoms'], zone=zone, writefit=paramdict['writefit'], metadict=metadict).rmsd)
 		
 		print "    * Write output to rmsd.stat"
-		WriteOutput(inputlist,rmsdfull,rmsddnaall,rmsdprotall,rmsddnabb,rmsdprotbb,rmsddnabase,rmsdprotside)
+		WriteFitOutput(structures,rmsd,paramdict['atoms'],zone)
+	
+	else:
+		print "    * No fitting defined, use the default set of fittings or define the atoms to fit on"
 	
 #================================================================================================================================#
 # 					PLUGIN SPECIFIC DEFINITIONS BELOW THIS LINE						 #
@@ -110,6 +136,25 @@ def WriteOutput(inputlist,rmsdfull,rmsddnaall,rmsdprotall,rmsddnabb,rmsdprotbb,r
 		
 	outfile.close()
 
+def WriteFitOutput(inputlist,rmsd,atoms,zone):
+	
+	"""Write RMSD values of a single fitting to rmsd.stat"""
+	
+	outfile = file('rmsd.stat','w')
+		
+	outfile.write('*************************************************************************************************************************\n')
+	outfile.write('Root means square fitting data for %i structures\n' % (len(inputlist)))
+	outfile.write('Time and date: %s\n' % ctime())
+	outfile.write('Fitted on atoms: %s zone: %s\n' % (atoms,zone))
+	outfile.write('When there is no rmsd value given but --- instead, something has gone wrong during the fitting\n')
+	outfile.write('*************************************************************************************************************************\n')
+	outfile.write('structure        rmsd\n')
+	
+	for files in inputlist:
+		outfile.write('%2s%8s\n' % (os.path.split(files)[-1],rmsd[files]))
+		
+	outfile.close()
+
 class ProFitting:
 	
 	"""Full features wrapper around ProFit"""
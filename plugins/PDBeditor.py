@@ -8,9 +8,10 @@ Author:				Marc van Dijk, Department of NMR spectroscopy, Bijvoet Center
 Copyright (C):		2007 (DART project)
 DART version:		1.2  (25-11-2008)
 DART plugin: 		PDBeditor.py
-Input:				PDB data file and any of the allowed options, any order and 
-					combined.
-Output:				A new PDB file or XML representation.
+Input:				PDB or mmCIF data file, also gzip or bzip2 compressed or in a zip or
+					tar archive, or DART ensemble container (.dens) and any of the
+					allowed options, any order and combined.
+Output:				A new PDB file, XML representation or DART ensemble container.
 Plugin excecution:	Either command line driven (use -h/--help for the option) or as 
 					part of a DART batch sequence.
 Plugin function:	A suite of functions to modify PDB files. Features include:
@@ -19,18 +20,23 @@ Plugin function:	A suite of functions to modify PDB files. Features include:
 					scheme; set chain-ID; renumber residues and/or atom
 					numbering; check if PDB is valid for HADDOCK (TER statement,
 					END statement, CNS nomenclature); place chain ID to location of
-					seg ID; split ensemble files or concate PDB files to an ensemble;
-					convert PDB to an XML representation.
+					seg ID; split ensemble files or concate PDB files to an ensemble
+					PDB file or DART ensemble container (join with a .dens name);
+					convert PDB to an XML representation. Large input lists can be
+					processed by a pool of worker processes (-j/--processes).
 Examples:			PDBeditor.py -f test.pdb -kn test_fixed.pdb
 					PDBeditor.py -f test.pdb -r 1 -c B -adg
-Dependencies:		Standard python2.3 or higher. DART package (XMLwriter,
-					and Constants modules)
+					PDBeditor.py -f *.pdb -k -j 0
+					PDBeditor.py -f *.pdb -l -n ensemble.dens
+Dependencies:		Standard python2.3 or higher, NumPy. DART package (XMLwriter,
+					AtomTable, PDBio, Archive, Ensemble and Constants modules)
 
 ==========================================================================================
 """
 
 """Import modules"""
-import os, sys, re, glob
+import os, sys, re, glob, itertools, multiprocessing, cStringIO
+import numpy
 
 """Setting pythonpath variables if run from the command line"""
 base, dirs = os.path.split(os.path.dirname(os.path.join(os.getcwd(), __file__)))
@@ -42,6 +48,26 @@ else:
 
 from system.XMLwriter import Node
 from system.Constants import *
+from system.AtomTable import AtomTable, ResidueIndex, Concatenate
+from system.PDBio import ParsePDB, FormatAtoms, FormatXML, PDBLINE, Blocks, ModelIndex, WriteIndex, ReadBlock
+from system.StructureCache import StructureCache
+from system.CIFio import ParseCIF, IterCIF, IsCIF
+from system.Archive import OpenInput, ExpandInput, ArchivePath, SplitExt, IsPlain
+from system.Ensemble import Ensemble, EnsembleContainer, IsEnsemble
+
+"""Residue and atom name conversion tables from Constants.py"""
+NARES1TO3 = {}
+for resid1, resid3 in zip(NAres1, NAres3):
+    if not NARES1TO3.has_key(resid1):
+        NARES1TO3[resid1] = resid3
+IUPACTOCNS = dict(zip(IUPAC, CNS))
+
+"""Three-letter to wwwPDB one-letter nucleic-acid code, DNA unless Uracil is found"""
+NA3TODNA1 = dict(zip(['--- ', 'CYT ', 'THY ', 'GUA ', 'ADE ', 'URI '], ['  - ', ' DC ', ' DT ', ' DG ', ' DA ', ' RU ']))
+NA3TORNA1 = dict(zip(['--- ', 'CYT ', 'THY ', 'GUA ', 'ADE ', 'URI '], ['  - ', ' RC ', ' DT ', ' RG ', ' RA ', ' RU ']))
+
+"""Edits of the pdb2haddock option, see EditPipeline"""
+PDB2HADDOCK = {'NA1to3': True, 'NA3to1': False, 'IUPACtoCNS': True, 'reatom': 1}
 
 
 def PluginXML():
@@ -67,132 +93,269 @@ def PluginXML():
  <option type="pdb2haddock" form="checkbox" text="Make PDB HADDOCK ready">True</option>
  <option type="joinpdb" form="checkbox" text="Join PDB files to one">False</option>
  <option type="splitpdb" form="text" text="Split PDB files based on TER or MODEL statement"></option>
+ <option type="splitmodels" form="text" text="Only split these models (e.g. 1,4,10-20)"></option>
  <option type="name" form="text" text="Give your structure a name"></option>
  <option type="pdb2xml" form="checkbox" text="Convert PDB to DART XML representation">False</option>
+ <option type="processes" form="hidden" text="None">1</option>
 </parameters>"""
 
     return PluginXML
 
 
+def ModelSelection(selection):
+
+    """Convert a model selection as 1,4,10-20 to a sorted list of model numbers, None selects all"""
+
+    if selection is None or not str(selection).strip():
+        return None
+
+    models = []
+    for item in str(selection).split(','):
+        if '-' in item:
+            first, last = item.split('-')
+            models.extend(range(int(first), int(last) + 1))
+        elif item.strip():
+            models.append(int(item))
+
+    return sorted(set(models))
+
+
+def IterStructures(inputlist, models=None):
+
+    """
+    Iterate over the structures in a list of PDB files, one parsed structure at a time.
+    Yields (file, model number, PDBeditor). Files with a single structure are yielded as a
+    whole with model number None, ensembles model by model (see PDBeditor.IterModels).
+    Archives in inputlist are read member by member (see system.Archive).
+    """
+
+    for files in ExpandInput(inputlist):
+        structures = PDBeditor().IterModels(files, models=models)
+        first = [structure for structure in itertools.islice(structures, 2)]
+        if models is None and len(first) == 1:
+            yield files, None, first[0][1]
+            continue
+
+        for model, structure in itertools.chain(first, structures):
+            yield files, model, structure
+
+
+def ModelName(files, model=None):
+
+    """Name of a structure: the file name without extension, for models of an ensemble
+    extended with the model number as the files written by SplitPDB"""
+
+    basename = SplitExt(os.path.basename(files))[0]
+    if model is None:
+        return basename
+    return '%s_%i' % (basename, model)
+
+
+def ModelFiles(inputlist, models=None):
+
+    """
+    Iterate over the structures in a list of PDB files for programs that need a file per
+    structure. Yields (file, model number, path) as IterStructures: single structure files
+    as they are, every model of an ensemble written to the current directory under its
+    ModelName. A model file only exists while it is used and is removed afterwards unless
+    it was there already. Compressed files, archive members and the models of DART
+    ensemble containers are written the same way.
+    """
+
+    for files, model, structure in IterStructures(inputlist, models=models):
+        if model is None and IsPlain(files) and not IsEnsemble(files):
+            yield files, model, files
+            continue
+
+        path = os.path.join(os.getcwd(), ModelName(files, model) + '.pdb')
+        existed = os.path.isfile(path)
+        if not existed:
+            structure.WritePDB(file_out=path, noheader=True, nofooter=True)
+        try:
+            yield files, model, path
+        finally:
+            if not existed and os.path.isfile(path):
+                os.remove(path)
+
+
+def OutputNames(inputlist, name=None):
+
+    """
+    Names of the fixed PDB files of inputlist in input order: the input name extended with
+    _fixed, or name followed by -1, -2 ... for every name that already exists. All names
+    are chosen before any file is written so workers of the batch mode never race on the
+    check for existing files.
+    """
+
+    taken = set(glob.glob('*.pdb'))
+
+    outfiles = []
+    for files in inputlist:
+        if name == None:
+            basename, extension = SplitExt(os.path.basename(files))
+            if IsCIF(files):
+                extension = '.pdb'
+            outfile = basename + "_fixed" + extension
+        else:
+            basename, extension = os.path.splitext(name)
+            outfile = name
+            count = 1
+            while outfile in taken:
+                outfile = basename + '-' + str(count) + extension
+                count = count + 1
+        taken.add(outfile)
+        outfiles.append(outfile)
+
+    return outfiles
+
+
+def Processes(processes, njobs):
+
+    """Number of worker processes of the batch mode, 0 or None uses all cores"""
+
+    processes = int(processes or 0)
+    if processes < 1:
+        processes = multiprocessing.cpu_count()
+
+    return max(1, min(processes, njobs))
+
+
+"""Edits and output options shared by the workers of the batch mode, see EditBatch"""
+BATCH = {}
+
+
+def InitBatch(pipeline, mode, paramdict, worker=False):
+
+    """Set the edits and output options, workers write their messages line by line so
+    the output of different workers is not mixed within a line"""
+
+    if worker:
+        try:
+            sys.stdout = os.fdopen(os.dup(sys.stdout.fileno()), 'w', 1)
+        except (AttributeError, IOError, OSError):
+            pass    # stdout is not a file (redirected in the calling process), keep it
+
+    BATCH['pipeline'] = pipeline
+    BATCH['mode'] = mode
+    BATCH['noheader'] = paramdict['noheader']
+    BATCH['nofooter'] = paramdict['nofooter']
+    BATCH['nohetatm'] = paramdict['nohetatm']
+
+
+def EditBatch(job):
+
+    """
+    Read, edit and write one structure of the batch. job is (input file, output file, model
+    number). Fixed PDB and XML files are written by the worker itself, in join mode the
+    MODEL block is returned as text and appended to the ensemble by PluginCore in input order.
+    Joining to a DART ensemble container returns the atom table and header records instead.
+    """
+
+    files, outfile, modelnr = job
+
+    pdb = PDBeditor()
+    pdb.ReadPDB(files)
+
+    """Apply all requested edits in one sweep over the atom table"""
+    BATCH['pipeline'].Report()
+    BATCH['pipeline'].Apply(pdb)
+
+    if BATCH['mode'] == 'xml':
+        print "    * Generating DART XML representation of the PDB as: %s" % outfile
+        out = file(outfile, 'w')
+        pdb.WriteXML(out)
+        out.close()
+    elif BATCH['mode'] == 'join':
+        out = cStringIO.StringIO()
+        pdb.WriteRecords(out, join=True, modelnr=modelnr, noheader=True, nofooter=True, nohetatm=BATCH['nohetatm'])
+        return out.getvalue()
+    elif BATCH['mode'] == 'container':
+        atoms = pdb.atoms
+        if BATCH['nohetatm']:
+            atoms = atoms.Take(atoms.label != 'HETATM')
+        return atoms, {'header': pdb.header, 'title': pdb.title, 'footer': pdb.footer}
+    else:
+        print "    * Printing fixed pdb file as: %s" % outfile
+        pdb.WritePDB(file_out=outfile, join=False, modelnr=0, noheader=BATCH['noheader'],
+                     nofooter=BATCH['nofooter'], nohetatm=BATCH['nohetatm'])
+
+
 def PluginCore(paramdict, inputlist):
     print "--> Starting PDBeditor"
 
+    """Archives are processed member by member"""
+    inputlist = ExpandInput(inputlist)
+
     """Split ensemble of PDB files in separate PDB files"""
     if not paramdict['splitpdb'] == None:
         pdb = PDBeditor()
         for files in inputlist:
             print("    * Spliting ensemble PDB in individual PDB files on %s statement" % paramdict['splitpdb'])
-            pdb.SplitPDB(ensemble=files, mode=paramdict['splitpdb'])
+            pdb.SplitPDB(ensemble=files, mode=paramdict['splitpdb'], models=ModelSelection(paramdict.get('splitmodels')))
         sys.exit(0)
 
-    filecount = 1  # to keep track of processed files in the PDB joining process
-
-    for files in inputlist:
-
-        pdb = PDBeditor()
-        pdb.ReadPDB(files)
-
-        """Perform fixes to the pdb file to make it suitable for HADDOCK"""
-        if paramdict['pdb2haddock']:
-            paramdict['NA1to3'] = True
-            paramdict['NA3to1'] = False
-            paramdict['IUPACtoCNS'] = True
-            paramdict['reatom'] = int(1)
-            paramdict['noheader'] = True
-            paramdict['nohetatm'] = True
-
-        """Convert Nucleic-Acids residue one-letter-code to three-letter-code or vice versa"""
-        if paramdict['NA1to3']:
-            print "    * Convert Nucleic-Acids one-letter-code to three-letter-code"
-            pdb.NAresid1to3()
-        if paramdict['NA3to1']:
-            print "    * Convert Nucleic-Acids three-letter-code to one-letter-code (wwwPDB notation)"
-            pdb.NAresid3to1()
-
-        """Convert IUPAC atom naming to CNS"""
-        if paramdict['IUPACtoCNS']:
-            print "    * Convert IUPAC atom notation to CNS atom notation"
-            pdb.IUPACtoCNS()
-
-        """Place HADDOCK chain ID in propper place"""
-        if paramdict['xsegchain']:
-            print "    * Set seg ID to position of chain ID"
-            pdb.XsegChain()
-
-        """Set the chain ID"""
-        if paramdict['setchainID'] is not None:
-            chainID = paramdict['setchainID'].split(',')
-            try:
-                old = chainID[0].upper()
-                new = chainID[1].upper()
-                print "    * Converting chain ID:", old, "to chain ID:", new
-                pdb.SetchainID(old=old, new=new)
-            except:
-                new = chainID[0].upper()
-                print "    * Converting all to chain ID:", new
-                pdb.SetchainID(new=new)
-
-        """Renumbering residues"""
-        if paramdict['reres'] is not None:
-            print "    * Renumber residues starting from:", paramdict['reres']
-            pdb.Reres(paramdict['reres'])
-
-        """Renumber atoms"""
-        if paramdict['reatom'] is not None:
-            print "    * Renumber atoms starting from:", paramdict['reatom']
-            pdb.Reatom(paramdict['reatom'])
-            pdb.CorrectConect(paramdict['reatom'])
-
-        """Make XML representation of pdb"""
-        if paramdict['pdb2xml']:
-            xml = pdb.PDB2XML()
-
-            root = os.path.basename(files)
-            basename, extension = os.path.splitext(root)
-            outfile = basename + ".xml"
-
-            print "    * Generating DART XML representation of the PDB as:", outfile
-
-            out = file(outfile, 'w')
-            out.write(xml.xml())
-            out.close
-
-        """Write new PDB file"""
-        if paramdict['pdb2xml'] == False and paramdict['joinpdb'] == False and paramdict['splitpdb'] == None:
-            if paramdict['name'] == None:
-                root = os.path.basename(files)
-                basename, extension = os.path.splitext(root)
-                outfile = basename + "_fixed" + extension
-            else:
-                files = glob.glob('*.pdb')
-                basename, extension = os.path.splitext(paramdict['name'])
-                if paramdict['name'] in files:
-                    count = 1
-                    while count < len(files):
-                        newname = basename + '-' + str(count) + extension
-                        if newname in files:
-                            pass
-                        else:
-                            outfile = newname
-                            break
-                        count = count + 1
-                else:
-                    outfile = paramdict['name']
-
-            print "    * Printing fixed pdb file as:", outfile
-            pdb.WritePDB(file_out=outfile, join=False, modelnr=0, noheader=paramdict['noheader'],
-                         nofooter=paramdict['nofooter'], nohetatm=paramdict['nohetatm'])
-
-        elif paramdict['pdb2xml'] == False and paramdict['joinpdb'] == True and paramdict['splitpdb'] == None:
-            if paramdict['name'] == None:
-                outfile = 'joined.pdb'
-            else:
-                outfile = paramdict['name']
-            print "    * Append", os.path.basename(files), "to concatenated file:", outfile
-            pdb.WritePDB(file_out=outfile, join=True, modelnr=filecount, noheader=True, nofooter=True,
-                         nohetatm=paramdict['nohetatm'])
-
-        filecount = filecount + 1
+    """Perform fixes to the pdb file to make it suitable for HADDOCK"""
+    if paramdict['pdb2haddock']:
+        paramdict.update(PDB2HADDOCK)
+        paramdict['noheader'] = True
+        paramdict['nohetatm'] = True
+
+    """Compile the requested edits once for all files"""
+    pipeline = EditPipeline(NA1to3=paramdict['NA1to3'], NA3to1=paramdict['NA3to1'], IUPACtoCNS=paramdict['IUPACtoCNS'],
+                            xsegchain=paramdict['xsegchain'], setchainID=paramdict['setchainID'],
+                            reres=paramdict['reres'], reatom=paramdict['reatom'])
+
+    """Output file of every input file in input order, models are numbered by input position"""
+    if paramdict['pdb2xml']:
+        mode = 'xml'
+        outfiles = [SplitExt(os.path.basename(files))[0] + ".xml" for files in inputlist]
+    elif paramdict['joinpdb']:
+        mode = 'join'
+        if paramdict['name'] == None:
+            outfiles = ['joined.pdb'] * len(inputlist)
+        else:
+            outfiles = [paramdict['name']] * len(inputlist)
+            if IsEnsemble(paramdict['name']):
+                mode = 'container'
+    else:
+        mode = 'write'
+        outfiles = OutputNames(inputlist, paramdict['name'])
+    jobs = zip(inputlist, outfiles, range(1, len(inputlist) + 1))
+
+    """Process the files in a pool of workers or, with a single process, one after the other"""
+    processes = Processes(paramdict.get('processes', 1), len(jobs))
+    if processes > 1:
+        print "    * Processing %i PDB files with %i worker processes" % (len(jobs), processes)
+        pool = multiprocessing.Pool(processes, initializer=InitBatch, initargs=(pipeline, mode, paramdict, True))
+        results = pool.imap(EditBatch, jobs, chunksize=max(1, len(jobs) / (processes * 4)))
+    else:
+        pool = None
+        InitBatch(pipeline, mode, paramdict)
+        results = itertools.imap(EditBatch, jobs)
+
+    """Merge joined models in input order, keeps the MODEL numbering deterministic"""
+    ensemble = None
+    try:
+        for (files, outfile, modelnr), model in itertools.izip(jobs, results):
+            if mode == 'join':
+                if ensemble is None:
+                    ensemble = EnsembleWriter(outfile, nohetatm=paramdict['nohetatm'])
+                print "    * Append", os.path.basename(files), "to concatenated file:", outfile
+                ensemble.WriteModel(model, modelnr)
+            elif mode == 'container':
+                if ensemble is None:
+                    ensemble = EnsembleContainer(outfile)
+                print "    * Append", os.path.basename(files), "to ensemble container:", outfile
+                try:
+                    ensemble.AddModel(model[0], records=model[1], model=modelnr, name=os.path.basename(files))
+                except ValueError, error:
+                    print "    * ERROR: %s not added to the ensemble container, %s" % (os.path.basename(files), error)
+    finally:
+        if ensemble is not None:
+            ensemble.Close()
+        if pool is not None:
+            pool.close()
+            pool.join()
 
 
 # ================================================================================================================================#
@@ -242,9 +405,13 @@ class CommandlineOptionParser:
                           help="Concatenate PDB files")
         parser.add_option("-m", "--splitpdb", action="store", dest="splitpdb", type="string",
                           help="Split ensemble PDB files on MODEL or TER statemend")
+        parser.add_option("-t", "--splitmodels", action="store", dest="splitmodels", type="string",
+                          help="Only split these models from the ensemble, as 1,4,10-20")
         parser.add_option("-n", "--name", action="store", dest="name", type="string", help="name for the new PDB file")
         parser.add_option("-x", "--pdb2xml", action="store_true", dest="pdb2xml", default=False,
                           help="Make DART XML representation of pdb")
+        parser.add_option("-j", "--processes", action="store", dest="processes", type="int", default=1,
+                          help="Number of worker processes for large input lists, 0 uses all cores")
 
         (options, args) = parser.parse_args()
 
@@ -262,7 +429,9 @@ class CommandlineOptionParser:
         self.option_dict['pdb2haddock'] = options.pdb2haddock
         self.option_dict['joinpdb'] = options.joinpdb
         self.option_dict['splitpdb'] = options.splitpdb
+        self.option_dict['splitmodels'] = options.splitmodels
         self.option_dict['name'] = options.name
+        self.option_dict['processes'] = options.processes
         self.option_dict['pdb2xml'] = options.pdb2xml
 
         if not self.option_dict['input'] == None:
@@ -329,132 +498,101 @@ class PDBeditor:
 
         self.title = []
         self.atcounter = 0
-        self.allatom_line = []
         self.header = []
         self.footer = []
         self.end = []
         self.model = []
-        self.label = []
-        self.atnum = []
-        self.elem = []
-        self.atname = []
-        self.atalt = []
-        self.resname = []
-        self.chain = []
-        self.resnum = []
-        self.resext = []
-        self.coord = []
-        self.occ = []
-        self.b = []
-        self.hdoc_chain = []
+        self.atoms = AtomTable()
+        self.index = ResidueIndex()
         self.sequence = {}
         self.firstatnr = 1
 
     def ReadPDB(self, inputfile, debug=0):
 
-        # check if passed filename string or a file descriptor
+        # check if passed filename string or a file descriptor, compressed files and archive
+        # members are read as stream
         if type(inputfile) == type(sys.stdin):
             readfile = inputfile
         else:
-            readfile = file(inputfile, 'r')
+            readfile = OpenInput(inputfile)
+
+        # mmCIF files are streamed row by row, files the readers can not convert are reported
+        # and skipped
+        try:
+            if IsCIF(inputfile) or IsCIF(getattr(readfile, 'name', None)):
+                return self.ReadCIF(readfile, debug)
+
+            data = readfile.read()
+            return self.ReadPDBdata(data, debug, cache=True)
+        except ValueError, error:
+            print "    * ERROR: could not read %s: %s" % (getattr(readfile, 'name', inputfile), error)
+            return 0
+
+    def ReadCIF(self, readfile, debug=0):
+
+        """
+        Reads the _atom_site loop of an mmCIF file (open file or list of lines) in to the atom
+        table of the PDBeditor object, see system.CIFio.
+        """
 
-        lines = readfile.readlines()
-        self.ReadPDBlines(lines, debug)
+        atoms, records = ParseCIF(readfile)
+        return self.AddAtoms(atoms, records, debug)
 
     def ReadPDBlines(self, lines, debug=0):
 
         """
-        Reads a list of PDB-format file lines in to the Protein class object.
+        Reads a list of PDB-format file lines in to the atom table of the PDBeditor object.
         Thus can be called by another routine that already has the lines in a list.
-        Returns the number of atoms read in.
-        """
-
-        i = 0
-        atom_hetatm = re.compile('(ATOM  |TER   |HETATM)')
-        head = re.compile('^(HEADER|COMPND|SOURCE|JRNL|HELIX|REMARK|SEQRES|CRYST1|SCALE|ORIG)')
-        title = re.compile('^TITLE')
-        foot = re.compile('(CONECT|MASTER)')
-        end = re.compile('(END)')
-        model = re.compile('(MODEL)')
-        element = re.compile('[A-Za-z ][A-Za-z]')
-        for line in lines:
-            if atom_hetatm.match(line):
-                line = line[:-1]
-
-                # Add TER statement if change in chainid
-                if len(line) > 22 and len(self.chain) and not self.chain[-1] == line[21]:
-                    self.label.append('TER   ')
-                    for b in (
-                    self.allatom_line, self.atnum, self.atname, self.resnum, self.resname, self.chain, self.atalt,
-                    self.resext, self.occ, self.b, self.hdoc_chain, self.elem):
-                        b.append(blank)
-                    self.coord.append((0.000, 0.000, 0.000))
-                if not line.startswith("TER"):
-                    self.allatom_line.append(line)
-                    self.label.append(line[0:6])  # atom label
-                    self.atnum.append(int(line[6:12]))  # atom number
-                    self.atname.append(line[12:16])  # atom type
-                    self.atalt.append(line[16:17])
-                    self.resname.append(line[17:21])  # residu name
-                    self.chain.append(line[21])  # chain
-                    self.resnum.append(int(line[22:26]))  # residu number
+        """
 
-                try:
-                    self.resext.append(line[27])
-                except:
-                    self.resext.append(blank)
+        return self.ReadPDBdata(''.join(lines), debug)
 
-                try:
-                    self.coord.append((float(line[30:38]), float(line[38:46]), float(line[46:54])))  # X,Y,Z coordinates
-                except:
-                    if not line[0:3] == 'TER' or line[0:5] == 'MODEL':
-                        print "    * ERROR: coordinate error in line:"
-                        print "     ", line
+    def ReadPDBdata(self, data, debug=0, cache=False):
 
-                try:
-                    self.occ.append(float(line[54:60]))
-                except:
-                    self.occ = ([1.00] * len(self.atnum))
+        """
+        Reads the content of a PDB file in to the atom table of the PDBeditor object using the
+        vectorised parser of system.PDBio. A TER row is inserted at every change of chain ID,
+        TER records in the file are not stored. Returns the number of atoms read in.
+        With cache the atom table is taken from (or stored in) the system.StructureCache.
+        """
 
-                try:
-                    self.b.append(float(line[60:66]))  # B factor
-                except:
-                    self.b = ([0.00] * len(self.atnum))
+        if cache:
+            atoms, records = StructureCache().Parse(data)
+        else:
+            atoms, records = ParsePDB(data)
 
-                try:
-                    self.hdoc_chain.append(line[72])  # SEGID
-                except:
-                    self.hdoc_chain = ([blank] * len(self.atnum))
-
-                if element.match(line[76:78]):  # Get first element in elementlist
-                    self.elem.append(line[76:78])
-                else:
-                    self.elem.append(line[12:14])
-
-                self.atcounter += 1
-                i += 1
-
-            elif head.match(line):
-                self.header.append(line[:-1])
-            elif foot.match(line):
-                self.footer.append(line[:-1])
-            elif end.match(line):
-                self.end.append(line[:-1])
-            elif model.match(line[:-1]):
-                self.model.append(line)
-            elif title.match(line):
-                self.title.append(line[:-1])
-
-        self.firstatnr = self.atnum[
-            0]  # Need to know original number of first atom for possible CONECT statement correction when renumbering atoms
+        return self.AddAtoms(atoms, records, debug)
+
+    def AddAtoms(self, atoms, records, debug=0):
+
+        """
+        Appends a parsed atom table and its header, title, footer, END and MODEL records to the
+        PDBeditor object
+        """
+
+        self.title.extend(records['title'])
+        self.header.extend(records['header'])
+        self.footer.extend(records['footer'])
+        self.end.extend(records['end'])
+        self.model.extend(records['model'])
+
+        if len(self.atoms):
+            self.atoms = Concatenate([self.atoms, atoms])
+        else:
+            self.atoms = atoms
+        self.index.Update(self.atoms)
+        self.atcounter += int(atoms.IsAtom().sum())
+
+        if len(self.atoms):
+            self.firstatnr = self.atoms.atnum[0]  # Need to know original number of first atom for possible CONECT statement correction when renumbering atoms
 
         if debug:
-            return len(self.atnum), self.atcounter
+            return len(self.atoms), self.atcounter
 
     def WritePDB(self, file_out, join=False, modelnr=0, noheader=False, nofooter=False, nohetatm=False):
 
         """
-        Saves the Protein class object to a PDB-format file
+        Saves the PDBeditor atom table to a PDB-format file
         if noheader = True, no header (REMARK etc.) or footer lines are written
         if nohetatm = True, no hetero atoms are written
         """
@@ -464,6 +602,17 @@ class PDBeditor:
         else:
             out = file(file_out, 'w')
 
+        self.WriteRecords(out, join=join, modelnr=modelnr, noheader=noheader, nofooter=nofooter, nohetatm=nohetatm)
+        out.close()
+
+    def WriteRecords(self, out, join=False, modelnr=0, noheader=False, nofooter=False, nohetatm=False):
+
+        """
+        Writes the PDB records to an open file. The atom records are formatted in blocks by
+        system.PDBio.FormatAtoms and written as large buffers. In join mode the structure is
+        written as MODEL modelnr ... ENDMDL block.
+        """
+
         if noheader == False:
             for i in range(len(self.title)):
                 out.write('%s\n' % self.title[i])
@@ -473,13 +622,8 @@ class PDBeditor:
         if join == True:
             out.write('MODEL ' + str(modelnr) + '\n')
 
-        for i in xrange(len(self.resnum)):
-            if self.label[i] == 'ATOM  ':
-                self.WritePDBline(out, i)
-            elif self.label[i] == 'TER   ':
-                out.write('TER   \n')
-            elif self.label[i] == 'HETATM' and not nohetatm:
-                out.write("%s\n" % self.allatom_line[i])
+        for block in FormatAtoms(self.atoms, nohetatm=nohetatm):
+            out.write(block)
 
         if nofooter == False:
             for i in range(len(self.footer)):
@@ -498,65 +642,192 @@ class PDBeditor:
             for i in range(len(self.end)):
                 out.write("%s\n" % self.end[i])
 
-        out.close()
-
     def WritePDBline(self, FD, i):
 
         """
         Writes a single line of data in the PDB-format
-            called by writePDB
         """
 
-        FD.write('%-6s%5i %-4s%1s%-4s%1s%4i%1s   %8.3f%8.3f%8.3f%6.2f%6.2f%10s%2s\n' %
-                 (self.label[i], self.atnum[i], self.atname[i], self.atalt[i],
-                  self.resname[i], self.chain[i], self.resnum[i], self.resext[i],
-                  self.coord[i][0], self.coord[i][1], self.coord[i][2], self.occ[i], self.b[i], blank, self.elem[i]))
+        atoms = self.atoms
+        FD.write(PDBLINE % (atoms.label[i], atoms.atnum[i], atoms.atname[i], atoms.atalt[i],
+                            atoms.resname[i], atoms.chain[i], atoms.resnum[i], atoms.resext[i],
+                            atoms.coord[i][0], atoms.coord[i][1], atoms.coord[i][2], atoms.occ[i], atoms.b[i],
+                            blank, atoms.elem[i]))
 
-    def SplitPDB(self, ensemble=None, mode=None):
+    def SplitPDB(self, ensemble=None, mode=None, models=None):
 
         """
-        Split ensemble PDB files in seperate PDB files based on MODEL or TER tag
+        Split ensemble PDB files in seperate PDB files based on MODEL or TER tag. The file is
+        streamed: every block is written to its own file as soon as the next block starts.
+        The byte offsets of the blocks are stored in an index file next to the ensemble.
+        If models is a list of model numbers only these are written, read directly from
+        the offsets in the index without scanning the ensemble again. The models of a DART
+        ensemble container are written as PDB files, whatever the mode.
         """
 
+        if IsEnsemble(ensemble):
+            basename = SplitExt(ensemble)[0]
+            for model, structure in self.IterModels(ensemble, models=models):
+                outfile = basename + '_' + str(model) + '.pdb'
+                print "    * Writing model %s as %s" % (model, outfile)
+                structure.WritePDB(file_out=outfile, noheader=True, nofooter=True)
+            return
+
         # check if passed filename string or a file descriptor
         if type(ensemble) == type(sys.stdin):
             readfile = ensemble
+            ensemble = ensemble.name
         else:
-            readfile = file(ensemble, 'r')
-
-        lines = readfile.readlines()
+            readfile = OpenInput(ensemble, 'rb')
 
+        # models of compressed files and archive members are written next to the file or archive
         mode = mode.upper()
-        atom_hetatm = re.compile('(ATOM  |HETATM)')
-        model = re.compile('(' + mode + ')')
-        modelcount = 1
-        models = {}
-        models[modelcount] = []
-        linecount = len(lines)
-        linenr = 0
-        while linenr < linecount:
-            line = lines[linenr].strip()
-            if model.match(line):
-                if not len(models[modelcount]) == 0:
-                    modelcount += 1
-                    if models.has_key(modelcount) == False:
-                        models[modelcount] = []
-                linenr += 1
-            if atom_hetatm.match(line):
-                models[modelcount].append(linenr)
-            linenr = linenr + 1
-
-        if len(models) == 1:
-            print "    * No splitting occured, splitting statement not found"
+        member = ArchivePath(ensemble)
+        if member is not None:
+            basename = os.path.join(os.path.dirname(member[0]), SplitExt(os.path.basename(ensemble))[0])
         else:
-            for model in models.keys():
-                outfile = os.path.splitext(ensemble)[0] + '_' + str(model) + '.pdb'
-                out = file(outfile, 'w')
+            basename = SplitExt(ensemble)[0]
+
+        # mmCIF files have no MODEL and TER records, they are split by model number
+        if IsCIF(ensemble):
+            readfile.close()
+            written = []
+            for model, structure in self.IterModels(ensemble, models=models):
+                outfile = basename + '_' + str(model) + '.pdb'
+                print "    * Writing model %s as %s" % (model, outfile)
+                structure.WritePDB(file_out=outfile, noheader=True, nofooter=True)
+                written.append(outfile)
+            if len(written) <= 1 and models is None:
+                if len(written):
+                    os.remove(written[0])
+                print "    * No splitting occured, splitting statement not found"
+            return
+
+        if models is not None and IsPlain(ensemble):
+            index = ModelIndex(ensemble, mode)
+            for model in models:
+                if model < 1 or model > len(index):
+                    print "    * WARNING: model %i not in ensemble of %i models" % (model, len(index))
+                    continue
+                outfile = basename + '_' + str(model) + '.pdb'
                 print "    * Writing model %s as %s" % (model, outfile)
-                for line in models[model]:
-                    out.write(lines[line])
+                out = file(outfile, 'w')
+                for line in ReadBlock(readfile, index[model - 1][0], index[model - 1][1]):
+                    if not line.endswith('\n'):
+                        line = line + '\n'
+                    out.write(line)
                 out.write('END')
                 out.close()
+            readfile.close()
+            return
+
+        index = []
+        out = None
+        for model, offset, line in Blocks(readfile, mode):
+            if model > len(index):
+                if out is not None:
+                    out.write('END')
+                    out.close()
+                    out = None
+                index.append([offset, offset])
+                if models is None or model in models:
+                    outfile = basename + '_' + str(model) + '.pdb'
+                    print "    * Writing model %s as %s" % (model, outfile)
+                    out = file(outfile, 'w')
+            index[-1][1] = offset + len(line)
+            if out is not None:
+                if not line.endswith('\n'):
+                    line = line + '\n'
+                out.write(line)
+        if out is not None:
+            out.write('END')
+            out.close()
+        readfile.close()
+
+        if len(index) <= 1 and models is None:
+            if len(index):
+                os.remove(basename + '_1.pdb')
+            print "    * No splitting occured, splitting statement not found"
+        elif len(index) > 1 and IsPlain(ensemble):
+            WriteIndex(ensemble, mode, [tuple(offsets) for offsets in index])
+
+    def IterModels(self, ensemble, models=None):
+
+        """
+        Iterate over the models of a multi MODEL PDB file without splitting it to disk. Yields
+        (model number, PDBeditor) with one model parsed in its atom table at a time. A file
+        without MODEL statements yields the complete structure as model 1. If models is a
+        list of model numbers only these are parsed, read through the model index of the
+        ensemble (see SplitPDB). The models of a DART ensemble container are taken from the
+        memory mapped container without parsing, those of an mmCIF file are split by their
+        model number (pdbx_PDB_model_num).
+        """
+
+        if IsCIF(ensemble):
+            readfile = OpenInput(ensemble, 'rb')
+            try:
+                for model, atoms, records in IterCIF(readfile, models=models):
+                    structure = PDBeditor()
+                    structure.AddAtoms(atoms, records)
+                    yield model, structure
+            except ValueError, error:
+                print "    * ERROR: could not read %s: %s" % (ensemble, error)
+            readfile.close()
+            return
+
+        if IsEnsemble(ensemble):
+            container = Ensemble(ensemble)
+            numbers = container.ModelNumbers()
+            if models is None:
+                selection = numbers
+            else:
+                selection = [model for model in models if model in numbers]
+                for model in models:
+                    if not model in numbers:
+                        print "    * WARNING: model %i not in ensemble of %i models" % (model, len(numbers))
+            for model in selection:
+                structure = PDBeditor()
+                structure.AddAtoms(container.Table(container.Position(model)), container.Records())
+                yield model, structure
+            return
+
+        if models is not None and IsPlain(ensemble):
+            index = ModelIndex(ensemble, 'MODEL')
+            readfile = file(ensemble, 'rb')
+            for model in models:
+                if model < 1 or model > len(index):
+                    print "    * WARNING: model %i not in ensemble of %i models" % (model, len(index))
+                    continue
+                readfile.seek(index[model - 1][0])
+                structure = PDBeditor()
+                structure.ReadPDBdata(readfile.read(index[model - 1][1] - index[model - 1][0]))
+                yield model, structure
+            readfile.close()
+            return
+
+        readfile = OpenInput(ensemble, 'rb')
+        current = 1
+        lines = []
+        for model, offset, line in Blocks(readfile, 'MODEL'):
+            if model > current:
+                if models is None or current in models:
+                    structure = PDBeditor()
+                    structure.ReadPDBlines(lines)
+                    yield current, structure
+                current = model
+                lines = []
+            lines.append(line)
+        readfile.close()
+
+        if current == 1:
+            if models is None or current in models:
+                structure = PDBeditor()
+                structure.ReadPDB(ensemble)
+                yield current, structure
+        elif len(lines) and (models is None or current in models):
+            structure = PDBeditor()
+            structure.ReadPDBlines(lines)
+            yield current, structure
 
     def NAresid1to3(self):
 
@@ -564,30 +835,7 @@ class PDBeditor:
         Convert list of 1-letter nucleic-acid code sequence to 3-letter code and update resname
         """
 
-        seq3 = []
-
-        for resid1 in self.resname:
-            if resid1:
-                try:
-                    resid3 = NAres3[
-                        NAres1.index(resid1.upper())]  # If NAresid is one-letter code, convert to three-letter code
-                    seq3.append(resid3)
-                except ValueError, err:
-                    if resid1.upper() in AAres3:  # If resid is amino-acid three letter code, just append
-                        seq3.append(resid1.upper())  # Amino-acid one letter code in PDB not accepted(expected)
-                    elif resid1.upper() == 'HOH ':  # Waters are neglected, just append.
-                        seq3.append(resid1.upper())
-                    elif resid1.upper() in NAres3:  # If NAresid allready in three letter code, just append
-                        seq3.append(resid1.upper())
-                    else:
-                        print "      - WARNING: no match for residue: %s" % (
-                        resid1)  # If not of the above, raise exception.
-                        seq3.append(resid1.upper())
-
-        if len(seq3) == len(self.resname):
-            self.resname = seq3
-        else:
-            pass
+        EditPipeline(NA1to3=True).Apply(self)
 
     def NAresid3to1(self):
 
@@ -596,38 +844,7 @@ class PDBeditor:
         (2006) wwwPDB notation. This is DA,DT,DC,DG for DNA and RA,RU,RG,RC for RNA.
         """
 
-        print "      - WARNING: The conversion of nucleic-acid three-letter code to two-letter code does not check for ribose or"
-        print "                 deoxy-ribose. If Uracil is found the structure is regarded as RNA otherwise as DNA. Please check"
-        print "                 your structure in case of mixed conformations."
-
-        seq1 = []
-        THREELETTER = ['--- ', 'CYT ', 'THY ', 'GUA ', 'ADE ', 'URI ']
-        DNA1LETTER = ['  - ', ' DC ', ' DT ', ' DG ', ' DA ', ' RU ']
-        RNA1LETTER = ['  - ', ' RC ', ' DT ', ' RG ', ' RA ', ' RU ']
-
-        if 'URI ' in self.resname:
-            RNA = True
-            DNA = False
-        else:
-            DNA = True
-            RNA = False
-
-        for resid3 in self.resname:
-            try:
-                if RNA == True:
-                    resid1 = RNA1LETTER[THREELETTER.index(resid3.upper())]
-                    seq1.append(resid1)
-                elif DNA == True:
-                    resid1 = DNA1LETTER[THREELETTER.index(resid3.upper())]
-                    seq1.append(resid1)
-            except ValueError, err:
-                print "      - WARNING: no match for residue:", resid3
-                seq1.append(resid3.upper())
-
-        if len(seq1) == len(self.resname):
-            self.resname = seq1
-        else:
-            pass
+        EditPipeline(NA3to1=True).Apply(self)
 
     def SetchainID(self, old=None, new=None):
 
@@ -636,23 +853,7 @@ class PDBeditor:
         Option examples: (A) all to A, (A,B) all A to B. Lower case is converted to upper case.
         """
 
-        newchainseq = []
-
-        if not old and new == None:
-            for chainid in self.chain:
-                if chainid == old:
-                    newchainseq.append(new)
-                else:
-                    newchainseq.append(chainid)
-
-        else:
-            for chainid in self.chain:
-                newchainseq.append(new)
-
-        if len(newchainseq) == len(self.chain):  # in case of any errors that yield non-equal arrays
-            self.chain = newchainseq
-        else:
-            pass
+        EditPipeline(setchainID=(old, new)).Apply(self)
 
     def IUPACtoCNS(self):
 
@@ -661,110 +862,68 @@ class PDBeditor:
         Currently only conversion of nucleic-acid atom types.
         """
 
-        newatomseq = []
+        EditPipeline(IUPACtoCNS=True).Apply(self)
 
-        for atom in self.atname:
-            try:
-                newatom = CNS[IUPAC.index(atom)]
-                newatomseq.append(newatom)
-            except ValueError:
-                newatomseq.append(atom)
+    def WriteXML(self, out):
 
-        if len(newatomseq) == len(self.atname):
-            self.atname = newatomseq
-        else:
-            pass
+        """
+        Writes the DART XML representation of the PDB to an open file. The elements are
+        formatted straight from the atom table in blocks by system.PDBio.FormatXML, the
+        output is identical to PDB2XML().xml() without building the document in memory.
+        """
+
+        for block in FormatXML(self.atoms):
+            out.write(block)
 
     def PDB2XML(self):
 
         """
-        Makes a XML representation of the PDB. Needs system.XMLwriter
+        Makes a XML representation of the PDB as system.XMLwriter Node tree, use WriteXML
+        to write it to file
         """
 
         main = Node("DART_pdbx")
 
-        acount = 0
-        lastchain = ' '
-        lastresnum = ' '
+        lastchain = None
+        lastresnum = None
 
-        for i in xrange(len(self.atnum)):
-            if i == 0:
-                lastchain = self.chain[i]
-                lastresnum = self.resnum[i]
+        atoms = self.atoms.Lists(['label', 'atnum', 'atname', 'resname', 'chain', 'resnum', 'occ', 'b'])
+        coord = self.atoms.coord.tolist()
 
-                chain = Node("chain", ID=lastchain)
-                resid = Node("resid", ID=self.resname[i], nr=str(lastresnum))
-                atom = Node("atom", ID=self.atname[i], nr=str(self.atnum[i]), corx=str(self.coord[i][0]),
-                            cory=str(self.coord[i][1]), corz=str(self.coord[i][2]), occ=str(self.occ[i]),
-                            b=str(self.b[i]))
+        for i in xrange(len(self.atoms)):
+            if atoms['label'][i] == 'TER   ':
+                continue
 
+            atom = Node("atom", ID=atoms['atname'][i], nr=str(atoms['atnum'][i]), corx=str(coord[i][0]),
+                        cory=str(coord[i][1]), corz=str(coord[i][2]), occ=str(atoms['occ'][i]),
+                        b=str(atoms['b'][i]))
+
+            if lastchain is None or not atoms['chain'][i] == lastchain:
+                lastchain = atoms['chain'][i]
+                lastresnum = atoms['resnum'][i]
+                chain = Node("chain", ID=lastchain)
+                resid = Node("resid", ID=atoms['resname'][i], nr=str(lastresnum))
                 resid += atom
                 chain += resid
                 main += chain
+            elif atoms['resnum'][i] == lastresnum:
+                resid += atom
             else:
-                if self.chain[i] == lastchain:
-                    lastchain = self.chain[i]
-                    if self.resnum[i] == lastresnum:
-                        atom = Node("atom", ID=self.atname[i], nr=str(self.atnum[i]), corx=str(self.coord[i][0]),
-                                    cory=str(self.coord[i][1]), corz=str(self.coord[i][2]), occ=str(self.occ[i]),
-                                    b=str(self.b[i]))
-                        lastresnum = self.resnum[i]
-                        resid += atom
-                    else:
-                        lastresnum = self.resnum[i]
-                        resid = Node("resid", ID=self.resname[i], nr=str(lastresnum))
-                        atom = Node("atom", ID=self.atname[i], nr=str(self.atnum[i]), corx=str(self.coord[i][0]),
-                                    cory=str(self.coord[i][1]), corz=str(self.coord[i][2]), occ=str(self.occ[i]),
-                                    b=str(self.b[i]))
-                        resid += atom
-                        chain += resid
-                else:
-                    lastchain = self.chain[i]
-                    lastresnum = self.resnum[i]
-                    chain = Node("chain", ID=lastchain)
-                    resid = Node("resid", ID=self.resname[i], nr=str(lastresnum))
-                    atom = Node("atom", ID=self.atname[i], nr=str(self.atnum[i]), corx=str(self.coord[i][0]),
-                                cory=str(self.coord[i][1]), corz=str(self.coord[i][2]), occ=str(self.occ[i]),
-                                b=str(self.b[i]))
-                    resid += atom
-                    chain += resid
-                    main += chain
+                lastresnum = atoms['resnum'][i]
+                resid = Node("resid", ID=atoms['resname'][i], nr=str(lastresnum))
+                resid += atom
+                chain += resid
 
         return main
 
     def Reres(self, start):
 
         """
-        Renumber residues. Option example: (4) renumber starting from 4.
+        Renumber residues. Option example: (4) renumber starting from 4. A new residue starts at
+        every change in chain ID, residue number, residue name or insertion code.
         """
-        start = int(start)
-        lastresnum = -9999
-        lastchain = ' '
-        lastresname = ' '
-        lastext = ' '
-        idres = start - 1
-        icount = 0
-
-        for i in xrange(len(self.resnum)):
-            if i == 0:
-                icount += 1
-                lastchain = self.chain[i]
-                lastresname = self.resname[i]
-                lastresnum = self.resnum[i]
-                lastext = self.resext[i]
-                self.resnum[i] = start
-                idres += 1
-            else:
-                if (self.chain[i] != lastchain or lastresnum != self.resnum[i] or
-                            lastresname != self.resname[i] or lastext != self.resext[i]):
-                    icount += 1
-                    idres += 1
-                    lastchain = self.chain[i]
-                    lastresname = self.resname[i]
-                    lastresnum = self.resnum[i]
-                    self.resnum[i] = idres
-                else:
-                    self.resnum[i] = idres
+
+        EditPipeline(reres=start).Apply(self)
 
     def Reatom(self, start):
 
@@ -774,12 +933,7 @@ class PDBeditor:
 
         start = int(start)
 
-        newatomnum = range(start, (len(self.atnum) + start))
-
-        if len(newatomnum) == len(self.atnum):
-            self.atnum = newatomnum
-        else:
-            pass
+        self.atoms.atnum = numpy.arange(start, len(self.atoms) + start, dtype=self.atoms.atnum.dtype)
 
     def CorrectConect(self, number):
 
@@ -810,18 +964,213 @@ class PDBeditor:
         Copy SEGID to CHAIN location.
         """
 
-        hdoc_chain = []
-        for chainid in self.hdoc_chain:
-            chainid.strip()
-            if chainid == ' ':
-                pass
+        EditPipeline(xsegchain=True).Apply(self)
+
+
+class EditPipeline:
+
+    """
+    A set of PDBeditor edits compiled to lookup tables and applied to the atom table in one
+    sweep. Name conversions are composed into one map over the distinct residue and atom
+    names, every column is written once and the renumbering is derived from the edited
+    columns. Edits are applied in the order: nucleic-acid residue code, IUPAC to CNS atom
+    names, seg ID to chain ID, chain ID, residues and atoms (with CONECT records). The
+    pdb2haddock option is the predefined pipeline EditPipeline(**PDB2HADDOCK).
+    """
+
+    def __init__(self, NA1to3=False, NA3to1=False, IUPACtoCNS=False, xsegchain=False, setchainID=None, reres=None,
+                 reatom=None):
+
+        self.NA1to3 = NA1to3
+        self.NA3to1 = NA3to1
+        self.IUPACtoCNS = IUPACtoCNS
+        self.xsegchain = xsegchain
+        self.reres = reres
+        self.reatom = reatom
+
+        """Chain ID as (old, new): (A,B) all A to B, (None,A) all to A. Given as 'A,B' or 'A'"""
+        self.chainid = None
+        if type(setchainID) == type(()):
+            if setchainID[1] is not None:
+                self.chainid = setchainID
+        elif setchainID is not None:
+            chainID = setchainID.split(',')
+            try:
+                self.chainid = (chainID[0].upper(), chainID[1].upper())
+            except IndexError:
+                self.chainid = (None, chainID[0].upper())
+
+    def Report(self):
+
+        """
+        Print the edits of the pipeline
+        """
+
+        if self.NA1to3:
+            print "    * Convert Nucleic-Acids one-letter-code to three-letter-code"
+        if self.NA3to1:
+            print "    * Convert Nucleic-Acids three-letter-code to one-letter-code (wwwPDB notation)"
+        if self.IUPACtoCNS:
+            print "    * Convert IUPAC atom notation to CNS atom notation"
+        if self.xsegchain:
+            print "    * Set seg ID to position of chain ID"
+        if self.chainid is not None:
+            if self.chainid[0]:
+                print "    * Converting chain ID:", self.chainid[0], "to chain ID:", self.chainid[1]
             else:
-                hdoc_chain.append(chainid)
+                print "    * Converting all to chain ID:", self.chainid[1]
+        if self.reres is not None:
+            print "    * Renumber residues starting from:", self.reres
+        if self.reatom is not None:
+            print "    * Renumber atoms starting from:", self.reatom
+
+    def _Recode(self, values, converters):
+
+        """
+        Apply the conversion functions in order to every distinct value of a string column
+        rather than to every atom. Chain break (TER) rows are blank and left untouched.
+        """
 
-        if len(hdoc_chain) > 0:
-            self.chain = self.hdoc_chain
+        if not len(values) or not len(converters):
+            return values
+
+        if values.dtype.itemsize == 4:  # 4 character names are compared as 32 bit integers
+            codes, inverse = numpy.unique(numpy.ascontiguousarray(values).view('u4'), return_inverse=True)
+            names = codes.view(values.dtype)
+            order = numpy.argsort(names)  # distinct names in alphabetical order as numpy.unique
+            rank = numpy.empty(len(order), dtype=inverse.dtype)
+            rank[order] = numpy.arange(len(order))
+            names = names[order]
+            inverse = rank[inverse]
         else:
-            pass
+            names, inverse = numpy.unique(values, return_inverse=True)
+        converted = names.tolist()
+        for convert in converters:
+            converted = [name and convert(name, converted) for name in converted]
+
+        return numpy.array(converted, dtype=values.dtype)[inverse]
+
+    def _NA1to3(self, resid1, resnames):
+
+        if NARES1TO3.has_key(resid1.upper()):  # If NAresid is one-letter code, convert to three-letter code
+            return NARES1TO3[resid1.upper()]
+        if not (resid1.upper() in AAres3 or  # Amino-acid three letter code, waters and nucleic-acid three
+                resid1.upper() == 'HOH ' or  # letter code are just appended. Amino-acid one letter code in
+                resid1.upper() in NAres3):  # PDB not accepted(expected)
+            print "      - WARNING: no match for residue: %s" % (resid1)
+        return resid1.upper()
+
+    def _NA3to1(self, resid3, resnames):
+
+        if 'URI ' in resnames:
+            oneletter = NA3TORNA1
+        else:
+            oneletter = NA3TODNA1
+
+        if oneletter.has_key(resid3.upper()):
+            return oneletter[resid3.upper()]
+        print "      - WARNING: no match for residue:", resid3
+        return resid3.upper()
+
+    def _IUPACtoCNS(self, atom, atnames):
+
+        return IUPACTOCNS.get(atom, atom)
+
+    def Apply(self, pdb):
+
+        """
+        Apply the edits to the atom table of a PDBeditor object
+        """
+
+        atoms = pdb.atoms
+
+        """Residue and atom names"""
+        converters = []
+        if self.NA1to3:
+            converters.append(self._NA1to3)
+        if self.NA3to1:
+            print "      - WARNING: The conversion of nucleic-acid three-letter code to two-letter code does not check for ribose or"
+            print "                 deoxy-ribose. If Uracil is found the structure is regarded as RNA otherwise as DNA. Please check"
+            print "                 your structure in case of mixed conformations."
+            converters.append(self._NA3to1)
+        atoms.resname = self._Recode(atoms.resname, converters)
+
+        if self.IUPACtoCNS:
+            atoms.atname = self._Recode(atoms.atname, [self._IUPACtoCNS])
+
+        """Chain ID"""
+        if self.xsegchain:
+            segid = atoms.hdoc_chain[atoms.IsAtom()]
+            if len(segid) and (numpy.char.strip(segid) != '').any():
+                atoms.chain = atoms.hdoc_chain.copy()
+        if self.chainid is not None:
+            old, new = self.chainid
+            if old:
+                atoms.chain[atoms.chain == old] = new
+            else:
+                atoms.chain[:] = new
+
+        """Numbering"""
+        if self.reres is not None and len(atoms):
+            newres = numpy.zeros(len(atoms), dtype=bool)
+            newres[0] = True
+            for column in (atoms.chain, atoms.resnum, atoms.resname, atoms.resext):
+                newres[1:] |= column[1:] != column[:-1]
+            atoms.resnum = (numpy.cumsum(newres) + (int(self.reres) - 1)).astype(atoms.resnum.dtype)
+
+        """Residue index follows the edited chain IDs, residue numbers and atom names"""
+        if self.IUPACtoCNS or self.xsegchain or self.chainid is not None or self.reres is not None:
+            pdb.index.Update(atoms)
+
+        if self.reatom is not None:
+            pdb.Reatom(self.reatom)
+            pdb.CorrectConect(int(self.reatom))
+
+        return pdb
+
+
+class EnsembleWriter:
+
+    """
+    Writes PDBeditor structures as the models of one ensemble file. The output stays open
+    across models, every model is written as MODEL ... ENDMDL block identical to
+    WritePDB in join mode. Use Close() when done.
+    """
+
+    def __init__(self, file_out, append=True, nohetatm=False):
+
+        if append:
+            self.out = open(file_out, 'a')
+        else:
+            self.out = file(file_out, 'w')
+        self.file_out = file_out
+        self.nohetatm = nohetatm
+        self.modelnr = 0
+
+    def Write(self, pdb, modelnr=None):
+
+        """
+        Append pdb as next model, numbered from 1 unless modelnr is given
+        """
+
+        if modelnr is None:
+            modelnr = self.modelnr + 1
+        self.modelnr = modelnr
+
+        pdb.WriteRecords(self.out, join=True, modelnr=modelnr, noheader=True, nofooter=True, nohetatm=self.nohetatm)
+
+    def WriteModel(self, text, modelnr):
+
+        """
+        Append a MODEL block already formatted by WriteRecords in join mode (batch mode workers)
+        """
+
+        self.modelnr = modelnr
+        self.out.write(text)
+
+    def Close(self):
+
+        self.out.close()
 
 
 if __name__ == '__main__':
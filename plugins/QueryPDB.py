@@ -8,9 +8,9 @@ Author:				Marc van Dijk, Department of NMR spectroscopy, Bijvoet Center
 Copyright (C):		2006 (DART project)
 DART version:		1.2 (01-01-2007)
 DART plugin: 		QueryPDB.py
-Plugin function:	Makes a hirargical representation of the PDB (same as QueryPDB) 
-					and and provides various function to perform calculations on the
-					data in the PDB
+Plugin function:	Queries the chains, residues and atoms of a PDB (or of its DART XML
+					representation) and provides various function to perform calculations
+					on the data in the PDB
 Dependencies:		None
 
 ==========================================================================================
@@ -27,9 +27,8 @@ if base in sys.path:
 else:
 	sys.path.append(base)
 
-from PDBeditor import PDBeditor
-from system.Xpath import Xpath
-from system.NAfunctionLib import CalculateDistance
+from PDBeditor import PDBeditor, IterStructures, ModelName
+from system.Structure import Structure, ReadXML
 from system.Constants import *
 from numpy import *
 
@@ -48,6 +47,7 @@ def PluginXML():
  <option type="inputfrom" form="hidden" text="None">1</option>
  <option type="contact" form="checkbox" text="Calcualte contacts">False</option>
  <option type="cutoff" form="text" text="Contacts calculation upper distance cutoff">5</option>
+ <option type="verbose" form="checkbox" text="Verbose output">False</option>
 </parameters>"""
 	
 	return PluginXML
@@ -59,31 +59,31 @@ def PluginCore(paramdict, inputlist):
 
 	for files in inputlist:
 		
-		"""Converting PDB file to XML in memory"""
+		"""Query the parsed structure, the models of an ensemble one at a time"""
 		if (os.path.splitext(files))[1] == '.xml':
-			xml = files
+			structures = [(os.path.basename(files), ReadXML(files))]
 		else:
-			pdb = PDBeditor()
-			pdb.ReadPDB(files)	
-			xml = pdb.PDB2XML().xml()
+			structures = Structures([files])
 		
-		if paramdict['sequence'] == True:
-		
-			sequence = GetSequence()
-			sequence.GetSequence(pdbxml=xml)
-			sequence.FormatOutput()
-		
-		if paramdict['NAsummery'] == True:
-		
-			print("--> Starting nucleic-acid structure evaluation process on structure %s" % os.path.basename(files))
-			print "    * Getting sequence information"
-	
-			sequence = GetSequence()
-			sequence.GetSequence(pdbxml=xml)
+		for name, structure in structures:
+			
+			if paramdict['sequence'] == True:
+			
+				sequence = GetSequence()
+				sequence.GetSequence(structure=structure)
+				sequence.FormatOutput()
 			
-			naeval = NAsummery(pdbxml=xml,sequence=sequence.seqlib)
-			naeval.Evaluate()
+			if paramdict['NAsummery'] == True:
+			
+				print("--> Starting nucleic-acid structure evaluation process on structure %s" % name)
+				print "    * Getting sequence information"
+		
+				sequence = GetSequence()
+				sequence.GetSequence(structure=structure)
 				
+				naeval = NAsummery(structure=structure,sequence=sequence.seqlib,verbose=paramdict.get('verbose') == True)
+				naeval.Evaluate()
+
 #================================================================================================================================#
 # 					PLUGIN SPECIFIC DEFINITIONS BELOW THIS LINE						 #
 #================================================================================================================================#
@@ -94,6 +94,18 @@ DNAONE = ['G','C','T','A']
 RNATHREE = ['URI']
 RNAONE = ['U']
 
+def Structures(inputlist, models=None):
+
+	"""Yield (name, Structure) for every structure in the PDB files, models of an ensemble
+	   are named as the files written by PDBeditor SplitPDB"""
+	
+	for files, model, pdb in IterStructures(inputlist, models=models):
+		if model is None:
+			name = os.path.basename(files)
+		else:
+			name = ModelName(files, model)+'.pdb'
+		yield name, Structure(pdb)
+
 class CommandlineOptionParser:
 	
 	"""Parses command line arguments using optparse"""
@@ -113,12 +125,14 @@ class CommandlineOptionParser:
 		parser.add_option( "-f", "--file", action="callback", callback=self.varargs, dest="inputfile", type="string", help="Supply pdb inputfile(s)")
 		parser.add_option( "-n", "--NAsummery", action="store_true", dest="NAsummery", default=False, help="Print summery of nucleic acid structure data")
 		parser.add_option( "-s", "--sequence", action="store_true", dest="sequence", default=False, help="Return the sequence of all chains in the PDB")
+		parser.add_option( "-v", "--verbose", action="store_true", dest="verbose", default=False, help="Print the C5'-C5' distances of the segment detection")
 		
 		(options, args) = parser.parse_args()
 		
 		self.option_dict['input'] = options.inputfile
 		self.option_dict['NAsummery'] = options.NAsummery
 		self.option_dict['sequence'] = options.sequence
+		self.option_dict['verbose'] = options.verbose
 			
 		if not self.option_dict['input'] == None:
 			parser.remove_option('-f')
@@ -184,31 +198,14 @@ class GetSequence:
 	
 		self.seqlib = {}
 	
-	def GetSequence(self,pdbxml=None):
+	def GetSequence(self,structure=None):
 	 			
-		"""Append sequence and resid nr of all chains in pdb to seqlib"""
-		query = Xpath(pdbxml)
-		
-		query.Evaluate(query={1:{'element':'chain','attr':None}})
-		for chain in query.nodeselection[1]:
-			query.getAttr(node=chain,selection='ID',export='string')
-		chains = query.result
-		query.ClearResult()
-		
-		for chain in chains:
-			query.Evaluate(query={1:{'element':'chain','attr':{'ID':chain}},2:{'element':'resid','attr':None}})
-			for resid in query.nodeselection[2]:
-				query.getAttr(node=resid,selection=['ID','nr'])
-			residues = query.result 
-			resid = []
-			resnr = []
-			for residue in residues:
-				resid.append(residue[0])
-				resnr.append(residue[1])
+		"""Append resid nr and sequence of all chains in structure (system.Structure) to seqlib"""
+		for chain in structure.Chains():
+			residues = structure.Residues(chain)
 			self.seqlib[chain] = []	
-			self.seqlib[chain].append(resid)
-			self.seqlib[chain].append(resnr)
-			query.ClearResult()	
+			self.seqlib[chain].append(structure.ResidueNumbers(residues))
+			self.seqlib[chain].append(structure.ResidueNames(residues))
 
 	def FormatOutput(self):
 	
@@ -223,15 +220,15 @@ class NAsummery:
 
 	"""Evaluate the structure of a nucleic acid on: type, chains and pairing"""
 
-	def __init__(self,pdbxml=None,sequence=None):
+	def __init__(self,structure=None,sequence=None,verbose=False):
 		
-		self.pdbxml = pdbxml
+		self.structure = structure
 		self.sequence = sequence
+		self.verbose = verbose
 		
 		self.moltype = {}
 		self.chainlib = {}
 		self.pairs = {}
-		self.cutoff = []
 		
 	def Evaluate(self):
 	 	
@@ -304,36 +301,44 @@ class NAsummery:
 		print("    * Indentify segments for chain %s" % chainid)
 		print "    * Calculating same-strand C5' to C5' distance to extract segments from structure. Segment indentified"
 		print "      when C5'-C5' distance is larger than dynamic average + standard deviation + 1 = cutoff"
-		print "      Distance  Residue  Residue+1  Cutoff"
-		
-		query = Xpath(self.pdbxml)
-		query.Evaluate(query={1:{'element':'chain','attr':{'ID':chainid}},2:{'element':'resid','attr':None},3:{'element':'atom','attr':{'ID':"C5'"}}})
+		if self.verbose == True:
+			print "      Distance  Residue  Residue+1  Cutoff"
 		
-		for resid in query.nodeselection[2]:
-		 	query.getAttr(node=resid,selection='nr',export='string')
-		residues = query.result
-		query.ClearResult()
+		residues = self.structure.ResidueNumbers(self.structure.Residues(chainid))
+		atoms = self.structure.Coordinates(self.structure.Atoms(name="C5'",chain=chainid))
 		
-		for atom in query.nodeselection[3]:
-			query.getAttr(node=atom,selection=['corx','cory','corz'])
-		atoms = query.result
-		query.ClearResult()
+		"""All consecutive C5'-C5' distances in one array operation"""
+		steps = min(len(residues),len(atoms))-1
+		if steps > 0:
+			delta = atoms[1:steps+1]-atoms[:steps]
+			distances = sqrt((delta*delta).sum(axis=1)).tolist()
+		else:
+			distances = []	
 		
 		chain = []
 		self.chainlib[chainid] = []
+		count = 0
+		average = 0.0
+		sqdev = 0.0
 		for residue in range(len(residues)):
-			try:
-				distance = CalculateDistance(atoms[residue],atoms[residue+1])
-				cutoff = self._CalcCutoff(distance)
-				print("      %1.4f %6i %6i %15.4f" % (distance,(residues[residue]),(residues[residue+1]),cutoff)) 
-				if distance < cutoff:
-					chain.append(residues[residue])
-				else:
-					chain.append(residues[residue])
+			if residue < steps:
+				"""Running cutoff from the online (Welford) mean and variance of the segment distances"""
+				distance = distances[residue]
+				count += 1
+				shift = distance-average
+				average += shift/count
+				sqdev += shift*(distance-average)
+				cutoff = average+(sqdev/count)**0.5+1
+				if self.verbose == True:
+					print("      %1.4f %6i %6i %15.4f" % (distance,(residues[residue]),(residues[residue+1]),cutoff)) 
+				chain.append(residues[residue])
+				if not distance < cutoff:
 					self.chainlib[chainid].append(chain)
-					self.cutoff = []
+					count = 0
+					average = 0.0
+					sqdev = 0.0
 					chain = []
-			except:
+			else:
 				chain.append(residues[residue])
 				self.chainlib[chainid].append(chain)
 			
@@ -344,19 +349,6 @@ class NAsummery:
 			print("    * Identified %i segment(s):" % len(self.chainlib[chainid]))	
 			for chain in range(len(self.chainlib[chainid])):
 				print("      Segment %i range: %i to %i" % (chain+1,min(self.chainlib[chainid][chain]),max(self.chainlib[chainid][chain])))		
-		
-	def _CalcCutoff(self,distance):
-		
-		self.cutoff.append(distance)
-	
-		if len(self.cutoff) == 1:
-			cutoff = self.cutoff[0]+1
-		else:	
-			average = mean(self.cutoff)
-			stdev = std(self.cutoff)
-			cutoff = average+stdev+1
-		
-		return cutoff			
 	
 	def _FindPairs(self, chain):
 		
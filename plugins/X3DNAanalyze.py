@@ -26,7 +26,8 @@ Plugin function:	This plugin handels all 3DNA analysis routines. It requiers 3DN
 					statistical meaningfull data. This multistructure analysis routine 
 					can also be run without running the 3DNA analysis routines by 
 					either supplying the program with 3DNA .par files or .out files or 
-					a list file containing the names of the input files. 
+					a list file containing the names of the input files. Ensemble PDB
+					files are analysed model by model without splitting them first.
 Examples:			X3DNAanalyze -f *.pdb
 					X3DNAanalyze -f selection.list			
 Dependencies:		Standard python2.3 or higher modules, 3DNA
@@ -51,9 +52,10 @@ else:
 """Import DART specific modules"""
 from system.Utils import FileRootRename, TransformDash
 from system.IOlib import InputOutputControl
+from system.Archive import OpenInput, SplitExt
 from system.Constants import *
-from QueryPDB import GetSequence, NAsummery
-from PDBeditor import PDBeditor
+from QueryPDB import GetSequence, NAsummery, Structure
+from PDBeditor import PDBeditor, ModelFiles
 
 def PluginXML():
 	PluginXML = """ 
@@ -84,6 +86,7 @@ def PluginXML():
  <option type="deformener" form="checkbox" text="Select structures with the least number of unpairjng/mispairing events for multistructure analysis">False</option>
  <option type="multistructure" form="checkbox" text="Perform multistructure analysis">True</option>
  <option type="master" form="file" text="Provide a master file for multistructure analysis"></option>
+ <option type="verbose" form="checkbox" text="Verbose output">False</option>
 </parameters>"""
 	
 	return PluginXML
@@ -96,7 +99,7 @@ def PluginCore(paramdict, inputlist):
 	
 	if checked.checkedinput.has_key('.pdb'):
 		x3dna = X3DNAanalyze(paramdict)
-		x3dna.Run3DNA(checked.checkedinput['.pdb'])
+		checked.checkedinput['.pdb'] = x3dna.Run3DNA(checked.checkedinput['.pdb'])
 		checked.InputUpdate(".pdb",".out")
 		x3dna.RunEnerCalc(checked.checkedinput['.out'])
 		
@@ -107,7 +110,9 @@ def PluginCore(paramdict, inputlist):
 			print "    * WARNING: only 1 out file in input. Not performing multi-structure analysis"
 		elif len(checked.checkedinput['.out']) > 1:
 			print "    * Performing multistructure analysis on", len(checked.checkedinput['.out']), "parameter files" 
-			multiout = MultiStructureAnalysis(checked.checkedinput['.out'])
+			multiout = MultiStructureAnalysis(checked.checkedinput['.out'], verbose=paramdict.get('verbose') == True)
+			if checked.checkedinput.has_key('.pdb'):
+				multiout.ensembles = x3dna.ensembles
 			multiout.ReadOutfiles()
 			multiout.ReadEnerfiles()
 			if not paramdict['master'] == None:
@@ -160,6 +165,7 @@ class CommandlineOptionParser:
 		parser.add_option( "-e", "--deformener", action="store_true", dest="deformener", default=False, help="Selecting structures based on base-pair and base-pair step deformation energy")
 		parser.add_option( "-m", "--multistructure", action="store_true", dest="multistructure", default=False, help="Perform multistructure analysis")
 		parser.add_option( "-p", "--master", action="store", dest="master", help="Use sequence of given .out file as master sequence for multi-structure analysis")
+		parser.add_option( "-v", "--verbose", action="store_true", dest="verbose", default=False, help="Print the C5'-C5' distances of the segment detection")
 		
 		(options, args) = parser.parse_args()
 		
@@ -172,6 +178,7 @@ class CommandlineOptionParser:
 		self.option_dict['allbasepairs'] = options.allbasepairs
 		self.option_dict['multistructure'] = options.multistructure
 		self.option_dict['master'] = options.master
+		self.option_dict['verbose'] = options.verbose
 			
 		if not self.option_dict['input'] == None:
 			parser.remove_option('-f')
@@ -238,6 +245,7 @@ class X3DNAanalyze:
 	def __init__(self, paramdict=None):
 		
 		self.paramdict = paramdict
+		self.ensembles = {}
 	
 	def _ConstructOptionString(self):	
 
@@ -278,17 +286,23 @@ class X3DNAanalyze:
 
 	def Run3DNA(self, inputlist):
 
-		"""Running X3DNA analysis command"""
+		"""Running X3DNA analysis command. The models of an ensemble file are analysed one at a
+		   time, each written to a temporary PDB file named after the model. Returns the list
+		   of analysed structures"""
 		
 		self._ConstructOptionString()
 		
-		for files in inputlist:
+		structures = []
+		for ensemble, model, files in ModelFiles(inputlist):
+			structures.append(files)
+			if model is not None:
+				self.ensembles[os.path.splitext(os.path.basename(files))[0]] = (ensemble, model)
 			if self.paramdict['onlyinput'] == True:
 				print "--> Only running the 3DNA find_pair command thus only generating input file for 3DNA analysis routine for the file:", files
 				basename,extension = os.path.splitext(files)
 				outfile = basename+".inp"
 				files2 = os.path.split(files)[-1]
-				if files != files2:
+				if files != files2 and not os.path.exists(files2):
 				   os.system("/bin/ln -s %s" % files)
 				   files = files2
 				cmd = "find_pair "+(self.optionstring)+" "+(files)+" "+(outfile)
@@ -298,7 +312,7 @@ class X3DNAanalyze:
 				basename,extension = os.path.splitext(files)
 				outfile = basename+".curves"
 				files2 = os.path.split(files)[-1]
-				if files != files2:
+				if files != files2 and not os.path.exists(files2):
 				   os.system("/bin/ln -s %s" % files)
 				   files = files2
 				cmd = "find_pair "+(self.optionstring)+" "+(files)+" "+(outfile)
@@ -306,7 +320,7 @@ class X3DNAanalyze:
 			else:
 				print "--> Running both the 3DNA find_pair and analysis routine for the file:", files
 				files2 = os.path.split(files)[-1]
-				if files != files2:
+				if files != files2 and not os.path.exists(files2):
 				   os.system("ln -s %s" % files)
 				   files = files2
 				cmd = "find_pair "+(self.optionstring)+" "+(files)+" stdout | analyze"
@@ -321,6 +335,8 @@ class X3DNAanalyze:
 				else:
 					pass 
 		self._CleanUp()
+		
+		return structures
 	
 	def RunEnerCalc(self,inputlist):
 	
@@ -340,9 +356,11 @@ class MultiStructureAnalysis:
 	with a similar sequence and unique structures
 	"""
 	
-	def __init__(self, outfiles=None):
+	def __init__(self, outfiles=None, verbose=False):
 		
 		self.outfiles = outfiles
+		self.verbose = verbose
+		self.ensembles = {}		# structure name: (ensemble file, model number)
 		self.origin = {}		
 		self.pairs = {}
 		self.bp = {}
@@ -786,7 +804,7 @@ class MultiStructureAnalysis:
 		strand2 = re.compile("Strand II")
 		
 		for files in self.outfiles:
-			readfile = file(files,'r')
+			readfile = OpenInput(files)
 			lines = readfile.readlines()	
 			linecount = 1
 			countstart = []
@@ -885,8 +903,8 @@ class MultiStructureAnalysis:
 			pair = re.compile("Total Pair Energy")
 			steplines = []
 			pairlines = []
-			enefile = os.path.splitext(files)[0]+'.ener'
-			readfile = file(enefile,'r')
+			enefile = SplitExt(files)[0]+'.ener'
+			readfile = OpenInput(enefile)
 			lines = readfile.readlines()
 			
 			tlines = len(lines)
@@ -954,16 +972,20 @@ class MultiStructureAnalysis:
 		   more than two chains are not supported. The two chains must be written as 5'->3' for 
 		   the template strand (first list) and 3'->5' for the complementary strand (second list)"""
 		
-		master = os.path.splitext(os.path.basename(self.outfiles[0]))[0]+'.pdb'
+		master = os.path.splitext(os.path.basename(self.outfiles[0]))[0]
 		
-		pdb = PDBeditor()
-		pdb.ReadPDB(master)	
-		xml = pdb.PDB2XML().xml()
+		if self.ensembles.has_key(master) and not os.path.isfile(master+'.pdb'):
+			ensemble, model = self.ensembles[master]
+			model, pdb = PDBeditor().IterModels(ensemble, models=[model]).next()
+		else:
+			pdb = PDBeditor()
+			pdb.ReadPDB(master+'.pdb')	
+		structure = Structure(pdb)
 		
 		sequence = GetSequence()
-		sequence.GetSequence(pdbxml=xml)
+		sequence.GetSequence(structure=structure)
 		
-		naeval = NAsummery(pdbxml=xml,sequence=sequence.seqlib)
+		naeval = NAsummery(structure=structure,sequence=sequence.seqlib,verbose=self.verbose)
 		naeval.Evaluate()	
 		
 		self.basemoltype = naeval.moltype
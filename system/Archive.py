@@ -0,0 +1,195 @@
+#!/usr/bin/env python2.7
+
+USAGE = """
+==========================================================================================
+
+Author:               3D-DART contributors
+Copyright (C):        2026 (DART project)
+DART version:         1.3 development (19-10-2026)
+DART system module:   Archive.py
+Module function:      Transparent reading of compressed input files and archive members.
+                      gzip (.gz) and bzip2 (.bz2) files are decompressed while they are
+                      read, the members of zip and tar archives (also .tar.gz/.tgz and
+                      .tar.bz2) are read directly from the archive. Nothing is extracted
+                      to disk. A member is addressed by the path of the archive followed
+                      by the member name: ensembles.zip/model_1.pdb. ExpandInput replaces
+                      archives in an input list by their members. File types are taken
+                      from the extension before the compression suffix (SplitExt), so
+                      model_1.pdb.gz is a .pdb file.
+Examples:             Archive.py ensembles.tar.gz
+Dependencies:         Standard python2.7 (gzip, bz2, zipfile, tarfile)
+
+==========================================================================================
+"""
+
+"""Import modules"""
+import os, sys, gzip, bz2, zipfile, tarfile, cStringIO
+
+COMPRESSION = {'.gz':gzip.GzipFile, '.bz2':bz2.BZ2File}
+ARCHIVEEXT = ['.zip', '.tar', '.tgz', '.tar.gz', '.tbz2', '.tar.bz2']
+
+"""Open archives by process and path, members of an input list are read from the same
+   archive object. Worker processes open their own, a shared file offset is not safe.
+   Long running processes (the DART server) close them with Close"""
+ARCHIVES = {}
+
+def SplitExt(filename):
+
+	"""os.path.splitext looking through a compression suffix: model.pdb.gz -> (model, .pdb)"""
+
+	root, extension = os.path.splitext(filename)
+	if extension.lower() in COMPRESSION:
+		root, extension = os.path.splitext(root)
+
+	return root, extension
+
+def IsCompressed(filename):
+
+	return os.path.splitext(filename)[1].lower() in COMPRESSION
+
+def IsArchive(filename):
+
+	"""True for zip and tar archives (by extension)"""
+
+	return isinstance(filename, basestring) and filename.lower().endswith(tuple(ARCHIVEEXT))
+
+def ArchivePath(filename):
+
+	"""Split the path of an archive member in (archive, member name), None if filename is not
+	   inside an archive"""
+
+	archive = filename
+	while archive and not os.path.isfile(archive):
+		parent = os.path.dirname(archive)
+		if parent == archive:
+			return None
+		archive = parent
+
+	if archive and not archive == filename and IsArchive(archive):
+		return archive, filename[len(archive):].lstrip('/')
+
+	return None
+
+def _Archive(archive):
+
+	"""Open zip or tar archive, cached by process, path and modification time"""
+
+	key = (os.getpid(), os.path.abspath(archive), os.path.getmtime(archive))
+	if not ARCHIVES.has_key(key):
+		Close(archive)		# A modified archive replaces the one opened before
+		if zipfile.is_zipfile(archive):
+			ARCHIVES[key] = zipfile.ZipFile(archive, 'r')
+		else:
+			ARCHIVES[key] = tarfile.open(archive, 'r:*')
+
+	return ARCHIVES[key]
+
+def Close(archive=None):
+
+	"""Close the archives opened by this process, only those at the path of archive if given"""
+
+	for key in ARCHIVES.keys():
+		if key[0] == os.getpid() and (archive is None or key[1] == os.path.abspath(archive)):
+			ARCHIVES.pop(key).close()
+
+def Members(archive):
+
+	"""Names of the regular files in a zip or tar archive in archive order"""
+
+	opened = _Archive(archive)
+	if isinstance(opened, zipfile.ZipFile):
+		return [info.filename for info in opened.infolist() if not info.filename.endswith('/')]
+
+	return [member.name for member in opened.getmembers() if member.isfile()]
+
+def ExpandInput(inputlist):
+
+	"""Replace the archives in a list of input files by the paths of their members"""
+
+	expanded = []
+	for files in inputlist:
+		if IsArchive(files) and os.path.isfile(files):
+			expanded.extend([os.path.join(files, member) for member in Members(files)])
+		else:
+			expanded.append(files)
+
+	return expanded
+
+def InputExists(filename):
+
+	"""True for existing files and archive members"""
+
+	if os.path.isfile(filename):
+		return True
+
+	member = ArchivePath(filename)
+	if member is None:
+		return False
+
+	try:
+		return member[1] in Members(member[0])
+	except (IOError, OSError, zipfile.BadZipfile, tarfile.TarError):
+		return False
+
+def InputSize(filename):
+
+	"""Size in bytes of a file or (uncompressed) archive member"""
+
+	member = ArchivePath(filename)
+	if member is None:
+		return os.path.getsize(filename)
+
+	opened = _Archive(member[0])
+	if isinstance(opened, zipfile.ZipFile):
+		return opened.getinfo(member[1]).file_size
+
+	return opened.getmember(member[1]).size
+
+def IsPlain(filename):
+
+	"""True if filename is an uncompressed file on disk that can be read by byte offset"""
+
+	return os.path.isfile(filename) and not IsCompressed(filename)
+
+def OpenInput(filename, mode='r'):
+
+	"""Open a plain or compressed file or an archive member for reading. Returns a file like
+	   object that can be read or iterated line by line"""
+
+	member = ArchivePath(filename)
+	if member is None:
+		if IsCompressed(filename):
+			return COMPRESSION[os.path.splitext(filename)[1].lower()](filename, 'rb')
+		return open(filename, mode)
+
+	archive, name = member
+	opened = _Archive(archive)
+	try:
+		if isinstance(opened, zipfile.ZipFile):
+			stream = opened.open(name)
+		else:
+			stream = opened.extractfile(name)
+	except KeyError:
+		raise IOError(2, "No such file or directory in archive", filename)
+	if stream is None:
+		raise IOError(21, "Not a regular file in archive", filename)
+
+	"""Compressed members are decompressed in memory, the member streams can not seek"""
+	if IsCompressed(name):
+		data = stream.read()
+		if name.lower().endswith('.bz2'):
+			return cStringIO.StringIO(bz2.decompress(data))
+		return gzip.GzipFile(name, 'rb', fileobj=cStringIO.StringIO(data))
+
+	return stream
+
+if __name__ == '__main__':
+
+	"""List the members of archives as DART reads them"""
+
+	if len(sys.argv) < 2:
+		print USAGE
+		sys.exit(0)
+
+	for files in ExpandInput(sys.argv[1:]):
+		print files
@@ -0,0 +1,216 @@
+#!/usr/bin/env python2.7
+
+USAGE = """
+==========================================================================================
+
+Author:               3D-DART contributors
+Copyright (C):        2026 (DART project)
+DART version:         1.3 development (19-10-2026)
+DART system module:   AtomTable.py
+Module function:      Columnar in-memory representation of the atom records of a PDB
+                      file. Every PDB field is stored as one NumPy array with one row
+                      per ATOM, HETATM or (chain break) TER record, coordinates as a
+                      (N,3) float array. Row selection, concatenation and conversion
+                      back to Python lists are provided; the PDB specific logic lives
+                      in the PDBeditor plugin. A ResidueIndex maps residues to their
+                      rows and atom names within a residue to a row, so single residue
+                      and atom lookups do not scan the table.
+Dependencies:         NumPy
+
+==========================================================================================
+"""
+
+"""Import modules"""
+import numpy
+
+"""Atom table columns and their NumPy types, coordinates are stored separately"""
+COLUMNS = [('label','S6'),		# record name: ATOM, HETATM or TER
+           ('atnum','i4'),		# atom serial number
+           ('atname','S4'),		# atom name
+           ('atalt','S1'),		# alternate location indicator
+           ('resname','S4'),		# residue name (including column 21)
+           ('chain','S1'),		# chain identifier
+           ('resnum','i4'),		# residue sequence number
+           ('resext','S1'),		# insertion code
+           ('occ','f8'),		# occupancy
+           ('b','f8'),			# temperature factor
+           ('hdoc_chain','S1'),		# segment identifier (column 73)
+           ('elem','S2')]		# element symbol
+
+class AtomTable:
+
+	"""Column store of PDB atom records. Columns are NumPy arrays named after COLUMNS, the
+	   coordinates are in coord (N,3) and the unparsed record of HETATM rows in line"""
+
+	def __init__(self, natoms=0):
+
+		for name, dtype in COLUMNS:
+			setattr(self, name, numpy.zeros(natoms, dtype=dtype))
+		self.coord = numpy.zeros((natoms,3), dtype='f8')
+		self.line = numpy.empty(natoms, dtype=object)
+
+	def __len__(self):
+
+		return len(self.atnum)
+
+	def Fill(self, columns, coord, line=None):
+
+		"""Fill the table from a dictionary of equal length Python lists with one list per
+		   column, a list of (x,y,z) tuples and optionally a list of raw records"""
+
+		for name, dtype in COLUMNS:
+			setattr(self, name, numpy.array(columns[name], dtype=dtype))
+		self.coord = numpy.array(coord, dtype='f8').reshape((len(self.atnum),3))
+		self.line = numpy.empty(len(self.atnum), dtype=object)
+		if line is not None:
+			self.line[:] = line
+
+		return self
+
+	def Take(self, index):
+
+		"""Return a new table with the rows selected by an index array or boolean mask"""
+
+		table = AtomTable()
+		for name, dtype in COLUMNS:
+			setattr(table, name, getattr(self, name)[index])
+		table.coord = self.coord[index]
+		table.line = self.line[index]
+
+		return table
+
+	def Moved(self, coord):
+
+		"""Return a table with the same columns and new (N,3) coordinates, the raw HETATM
+		   records get the new coordinates in columns 31-54"""
+
+		table = AtomTable()
+		for name, dtype in COLUMNS:
+			setattr(table, name, getattr(self, name))
+		table.coord = numpy.array(coord, dtype='f8').reshape((len(self),3))
+		table.line = self.line.copy()
+		for row in numpy.flatnonzero(self.label == 'HETATM').tolist():
+			line = self.line[row]
+			if line is not None:
+				table.line[row] = line[:30]+'%8.3f%8.3f%8.3f' % tuple(table.coord[row])+line[54:]
+
+		return table
+
+	def Lists(self, names=None):
+
+		"""Return the columns as dictionary of Python lists, used for record by record
+		   formatting where NumPy scalars are slow"""
+
+		if names is None:
+			names = [name for name, dtype in COLUMNS]
+
+		lists = {}
+		for name in names:
+			lists[name] = getattr(self, name).tolist()
+
+		return lists
+
+	def IsAtom(self):
+
+		"""Boolean mask of the ATOM and HETATM rows (no chain break TER rows)"""
+
+		return self.label != 'TER   '
+
+def Concatenate(tables):
+
+	"""Join a list of atom tables to one table"""
+
+	table = AtomTable()
+	if not len(tables):
+		return table
+
+	for name, dtype in COLUMNS:
+		setattr(table, name, numpy.concatenate([getattr(t, name) for t in tables]))
+	table.coord = numpy.concatenate([t.coord for t in tables])
+	table.line = numpy.concatenate([t.line for t in tables])
+
+	return table
+
+class ResidueIndex:
+
+	"""Index of the residues of an AtomTable. A residue is a run of ATOM/HETATM rows with the
+	   same chain ID, residue number and insertion code; residue i covers the rows start[i] to
+	   end[i]. (chain, resnum, resext) keys map to the residue, a key found more than once
+	   (the models of an ensemble) to the first. The (residue, atom name) to row map is built
+	   on first use. Update the index after editing these columns"""
+
+	def __init__(self, table=None):
+
+		self.table = AtomTable()
+		self.start = numpy.zeros(0, dtype=int)
+		self.end = numpy.zeros(0, dtype=int)
+		self.residues = {}
+		self._atoms = None
+
+		if table is not None:
+			self.Update(table)
+
+	def __len__(self):
+
+		return len(self.start)
+
+	def Update(self, table):
+
+		"""(Re)build the index from the columns of table"""
+
+		rows = numpy.flatnonzero(table.IsAtom())
+		new = numpy.ones(len(rows), dtype=bool)
+		new[1:] = rows[1:] != rows[:-1]+1
+		for column in (table.chain, table.resnum, table.resext):
+			values = column[rows]
+			new[1:] |= values[1:] != values[:-1]
+
+		first = numpy.flatnonzero(new)
+		self.table = table
+		self.start = rows[first]
+		self.end = rows[numpy.append(first[1:], len(rows))-1]+1
+
+		keys = zip(table.chain[self.start].tolist(), table.resnum[self.start].tolist(), table.resext[self.start].tolist())
+		self.residues = dict(zip(reversed(keys), xrange(len(keys)-1, -1, -1)))
+		self._atoms = None
+
+	def Residue(self, chain, resnum, resext=' '):
+
+		"""Residue number of (chain, resnum, resext) in the index or None"""
+
+		return self.residues.get((chain, resnum, resext))
+
+	def Slice(self, residue):
+
+		"""Rows of a residue as slice of the atom table"""
+
+		return slice(self.start[residue], self.end[residue])
+
+	def Chain(self, chain):
+
+		"""Index array of the residues of a chain"""
+
+		return numpy.flatnonzero(self.table.chain[self.start] == chain)
+
+	def Rows(self, residues):
+
+		"""Index array of the rows of the residues in an index array"""
+
+		residues = numpy.asarray(residues, dtype=int)
+		length = self.end[residues]-self.start[residues]
+		offset = numpy.arange(length.sum())-numpy.repeat(numpy.cumsum(length)-length, length)
+
+		return numpy.repeat(self.start[residues], length)+offset
+
+	def Atom(self, residue, name):
+
+		"""Row of the atom with (stripped) atom name name in a residue or None"""
+
+		if self._atoms is None:
+			rows = self.Rows(numpy.arange(len(self)))
+			owner = numpy.repeat(numpy.arange(len(self)), self.end-self.start)
+			names = numpy.char.strip(self.table.atname[rows])
+			keys = zip(owner.tolist(), names.tolist())
+			self._atoms = dict(zip(reversed(keys), reversed(rows.tolist())))
+
+		return self._atoms.get((residue, name))
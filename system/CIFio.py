@@ -0,0 +1,404 @@
+#!/usr/bin/env python2.7
+
+USAGE = """
+==========================================================================================
+
+Author:               3D-DART contributors
+Copyright (C):        2026 (DART project)
+DART version:         1.3 development (19-10-2026)
+DART system module:   CIFio.py
+Module function:      Streaming reader for the _atom_site loop of mmCIF files. The file is
+                      read line by line, only the loop rows are kept and only for blocks
+                      of CHUNK atoms at a time: the items used by DART are cut from every
+                      row and converted to columns with NumPy per block. The result is the
+                      same AtomTable as PDBio.ParsePDB returns for the PDB file of the
+                      structure: PDB atom and residue name justification, author chain
+                      IDs and residue numbers, a TER row at every change of chain ID and
+                      MODEL records for files with more than one model. HETATM rows get
+                      the PDB record as raw line. IterCIF reads the models of a file one
+                      at a time. Chain IDs of more than one character do not fit the PDB
+                      format, they are given a free one character chain ID for the whole
+                      file (ChainMap) and the new ID is reported as a warning.
+Dependencies:         NumPy, DART package (AtomTable, PDBio, Archive)
+
+==========================================================================================
+"""
+
+"""Import modules"""
+import re, operator
+import numpy
+from AtomTable import AtomTable, COLUMNS
+from Archive import SplitExt
+from PDBio import FormatRecords, JoinAtoms, Field, Justify, FloatColumn, IntColumn
+
+CHUNK = 65536		# Number of _atom_site rows converted to columns at once
+CIFEXT = ['.cif', '.mmcif']
+
+"""_atom_site items read for every atom table column, the first item present is used"""
+ATOMSITE = [('label', ['group_PDB'], 'ATOM'),
+            ('atnum', ['id'], '0'),
+            ('atname', ['auth_atom_id', 'label_atom_id'], ''),
+            ('atalt', ['label_alt_id'], ' '),
+            ('resname', ['auth_comp_id', 'label_comp_id'], ''),
+            ('chain', ['auth_asym_id', 'label_asym_id'], ''),
+            ('resnum', ['auth_seq_id', 'label_seq_id'], '0'),
+            ('resext', ['pdbx_PDB_ins_code'], ' '),
+            ('x', ['Cartn_x'], None),
+            ('y', ['Cartn_y'], None),
+            ('z', ['Cartn_z'], None),
+            ('occ', ['occupancy'], '1.00'),
+            ('b', ['B_iso_or_equiv'], '0.00'),
+            ('elem', ['type_symbol'], ''),
+            ('model', ['pdbx_PDB_model_num'], '1')]
+
+"""One character chain IDs given to longer mmCIF chain IDs, those least used in PDB files first"""
+CHAINIDS = '9876543210zyxwvutsrqponmlkjihgfedcbaZYXWVUTSRQPONMLKJIHGFEDCBA'
+
+"""CIF value: quoted string (the quote only ends before white space) or bare word"""
+TOKEN = re.compile(r"""'.*?'(?=\s|$)|".*?"(?=\s|$)|\S+""")
+
+def IsCIF(filename):
+
+	"""True if filename has an mmCIF extension, also when compressed (.cif.gz)"""
+
+	return isinstance(filename, basestring) and SplitExt(filename)[1].lower() in CIFEXT
+
+def _Tokens(line):
+
+	"""Split a line in values, quoted values keep their quotes (see _Unquote)"""
+
+	if not ("'" in line or '"' in line):
+		tokens = line.split()
+	else:
+		tokens = TOKEN.findall(line)
+
+	for position, token in enumerate(tokens):
+		if token.startswith('#'):
+			return tokens[:position]
+	return tokens
+
+def _Rows(readfile):
+
+	"""Iterate over the rows of the _atom_site loop of an mmCIF file. Yields the list of item
+	   names once, followed by one list of values per row. Rows may span lines and contain
+	   quoted or semicolon delimited text values. Only the current row is held in memory"""
+
+	state = None		# None, 'loop' while reading the item names of a loop, 'rows'
+	items = []
+	nitems = 0
+	pending = []
+	textfield = None
+
+	for line in readfile:
+
+		"""Common case first: one complete row per line"""
+		if state == 'rows' and textfield is None and not pending:
+			tokens = line.split()
+			if len(tokens) == nitems and not tokens[0][0] in '_#;\'"':
+				yield tokens
+				continue
+
+		if textfield is not None:
+			if not line.startswith(';'):
+				textfield.append(line.rstrip('\r\n'))
+				continue
+			tokens = ['\n'.join(textfield)]
+			textfield = None
+		elif line.startswith(';'):
+			textfield = [line[1:].rstrip('\r\n')]
+			continue
+		else:
+			stripped = line.strip()
+			if not stripped or stripped.startswith('#'):
+				continue
+
+			if stripped.startswith('_') or stripped.startswith('loop_') or stripped.startswith('data_'):
+				if state == 'rows':
+					return
+				if stripped.startswith('loop_'):
+					state = 'loop'
+					items = []
+				elif state == 'loop':
+					items.append(stripped.split()[0])
+				continue
+			tokens = None
+
+		"""First value after the item names of a loop"""
+		if state == 'loop':
+			if len(items) and items[0].startswith('_atom_site.'):
+				items = [item[len('_atom_site.'):] for item in items]
+				nitems = len(items)
+				yield items
+				state = 'rows'
+			else:
+				state = None
+		if not state == 'rows':
+			continue
+
+		if tokens is None:
+			tokens = _Tokens(stripped)
+		pending.extend(tokens)
+
+		while len(pending) >= nitems:
+			yield pending[:nitems]
+			pending = pending[nitems:]
+
+def _Length(field):
+
+	return (field != 0).sum(axis=1)
+
+def _Unquote(column):
+
+	"""Remove the quotes of the quoted values of a string column"""
+
+	field = Field(column)
+	quoted = (field[:,0] == 39) | (field[:,0] == 34)
+	if not quoted.any():
+		return column
+
+	length = _Length(field)
+	rows = numpy.flatnonzero(quoted & (length >= 2))
+	rows = rows[field[rows,length[rows]-1] == field[rows,0]]
+
+	field = field.copy()
+	field[rows,:-1] = field[rows,1:]
+	field[rows,length[rows]-2] = 0
+	field[rows,-1] = 0
+
+	return field.view('S%i' % field.shape[1]).ravel()
+
+def _Missing(column, default):
+
+	"""Replace the CIF unknown (?) and not applicable (.) values of a string column"""
+
+	missing = (column == '?') | (column == '.')
+	if missing.any():
+		column = column.astype('S%i' % max(column.itemsize, len(default), 1))
+		column[missing] = default
+
+	return column
+
+class ChainMap:
+
+	"""PDB chain IDs of the chain IDs of one mmCIF file. One character IDs are kept, longer
+	   IDs get a one character ID not used in the file so far. A one character ID that was
+	   already given to a longer ID is moved to a free ID as well, distinct chains are never
+	   merged"""
+
+	def __init__(self):
+
+		self.mapping = {}
+		self.used = set()
+
+	def _Free(self):
+
+		for chain in CHAINIDS:
+			if not chain in self.used:
+				return chain
+
+		raise ValueError("mmCIF file has more chains than there are one character chain IDs")
+
+	def Map(self, column):
+
+		"""Return the chain ID column with one character chain IDs"""
+
+		values, first, inverse = numpy.unique(column, return_index=True, return_inverse=True)
+		for n in numpy.argsort(first).tolist():
+			chain = values[n]
+			if self.mapping.has_key(chain):
+				continue
+			if len(chain) <= 1 and not chain in self.used:
+				self.mapping[chain] = chain
+			else:
+				self.mapping[chain] = self._Free()
+				print "    * WARNING: mmCIF chain ID '%s' is written as chain ID '%s'" % (chain, self.mapping[chain])
+			self.used.add(self.mapping[chain])
+
+		return numpy.array([self.mapping[chain] for chain in values.tolist()], dtype='S1')[inverse]
+
+def _Block(block, positions, chains):
+
+	"""Convert a block of _atom_site rows to atom table columns, coordinates, raw HETATM
+	   records and model numbers. Chain IDs are converted with the ChainMap chains"""
+
+	values = numpy.array(block, dtype='S')
+
+	raw = {}
+	for (name, items, default), position in zip(ATOMSITE, positions):
+		if position is None:
+			column = numpy.empty(len(block), dtype='S%i' % max(len(default), 1))
+			column.fill(default)
+		else:
+			column = _Missing(_Unquote(values[:,position]), default or '')
+		raw[name] = column
+
+	columns = {}
+	columns['label'] = Justify(raw['label'], 6)
+	columns['atnum'] = IntColumn(raw['atnum'])
+	columns['atalt'] = raw['atalt']
+	columns['resnum'] = IntColumn(raw['resnum'], 4)
+	columns['resext'] = raw['resext']
+	columns['occ'] = FloatColumn(raw['occ'], default=1.00)
+	columns['b'] = FloatColumn(raw['b'], default=0.00)
+	columns['hdoc_chain'] = numpy.zeros(len(block), dtype='S1')
+	columns['elem'] = Justify(raw['elem'], 2, right=True)
+
+	"""PDB justification: atom names start in column 14 unless the element has two letters or
+	   the name four characters, residue names are right justified in columns 18-20"""
+	atname = Field(Justify(raw['atname'], 4))
+	shift = (_Length(Field(raw['atname'])) < 4) & (_Length(Field(raw['elem'])) < 2)
+	atname[shift,1:] = atname[shift,:3]
+	atname[shift,0] = 32
+	columns['atname'] = atname.view('S4').ravel()
+
+	resname = Field(Justify(Justify(raw['resname'], 3, right=True), 4))
+	four = _Length(Field(raw['resname'])) > 3
+	resname[four] = Field(Justify(raw['resname'][four], 4))
+	columns['resname'] = resname.view('S4').ravel()
+
+	columns['chain'] = chains.Map(raw['chain'])
+
+	errors = {}
+	coord = numpy.empty((len(block),3), dtype='f8')
+	for axis, name in enumerate(('x', 'y', 'z')):
+		coord[:,axis] = FloatColumn(raw[name], error=lambda row: errors.setdefault(row, True))
+	for row in sorted(errors.keys()):
+		print "    * ERROR: coordinate error in _atom_site row:"
+		print "     ", ' '.join(block[row])
+	if len(errors):
+		coord[sorted(errors.keys())] = 0.0
+
+	"""HETATM records are written as read, give them their PDB record"""
+	rawline = numpy.empty(len(block), dtype=object)
+	hetatm = numpy.flatnonzero(columns['label'] == 'HETATM')
+	if len(hetatm):
+		table = AtomTable()
+		for name, dtype in COLUMNS:
+			setattr(table, name, columns[name][hetatm].astype(dtype))
+		table.coord = coord[hetatm]
+		rawline[hetatm] = [line.rstrip('\n') for line in FormatRecords(table).tolist()]
+
+	columns['length'] = numpy.zeros(len(block), dtype='i8')+80
+
+	return columns, coord, rawline, IntColumn(raw['model'])
+
+def _AtomSite(readfile):
+
+	"""Rows of the _atom_site loop, a function taking the used items from a row and the
+	   position of every ATOMSITE item in the taken values (None if not present). Returns
+	   None for a file without _atom_site loop"""
+
+	rows = _Rows(readfile)
+	try:
+		items = rows.next()
+	except StopIteration:
+		return None
+
+	present = []
+	positions = []
+	for name, names, default in ATOMSITE:
+		found = [items.index(item) for item in names if item in items]
+		if len(found):
+			positions.append(len(present))
+			present.append(found[0])
+		elif default is None:
+			raise ValueError("mmCIF _atom_site loop without _atom_site.%s" % names[0])
+		else:
+			positions.append(None)
+
+	return rows, operator.itemgetter(*present), positions
+
+def ParseCIF(readfile):
+
+	"""Parse the _atom_site loop of an mmCIF file given as open file or other iterable of
+	   lines. Returns the AtomTable and a dictionary with the header, title, footer, end and
+	   model lines as PDBio.ParsePDB, only model lines are filled. All models are in the one
+	   table, see IterCIF to read them one at a time. Raises ValueError for a file that
+	   can not be converted"""
+
+	records = {'header':[], 'title':[], 'footer':[], 'end':[], 'model':[]}
+
+	atomsite = _AtomSite(readfile)
+	if atomsite is None:
+		return AtomTable(), records
+	rows, take, positions = atomsite
+	chains = ChainMap()
+
+	parts = []
+	coords = []
+	rawlines = []
+	models = []
+
+	block = []
+	for row in rows:
+		block.append(take(row))
+		if len(block) == CHUNK:
+			columns, coord, rawline, model = _Block(block, positions, chains)
+			parts.append(columns)
+			coords.append(coord)
+			rawlines.append(rawline)
+			models.append(model)
+			block = []
+	if len(block):
+		columns, coord, rawline, model = _Block(block, positions, chains)
+		parts.append(columns)
+		coords.append(coord)
+		rawlines.append(rawline)
+		models.append(model)
+
+	if len(models):
+		model = numpy.concatenate(models)
+		first = numpy.concatenate(([True], model[1:] != model[:-1]))
+		if first.sum() > 1:
+			records['model'] = ["MODEL     %4i\n" % number for number in model[first].tolist()]
+
+	return JoinAtoms(parts, coords, rawlines), records
+
+def _Model(converted, block, positions, chains):
+
+	"""AtomTable of the converted blocks (columns, coordinates, raw records) of one model and
+	   the rows in block not converted yet"""
+
+	if len(block):
+		converted.append(_Block(block, positions, chains)[:3])
+
+	return JoinAtoms([part[0] for part in converted], [part[1] for part in converted],
+	                 [part[2] for part in converted])
+
+def IterCIF(readfile, models=None):
+
+	"""Iterate over the models of an mmCIF file (pdbx_PDB_model_num), one model parsed at a
+	   time. Yields (model number, AtomTable, records) as ParseCIF for every model, or for
+	   the models in the list models only. A file without model numbers is model 1"""
+
+	atomsite = _AtomSite(readfile)
+	if atomsite is None:
+		return
+	rows, take, positions = atomsite
+	modelitem = positions[-1]
+	chains = ChainMap()
+
+	number = None
+	value = None
+	converted = []
+	block = []
+	for row in rows:
+		values = take(row)
+		if modelitem is not None and not values[modelitem] == value:
+			if number is not None and (models is None or number in models):
+				yield number, _Model(converted, block, positions, chains), {'header':[], 'title':[], 'footer':[], 'end':[], 'model':[]}
+			value = values[modelitem]
+			number = int(IntColumn(numpy.array([value]))[0])
+			converted = []
+			block = []
+		elif number is None:
+			number = 1
+
+		if models is None or number in models:
+			block.append(values)
+			if len(block) == CHUNK:
+				converted.append(_Block(block, positions, chains)[:3])
+				block = []
+
+	if number is not None and (models is None or number in models):
+		yield number, _Model(converted, block, positions, chains), {'header':[], 'title':[], 'footer':[], 'end':[], 'model':[]}
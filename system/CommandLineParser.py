@@ -30,6 +30,7 @@ from Xpath import Xpath
 from optparse import *
 from time import ctime
 from Utils import GetFullPath,RenameFilepath
+from Archive import InputExists
 from DARTserver import WebServer
 from Constants import *
 
@@ -202,13 +203,12 @@ class CommandlineOptionParser:
 	
 		if not self.option_dict['input'] == None:
 			print "    * Check if all files supplied as input on the command line are present"
-			filelist = self.option_dict['input']
-			for files in filelist:
-				if os.path.isfile(files):
-					pass
+			filelist = []
+			for files in self.option_dict['input']:
+				if InputExists(files):
+					filelist.append(files)
 				else:
 					print "      - ERROR: the file:", files, "cannot be found it will be removed from the list"
-					filelist.remove(files)
 			
 			if len(filelist) == 0:
 				print "      - ERROR: the -f or --files command line argument was used but no valid files are available"
@@ -44,5 +44,21 @@ MAXMODELS   		= 250	                # Maximum number of models that the server w
 CLEANTIME		= 432000 		# Time before users results will be deleted from server, 5 days in seconds
 PYTHON			= '/usr/bin/env python2.7'
 FTP_LOCATION 		= ''
+FORMACTION		= 'http://localhost/cgi-bin/dart.py'	# URL the webform is submitted to
 SERVERCOUNTFILE		= ''
 
+#Server job scheduling (JobScheduler.py)
+MAXJOBS			= 4			# Maximum number of jobs running at the same time
+MAXUSERJOBS		= 2			# Maximum number of running jobs per user (authenticated user or remote address)
+MAXBULKJOBS		= 2			# Maximum number of running jobs larger than BULKMODELS
+BULKMODELS		= 50			# Jobs estimated above this number of models are bulk jobs
+MAXJOBMODELS		= 500			# Jobs estimated above this number of models are refused
+MAXCPUTIME		= 86400			# CPU time limit in seconds for every process of a job
+COSTWEIGHT		= 6.0			# Queue penalty in seconds per estimated model
+USERWEIGHT		= 6.0			# Queue penalty in seconds per model already running for the same user
+POLLTIME		= 2.0			# Seconds between checks of the job queue
+
+
+#Parsed structure cache (StructureCache.py)
+STRUCTURECACHE		= ''			# Cache directory (e.g. ~/.dart/structures), overruled by the DART_STRUCTURECACHE environment variable, empty disables the cache
+MAXCACHESIZE		= 512			# Maximum size of the structure cache in MB, least recently used structures are removed first
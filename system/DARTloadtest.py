@@ -0,0 +1,604 @@
+#!/usr/bin/env python2.7
+
+USAGE = """
+==========================================================================================
+
+Author:               3D-DART contributors
+Copyright (C):        2026 (DART project)
+DART version:         1.3 development (19-10-2026)
+DART system module:   DARTloadtest.py
+Module function:      Load generator for a locally running DART web service. A number of
+                      concurrent clients send a weighted mix of requests:
+                      - view   GET the NAensemblebuild webform
+                      - small  POST an analysis only job (PDBeditor, X3DNAanalyze and
+                               NABendAnalyze on the uploaded structure)
+                      - large  POST a model building job of --models models on a zip
+                               archive of the --ensemble structures
+                      The 3DNA binaries are replaced by stubs that sleep for a configured
+                      time and write canned B-DNA output in the 3DNA file formats, so the
+                      analysis, modeling and building plugins do their normal work on it.
+                      With --serve the DARTwsgi application is started on the given port
+                      with the stubs first in the PATH. To test another server setup of
+                      the DARTwsgi application (gunicorn worker pool) start it with the
+                      stub directory printed by --stubs first in the PATH and use --url.
+                      Reports throughput, latency percentiles and error rates per request
+                      type as plain text or JSON. Requests that fail at the HTTP level are
+                      counted as errors. The state of a submitted job is read from the
+                      status of the job (X-DART-Job response header and /status), jobs
+                      that did not finish are counted as job errors.
+Examples:             DARTloadtest.py --serve 8080 --clients 8 --requests 200
+                      DARTloadtest.py --stubs /tmp/dartstubs --sleep 0.5
+                      DARTloadtest.py --url http://localhost:8000/ --duration 300 --mix view=10,small=5,large=1
+Dependencies:         Standard python modules
+
+==========================================================================================
+"""
+
+"""Import modules"""
+import os, sys, glob, time, math, json, random, zipfile, threading, tempfile, subprocess, urllib2, httplib, StringIO
+from optparse import OptionParser
+from ServerMetrics import Percentile, PERCENTILES
+
+"""3DNA binaries called by the DART plugins. The stubs of find_pair, analyze, rebuild and fiber
+   write canned output in the file formats of 3DNA, the others only take their time"""
+STUBS = ['find_pair', 'analyze', 'fiber', 'rebuild', 'cp_std', 'std_base', 'EnergyPDNA.exe']
+WORKFLOW = 'NAensemblebuild'
+
+STUBSCRIPT = """#!%s
+# DART load test stub for the 3DNA %s binary
+import sys
+sys.path.insert(0, %r)
+from DARTloadtest import RunStub
+RunStub(%r, sys.argv[1:], %r)
+"""
+
+"""Base names, complementary bases and canned (mean, spread) of the base-pair, base-pair step
+   and helical parameters of B-DNA written by the stubs"""
+BASES = {'ADE':'A', 'THY':'T', 'GUA':'G', 'CYT':'C', 'URI':'U'}
+COMPLEMENT = {'A':'T', 'T':'A', 'G':'C', 'C':'G', 'U':'A'}
+BPPARAMS = [(0.0, 0.2), (-0.1, 0.1), (0.0, 0.2), (0.0, 5.0), (-12.0, 4.0), (0.0, 3.0)]
+STEPPARAMS = [(0.0, 0.3), (0.0, 0.3), (3.38, 0.1), (0.0, 2.0), (0.0, 4.0), (36.0, 3.0)]
+HELICALPARAMS = [(0.0, 0.5), (0.0, 0.5), (3.38, 0.1), (0.0, 3.0), (0.0, 3.0), (36.0, 3.0)]
+ORIGINPARAMS = [(0.0, 1.0), (0.0, 1.0), (0.0, 10.0), (0.0, 0.1), (0.0, 0.1), (1.0, 0.01)]
+LAMBDAPARAMS = [(54.0, 2.0), (54.0, 2.0), (10.5, 0.1), (8.9, 0.1), (9.8, 0.1)]
+GROOVEPARAMS = [(11.5, 0.5), (11.5, 0.5), (17.0, 0.5), (17.0, 0.5)]
+GLOBALPARAMS = [(0.5, 0.2), (2.0, 1.0), (36.0, 3.0), (3.38, 0.1)]
+TORSIONPARAMS = [(-60.0, 10.0), (180.0, 10.0), (60.0, 10.0), (130.0, 10.0), (-170.0, 10.0), (-100.0, 10.0), (-110.0, 10.0)]
+SUGARPARAMS = [(-30.0, 5.0), (40.0, 5.0), (-35.0, 5.0), (20.0, 5.0), (5.0, 5.0), (40.0, 3.0), (160.0, 10.0)]
+VIRTUALPARAMS = [(6.8, 0.2), (4.9, 0.2), (6.8, 0.2), (4.9, 0.2)]
+RADIUSPARAMS = [(8.9, 0.2), (7.8, 0.2), (5.9, 0.2), (8.9, 0.2), (7.8, 0.2), (5.9, 0.2)]
+POSITIONPARAMS = [(0.0, 1.0), (0.0, 1.0), (0.0, 10.0), (0.0, 0.1), (0.0, 0.1), (1.0, 0.01)]
+
+def _Residues(pdbfile):
+
+	"""Return the (chain, residue number, residue name) of the residues in a PDB file"""
+
+	residues = []
+	for line in open(pdbfile):
+		if line.startswith(('ATOM  ', 'HETATM')):
+			residue = (line[21], line[22:26].strip(), line[17:20].strip())
+			if not len(residues) or not residues[-1] == residue:
+				residues.append(residue)
+	return residues
+
+def _Base(resname):
+
+	return BASES.get(resname, resname[-1:] or 'N')
+
+def _Pairs(residues):
+
+	"""Pair the residues as a duplex: the first chain with the reversed second chain or, for a
+	   single chain, the first half with the reversed second half"""
+
+	chains = []
+	for residue in residues:
+		if not len(chains) or not chains[-1][0][0] == residue[0]:
+			chains.append([])
+		chains[-1].append(residue)
+
+	if len(chains) > 1:
+		strand1, strand2 = chains[0], chains[1][::-1]
+	else:
+		half = len(residues)/2
+		strand1, strand2 = residues[:half], residues[half:2*half][::-1]
+
+	return zip(strand1, strand2)
+
+def _Values(pairs, params, seed):
+
+	"""Canned parameters, the same for every call with the same pairs"""
+
+	generator = random.Random(seed+''.join([_Base(pair[0][2]) for pair in pairs]))
+	return [[generator.gauss(mean, spread) for mean, spread in params] for pair in pairs]
+
+def _Table(out, header, names, values, extra=''):
+
+	"""Write a numbered table of the analyze output, closed by a ~ line as read by X3DNAanalyze"""
+
+	out.write(header+"\n")
+	for n in range(len(values)):
+		out.write("%4i %-6s" % (n+1, names[n])+"".join(["%10.2f" % value for value in values[n]])+extra+"\n")
+	out.write("          "+"~"*70+"\n")
+	out.write("****************************************************************************\n")
+
+def _WritePar(parfile, pairs, bpvalues, stepvalues):
+
+	out = open(parfile, 'w')
+	out.write("%5i # base-pairs\n" % len(pairs))
+	out.write("    0 # ***local base-pair & step parameters***\n")
+	out.write("#        Shear    Stretch   Stagger   Buckle   Prop-Tw   Opening     Shift     Slide     Rise      Tilt      Roll      Twist\n")
+	for n in range(len(pairs)):
+		if n == 0:
+			step = [0.0]*6
+		else:
+			step = stepvalues[n-1]
+		out.write("%s-%s " % (_Base(pairs[n][0][2]), _Base(pairs[n][1][2]))+"".join(["%10.3f" % value for value in bpvalues[n]+step])+"\n")
+	out.close()
+
+def _ReadPar(parfile):
+
+	"""Return the base-pairs of a 3DNA parameter file as (base, complementary base)"""
+
+	return [tuple(line.split()[0].split('-')) for line in open(parfile).readlines()[3:] if len(line.split())]
+
+def _WriteStructure(pdbfile, pairs):
+
+	"""Write a base-pair per step of an ideal helix: P, C1' and a base atom per nucleotide,
+	   strand I as chain A and strand II as chain B"""
+
+	atoms = [('P', 8.9, 0.0), ("C1'", 5.9, 20.0), ('N1', 3.0, 40.0)]
+	lines = []
+	for strand, chain, sign in ((0, 'A', 1), (1, 'B', -1)):
+		for n in range(len(pairs)):
+			resnum = n+1
+			if strand == 1:
+				resnum = 2*len(pairs)-n
+			for name, radius, phase in atoms:
+				angle = math.radians(36.0*n+sign*phase+strand*180.0)
+				lines.append("ATOM  %5i %-4s %3s %s%4i    %8.3f%8.3f%8.3f  1.00  0.00\n" % (len(lines)+1, ' '+name,
+				             pairs[n][strand], chain, resnum, radius*math.cos(angle), radius*math.sin(angle), 3.38*n))
+		lines.append("TER\n")
+	lines.append("END\n")
+
+	out = open(pdbfile, 'w')
+	out.writelines(lines)
+	out.close()
+
+def _FindPair(args):
+
+	"""find_pair [options] pdbfile outfile: the 3DNA analyze input, outfile may be stdout"""
+
+	pdbfile, outfile = args[-2], args[-1]
+	pairs = _Pairs(_Residues(pdbfile))
+
+	lines = ["%s\n" % pdbfile, "%s.out\n" % os.path.splitext(os.path.basename(pdbfile))[0],
+	         "    2         # duplex\n", "%5i         # number of base-pairs\n" % len(pairs),
+	         "    1     1    # explicit bp numbering/hetero atoms\n"]
+	for n in range(len(pairs)):
+		lines.append("%5i %5i   0 # %4i | %s:%s_:[%s]-----[%s]:%s_:%s\n" % (n+1, 2*len(pairs)-n, n+1, pairs[n][0][0],
+		             pairs[n][0][1], pairs[n][0][2], pairs[n][1][2], pairs[n][1][1], pairs[n][1][0]))
+
+	if outfile == 'stdout':
+		sys.stdout.writelines(lines)
+	else:
+		out = open(outfile, 'w')
+		out.writelines(lines)
+		out.close()
+
+def _Analyze(args):
+
+	"""analyze [inputfile]: the .out file and parameter files of the structure named in the
+	   find_pair input read from inputfile or stdin"""
+
+	if len(args):
+		lines = open(args[-1]).readlines()
+	else:
+		lines = sys.stdin.readlines()
+	pdbfile, outfile = lines[0].strip(), lines[1].strip()
+
+	pairs = _Pairs(_Residues(pdbfile))
+	bpvalues = _Values(pairs, BPPARAMS, 'bp')
+	stepvalues = _Values(pairs[1:], STEPPARAMS, 'step')
+	helicalvalues = _Values(pairs[1:], HELICALPARAMS, 'helical')
+
+	bases = [(_Base(pair[0][2]), _Base(pair[1][2])) for pair in pairs]
+	bpnames = ["%s-%s" % base for base in bases]
+	stepnames = ["%s%s/%s%s" % (bases[n][0], bases[n+1][0], bases[n+1][1], bases[n][1]) for n in range(len(bases)-1)]
+
+	out = open(outfile, 'w')
+	out.write("****************************************************************************\n")
+	out.write("DART load test stub of the 3DNA analyze program, canned B-DNA parameters\n")
+	out.write("****************************************************************************\n")
+	out.write("File name: %s\n\n" % pdbfile)
+	out.write("Number of base-pairs: %i\n" % len(pairs))
+	out.write("****************************************************************************\n")
+	out.write("RMSD of the bases (----- for WC bp, + for isolated bp, x for helix change)\n\n")
+	out.write("            Strand I                    Strand II          Helix\n")
+	for n in range(len(pairs)):
+		first, second = pairs[n]
+		out.write("%4i   (0.010) %s:%s_:[%s]%s-----%s[%s]:%s_:%s (0.010)     |\n" % (n+1, first[0].strip() or '-',
+		          first[1].rjust(4, '.'), first[2].rjust(3, '.'), bases[n][0], bases[n][1], second[2].rjust(3, '.'),
+		          second[1].rjust(4, '.'), second[0].strip() or '-'))
+	out.write("****************************************************************************\n")
+	_Table(out, "Origin (Ox, Oy, Oz) and mean normal vector (Nx, Ny, Nz) of each base-pair\n"
+	       "    bp        Ox        Oy        Oz        Nx        Ny        Nz", bpnames, _Values(pairs, ORIGINPARAMS, 'origin'))
+	_Table(out, "Local base-pair parameters\n    bp        Shear    Stretch   Stagger    Buckle  Propeller  Opening", bpnames, bpvalues)
+	_Table(out, "Local base-pair step parameters\n    step       Shift     Slide      Rise      Tilt      Roll     Twist", stepnames, stepvalues)
+	_Table(out, "Local base-pair helical parameters\n    step       X-disp    Y-disp   h-Rise     Incl.       Tip   h-Twist", stepnames, helicalvalues)
+	_Table(out, "Lambda and C1'-C1', RN9-YN1, RC8-YC6 distances of each base-pair\n"
+	       "    bp     lambda(I) lambda(II)  C1'-C1'   RN9-YN1   RC8-YC6", bpnames, _Values(pairs, LAMBDAPARAMS, 'lambda'))
+	_Table(out, "Minor and major groove widths\n                   Minor Groove        Major Groove\n"
+	       "                 P-P     Refined     P-P     Refined", stepnames, _Values(pairs[1:], GROOVEPARAMS, 'groove'))
+	_Table(out, "Global parameters based on C1'-C1' vectors\n    bp       disp.    angle     twist      rise", bpnames,
+	       _Values(pairs, GLOBALPARAMS, 'global'))
+	for strand in (0, 1):
+		names = [base[strand] for base in bases]
+		_Table(out, "Main chain and chi torsion angles\nStrand %s\n"
+		       "  base    alpha    beta   gamma   delta  epsilon   zeta    chi" % ('I', 'II')[strand], names,
+		       _Values(pairs, TORSIONPARAMS, 'torsion%i' % strand))
+		_Table(out, "Sugar conformational parameters\nStrand %s\n"
+		       "  base       v0      v1      v2      v3      v4      tm       P    Puckering" % ('I', 'II')[strand], names,
+		       _Values(pairs, SUGARPARAMS, 'sugar%i' % strand), "    C2'-endo")
+	virtual = _Values(pairs[1:], VIRTUALPARAMS, 'virtual')
+	out.write("Same strand P--P and C1'--C1' virtual bond distances\n")
+	out.write("          base      P--P     C1'-C1'        base      P--P     C1'-C1'\n")
+	for n in range(len(virtual)):
+		out.write("%4i %s/%s  %10.2f%10.2f%6i %s/%s  %10.2f%10.2f\n" % (n+1, bases[n][0], bases[n+1][0], virtual[n][0],
+		          virtual[n][1], n+1, bases[n][1], bases[n+1][1], virtual[n][2], virtual[n][3]))
+	out.write("          "+"~"*70+"\n")
+	out.write("****************************************************************************\n")
+	_Table(out, "Helix radius (radial displacement of P, O4', and C1' atoms in local helix frame of each dimer)\n"
+	       "    step         P        O4'       C1'        P        O4'        C1'", stepnames, _Values(pairs[1:], RADIUSPARAMS, 'radius'))
+	_Table(out, "Position (Px, Py, Pz) and local helical axis vector (Hx, Hy, Hz) for each dinucleotide step\n"
+	       "    bp        Px        Py        Pz        Hx        Hy        Hz", stepnames, _Values(pairs[1:], POSITIONPARAMS, 'position'))
+	out.close()
+
+	_WritePar('bp_step.par', pairs, bpvalues, stepvalues)
+	_WritePar('bp_helical.par', pairs, bpvalues, helicalvalues)
+	for name in ('auxiliary.par', 'cf_7methods.par', 'ref_frames.dat'):
+		out = open(name, 'w')
+		out.write("# DART load test stub output of the 3DNA analyze program\n")
+		out.close()
+
+def _Rebuild(args):
+
+	"""rebuild [options] parfile pdbfile"""
+
+	_WriteStructure(args[-1], _ReadPar(args[-2]))
+
+def _Fiber(args):
+
+	"""fiber [option] pdbfile, the structure type, sequence and repeats are read from stdin"""
+
+	answers = [line.strip() for line in sys.stdin.readlines() if len(line.strip())]
+	sequence = answers[1].upper()*int(answers[2])
+	_WriteStructure(args[-1], [(base, COMPLEMENT.get(base, 'N')) for base in sequence])
+
+def RunStub(binary, args, sleep=1.0):
+
+	"""Run the stub of a 3DNA binary: sleep DART_STUB_SLEEP seconds, default given by sleep,
+	   and write the canned output of the binary"""
+
+	time.sleep(float(os.environ.get('DART_STUB_SLEEP', sleep)))
+
+	stubs = {'find_pair':_FindPair, 'analyze':_Analyze, 'rebuild':_Rebuild, 'fiber':_Fiber}
+	if stubs.has_key(binary):
+		stubs[binary](args)
+
+def MakeStubs(stubdir, sleep=1.0):
+
+	"""Write executable stand-ins for the 3DNA binaries to stubdir, see RunStub"""
+
+	if not os.path.isdir(stubdir):
+		os.makedirs(stubdir)
+
+	for binary in STUBS:
+		stub = os.path.join(stubdir, binary)
+		outfile = open(stub, 'w')
+		outfile.write(STUBSCRIPT % (sys.executable, binary, os.path.dirname(os.path.abspath(__file__)), binary, sleep))
+		outfile.close()
+		os.chmod(stub, 0755)
+
+	return stubdir
+
+def StartServer(DARTDIR, port, stubdir):
+
+	"""Start the DARTwsgi test server with the 3DNA stubs first in the PATH and wait until
+	   it accepts requests. The server directories are created if needed"""
+
+	for directory in ('server-tmp', 'results'):
+		if not os.path.isdir(os.path.join(DARTDIR, directory)):
+			os.mkdir(os.path.join(DARTDIR, directory))
+	for name in ('readme.txt', 'Joblist.txt'):
+		if not os.path.isfile(os.path.join(DARTDIR, 'server-tmp', name)):
+			open(os.path.join(DARTDIR, 'server-tmp', name), 'w').close()
+
+	env = dict(os.environ)
+	env['PATH'] = stubdir+os.pathsep+env.get('PATH', '')
+	server = subprocess.Popen([sys.executable, os.path.join(DARTDIR, 'system', 'DARTwsgi.py'), str(port)], env=env,
+	                          stdout=open(os.devnull, 'w'), stderr=subprocess.STDOUT)
+
+	url = "http://localhost:%i/" % port
+	for attempt in range(100):
+		try:
+			urllib2.urlopen(url+'metrics', timeout=5).read()
+			return server, url
+		except (urllib2.URLError, IOError):
+			if server.poll() is not None:
+				break
+			time.sleep(0.2)
+
+	server.kill()
+	raise IOError("DART test server did not start on port %i" % port)
+
+def Multipart(fields, files):
+
+	"""Encode form fields and files ({name:(filename,content)}) as multipart/form-data"""
+
+	boundary = '----DARTloadtest%i' % random.randint(0, 1000000000)
+	lines = []
+	for name in fields:
+		lines.append('--'+boundary)
+		lines.append('Content-Disposition: form-data; name="%s"' % name)
+		lines.append('')
+		lines.append(str(fields[name]))
+	for name in files:
+		lines.append('--'+boundary)
+		lines.append('Content-Disposition: form-data; name="%s"; filename="%s"' % (name, files[name][0]))
+		lines.append('Content-Type: application/octet-stream')
+		lines.append('')
+		lines.append(files[name][1])
+	lines.append('--'+boundary+'--')
+	lines.append('')
+
+	return '\r\n'.join(lines), 'multipart/form-data; boundary=%s' % boundary
+
+def ZipUpload(files):
+
+	"""Return a zip archive of the structure files as a string"""
+
+	archive = StringIO.StringIO()
+	zipped = zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED)
+	for structure in files:
+		zipped.write(structure, os.path.basename(structure))
+	zipped.close()
+
+	return archive.getvalue()
+
+def ParseMix(mix):
+
+	"""Parse a request mix 'view=5,small=3,large=1' to a list of (type, weight)"""
+
+	parsed = []
+	for item in mix.split(','):
+		name, weight = item.split('=')
+		if not name in ('view', 'small', 'large'):
+			raise ValueError("Unknown request type in mix: %s" % name)
+		parsed.append((name, float(weight)))
+	return parsed
+
+class LoadTest:
+
+	"""Send a weighted mix of requests to a DART server from concurrent clients and
+	   collect latencies"""
+
+	def __init__(self, url, mix=[('view', 5.0), ('small', 3.0), ('large', 1.0)], clients=4, requests=100,
+	             duration=None, pdb=None, ensemble=[], models=100, timeout=3600, seed=None):
+
+		self.url = url
+		self.mix = mix
+		self.clients = clients
+		self.requests = requests
+		self.duration = duration
+		self.models = models
+		self.timeout = timeout
+		self.random = random.Random(seed)
+
+		self.upload = ('struct.pdb', open(pdb, 'r').read())
+		self.ensemble = ('ensemble.zip', ZipUpload(ensemble))		# Model building needs several structures
+		self.results = []
+		self.issued = 0
+		self.lock = threading.Lock()
+		self.walltime = 0.0
+
+	def _Choose(self):
+
+		pick = self.random.uniform(0, sum([weight for name, weight in self.mix]))
+		for name, weight in self.mix:
+			pick = pick-weight
+			if pick <= 0:
+				return name
+		return self.mix[-1][0]
+
+	def _NextRequest(self):
+
+		"""Return the type of the next request or None when the test is finished"""
+
+		self.lock.acquire()
+		try:
+			if self.duration is not None:
+				if time.time()-self.start > self.duration:
+					return None
+			elif self.issued >= self.requests:
+				return None
+			self.issued += 1
+			return self._Choose()
+		finally:
+			self.lock.release()
+
+	def _Build(self, request):
+
+		"""Return an urllib2 Request object for the request type"""
+
+		if request == 'view':
+			return urllib2.Request(self.url+'?workflow=%s' % WORKFLOW)
+
+		fields = {'%s.xml' % WORKFLOW:'submit'}
+		if request == 'small':
+			fields['5.useplugin'] = False		# ModelNucleicAcids
+			fields['6.useplugin'] = False		# BuildNucleicAcids
+			upload = self.upload
+		else:
+			fields['5.number'] = self.models
+			upload = self.ensemble
+
+		body, content = Multipart(fields, {'1.upload':upload})
+		return urllib2.Request(self.url, body, {'Content-Type':content})
+
+	def _JobState(self, response):
+
+		"""State of the job submitted with the request, read from the job status"""
+
+		jobid = response.info().getheader('X-DART-Job')
+		if jobid is None:
+			return None
+
+		status = urllib2.urlopen(self.url+'status?job=%s' % jobid, timeout=self.timeout).read()
+		return json.loads(status).get('state')
+
+	def _Client(self):
+
+		while True:
+			request = self._NextRequest()
+			if request is None:
+				return
+
+			start = time.time()
+			status = 'ok'
+			try:
+				response = urllib2.urlopen(self._Build(request), timeout=self.timeout)
+				response.read()
+				if request != 'view' and not self._JobState(response) == 'FINISHED':
+					status = 'joberror'
+			except (urllib2.URLError, IOError, httplib.HTTPException):
+				status = 'error'
+			latency = time.time()-start
+
+			self.lock.acquire()
+			self.results.append((request, latency, status))
+			self.lock.release()
+
+	def Run(self):
+
+		"""Run the load test, returns when all clients are finished"""
+
+		self.start = time.time()
+		threads = [threading.Thread(target=self._Client) for client in range(self.clients)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		self.walltime = time.time()-self.start
+
+	def Collect(self):
+
+		"""Return a dictionary with throughput, latency percentiles and error rates, overall
+		   and per request type"""
+
+		def summary(results):
+			latencies = [latency for request, latency, status in results]
+			errors = len([status for request, latency, status in results if status == 'error'])
+			joberrors = len([status for request, latency, status in results if status == 'joberror'])
+			stats = {'count':len(results), 'errors':errors, 'joberrors':joberrors}
+			if len(results):
+				stats['errorrate'] = float(errors+joberrors)/len(results)
+				stats['max'] = max(latencies)
+			else:
+				stats['errorrate'] = None
+				stats['max'] = None
+			if self.walltime > 0:
+				stats['throughput'] = len(results)/self.walltime
+			else:
+				stats['throughput'] = None
+			for percent in PERCENTILES:
+				stats['p%i' % percent] = Percentile(latencies, percent)
+			return stats
+
+		report = {'walltime':self.walltime, 'clients':self.clients, 'total':summary(self.results), 'requests':{}}
+		for name, weight in self.mix:
+			report['requests'][name] = summary([result for result in self.results if result[0] == name])
+
+		return report
+
+	def _FormatValue(self, value, format="%1.3f"):
+
+		if value is None:
+			return '---'
+		return format % value
+
+	def Report(self, export='text', out=sys.stdout):
+
+		"""Write the load test results to out as plain text (export='text') or JSON (export='json')"""
+
+		report = self.Collect()
+
+		if export == 'json':
+			out.write(json.dumps(report, sort_keys=True, indent=1))
+			out.write("\n")
+			return
+
+		out.write("DART load test against %s\n" % self.url)
+		out.write("clients: %i wall time: %1.2f s\n\n" % (self.clients, self.walltime))
+
+		header = "%-8s %6s %8s %8s %8s" % ('', 'count', 'req/s', 'error', 'joberr')
+		for percent in PERCENTILES:
+			header = header+(" %9s" % ('p%i (s)' % percent))
+		out.write(header+(" %9s\n" % 'max (s)'))
+
+		for name in [name for name, weight in self.mix]+['total']:
+			if name == 'total':
+				stats = report['total']
+			else:
+				stats = report['requests'][name]
+			errorrate = stats['errorrate']
+			if errorrate is not None:
+				errorrate = errorrate*100
+			line = "%-8s %6i %8s %7s%% %8i" % (name, stats['count'], self._FormatValue(stats['throughput'], "%1.2f"),
+			       self._FormatValue(errorrate, "%1.1f"), stats['joberrors'])
+			for percent in PERCENTILES:
+				line = line+(" %9s" % self._FormatValue(stats['p%i' % percent]))
+			out.write(line+(" %9s\n" % self._FormatValue(stats['max'])))
+
+if __name__ == '__main__':
+
+	DARTDIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+	parser = OptionParser(usage=USAGE)
+	parser.add_option("-u", "--url", action="store", dest="url", type="string", default="http://localhost:8080/", help="URL of the DART server")
+	parser.add_option("-s", "--serve", action="store", dest="serve", type="int", help="Start the DARTwsgi test server with 3DNA stubs on this port")
+	parser.add_option("--stubs", action="store", dest="stubs", type="string", help="Write the 3DNA stubs to this directory and exit")
+	parser.add_option("--sleep", action="store", dest="sleep", type="float", default=1.0, help="Time in seconds a 3DNA stub call takes")
+	parser.add_option("-c", "--clients", action="store", dest="clients", type="int", default=4, help="Number of concurrent clients")
+	parser.add_option("-n", "--requests", action="store", dest="requests", type="int", default=100, help="Total number of requests")
+	parser.add_option("-d", "--duration", action="store", dest="duration", type="float", help="Run for this many seconds instead of a number of requests")
+	parser.add_option("-m", "--mix", action="store", dest="mix", type="string", default="view=5,small=3,large=1", help="Weighted request mix")
+	parser.add_option("--models", action="store", dest="models", type="int", default=100, help="Number of models of a large job")
+	parser.add_option("--pdb", action="store", dest="pdb", type="string", default=os.path.join(DARTDIR, 'example', 'struct_1.pdb'), help="Structure uploaded with small jobs")
+	parser.add_option("--ensemble", action="store", dest="ensemble", type="string", default=os.path.join(DARTDIR, 'example', '*.pdb'), help="Structures uploaded as zip archive with large jobs (glob pattern)")
+	parser.add_option("--seed", action="store", dest="seed", type="int", help="Random seed for the request mix")
+	parser.add_option("--json", action="store_true", dest="json", default=False, help="Report as JSON")
+	(options, args) = parser.parse_args()
+
+	if options.stubs:
+		MakeStubs(options.stubs, options.sleep)
+		print("--> 3DNA stubs written to %s, put this directory first in the PATH of the DART server" % options.stubs)
+		sys.exit(0)
+
+	server = None
+	url = options.url
+	if options.serve:
+		stubdir = MakeStubs(tempfile.mkdtemp(prefix='dartstubs'), options.sleep)
+		server, url = StartServer(DARTDIR, options.serve, stubdir)
+
+	try:
+		test = LoadTest(url, mix=ParseMix(options.mix), clients=options.clients, requests=options.requests,
+		                duration=options.duration, pdb=options.pdb, ensemble=sorted(glob.glob(options.ensemble)),
+		                models=options.models, seed=options.seed)
+		test.Run()
+		if options.json:
+			test.Report(export='json')
+		else:
+			test.Report()
+	finally:
+		if server is not None:
+			server.kill()
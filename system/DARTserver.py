@@ -17,9 +17,19 @@ Dependencies:		      Standard python and CGI module (included in Python)
 """
 
 """Import Modules"""
-import cgi, os, sys, shutil, glob, time, commands
+import cgi, os, sys, shutil, glob, time, commands, copy, hashlib, StringIO, subprocess, json, pipes, shlex, zipfile
 from Xpath import Xpath
 from Constants import *
+from ServerMetrics import LogEvent, ServerMetrics
+from JobScheduler import JobScheduler
+from Archive import IsArchive, ExpandInput, InputSize, SplitExt, Close
+
+"""Process wide cache of parsed workflow models and rendered webforms keyed on the absolute
+   path of the workflow file. Entries are validated against modification time and size of
+   the file and, if these changed, against the md5 hash of its content. One rendered webform
+   is kept per workflow, it is rendered again when the form action differs"""
+WORKFLOWCACHE = {}
+MODELATTR = ['metadata','pluginmeta','pluginoptions','pluginform','plugindefault','plugintext','optionmeta']
 
 class WebServer:
 
@@ -32,6 +42,9 @@ class WebServer:
 		self.jobid = str(int(time.time()))
 		self.filestring = "" 
 		self.error = ""
+		self.uploadsize = 0
+		self.formaction = FORMACTION
+		self.user = RemoteUser(remote_env)
 	
 		self.metadata = {}
 		self.pluginmeta = {}
@@ -39,15 +52,19 @@ class WebServer:
 		self.pluginform = {}
 		self.plugindefault = {}
 		self.plugintext = {}
+		self.optionmeta = {}
 		
 		self.formdata = {}
-		
-		# Log webserver call to DARTserver.log
-		log = open(self.DARTDIR+'/server-tmp/DARTserver.log','a')
-		log.write("* DART server call created on %s with job ID %s with data:\n" % (time.ctime(),self.jobid))
-		for n in remote_env:
-			log.write("  - %s" % n)
-		log.close()
+		self.status = {}
+		
+		# Log webserver call to DARTserver.log. Without remote environment the instance
+		# only serves as in-memory workflow model and no call is logged.
+		if remote_env is not None:
+			log = open(self.DARTDIR+'/server-tmp/DARTserver.log','a')
+			log.write("* DART server call created on %s with job ID %s with data:\n" % (time.ctime(),self.jobid))
+			for n in remote_env:
+				log.write("  - %s" % n)
+			log.close()
 
 		# Account for the server call in the WeNMR SSO accounting DB
 		###sso = ssoxs_connect('3d_dart')
@@ -216,17 +233,28 @@ class WebServer:
 		form.write('   <td width="800"><input type=hidden name=%s value=%s></td>\n' % (str(jobnr)+"."+options,self.pluginoptions[jobnr][options]))
 		form.write('  </tr>\n')
 		
-	def _WriteHTML(self):
+	def _WriteHTML(self, html, form=None):
 	
-		if self.verbose == True:
+		"""Write the HTML webform to stdout (verbose), to file or to the supplied file-like object"""
+	
+		if form is not None:
+			form.write(html)
+		elif self.verbose == True:
 			print "Content-Type: text/html\n\n"
-			form = sys.stdout
+			sys.stdout.write(html)
 		else:
 			form = file(os.path.splitext(self.metadata['name'])[0]+'.html','w')
+			form.write(html)
+			form.close()
+	
+	def _RenderHTML(self):
+	
+		"""Render the HTML webform of the loaded workflow model as string"""
 		
+		form = StringIO.StringIO()
 		form.write("<html>")
 		form.write("<body>")
-		form.write("<form method=post action=http://localhost/cgi-bin/dart.py enctype=multipart/form-data>\n")
+		form.write("<form method=post action=\"%s\" enctype=multipart/form-data>\n" % cgi.escape(self.formaction, True))
 		
 		for jobnr in self.metadata['workflowsequence']:
 			form.write(" <br/>\n")
@@ -255,8 +283,48 @@ class WebServer:
 		form.write("</body>\n")
 		form.write("</html>\n")
 		
-		if self.verbose == False:
-			form.close()
+		return form.getvalue()
+	
+	def _PrecomputeOptions(self):
+	
+		"""Make a dictionary of default option values for every plugin keyed on the job
+		   number as string, the way plugins are adressed in webform data"""
+		
+		self.optionmeta = {}
+		for job in self.pluginoptions:
+			self.optionmeta[str(job)] = dict(self.pluginoptions[job])
+	
+	def _CachedWorkflow(self, xml):
+	
+		"""Return the cache entry of the workflow file. The file is (re)parsed when it is
+		   not cached yet or when its content changed"""
+		
+		path = os.path.abspath(xml)
+		stat = os.stat(path)
+		signature = (stat.st_mtime, stat.st_size)
+		
+		entry = WORKFLOWCACHE.get(path)
+		if entry is not None and entry['signature'] != signature:
+			content = open(path).read()
+			if hashlib.md5(content).hexdigest() == entry['hash']:
+				entry['signature'] = signature
+			else:
+				entry = None
+		
+		if entry is None:
+			content = open(path).read()
+			self.xml = Xpath(content)
+			self._MainXMLdataHandler()
+			self._PluginXMLdataHandler()
+			self._PrecomputeOptions()
+			
+			model = {}
+			for attr in MODELATTR:
+				model[attr] = getattr(self, attr)
+			entry = {'signature':signature, 'hash':hashlib.md5(content).hexdigest(), 'model':copy.deepcopy(model), 'html':None}
+			WORKFLOWCACHE[path] = entry
+		
+		return entry
 
 	def _FormatFormData(self,webform):
 		
@@ -269,32 +337,26 @@ class WebServer:
 		
 		for keys in self.formdata:							# get default values from workflow xml file
 			for options in self.formdata[keys]: 
-				if self.formdata[keys][options] == 'submit':
+				if self.formdata[keys][options] == 'submit' and not len(self.pluginoptions):
 					if os.path.isfile("%s/workflows/%s.xml" % (self.DARTDIR, keys)):
-						self.xml = Xpath("%s/workflows/%s.xml" % (self.DARTDIR, keys))
-						self._MainXMLdataHandler()
-						self._PluginXMLdataHandler()
-		
-		for plugin in self.pluginoptions:					# Check formdata against default workflow. Missing values
-			for options in self.pluginoptions[plugin]:		# are set to there default ones.
-				if self.formdata.has_key(str(plugin)):
-					if not self.formdata[str(plugin)].has_key(options): 
-						self.formdata[str(plugin)][options] = self.pluginoptions[plugin][options]
-						#if self.pluginform[plugin][options] == 'checkbox':
-						#	self.formdata[str(plugin)][options] = False
-						#else:
-						#	self.formdata[str(plugin)][options] = self.pluginoptions[plugin][options]
-				else:
-					self.formdata[str(plugin)] = self.pluginoptions[plugin]	# If complete plugin is missing in formdata than
-																			# default values are parsed in			
+						self.LoadWorkflow("%s/workflows/%s.xml" % (self.DARTDIR, keys))
+		
+		for plugin in self.optionmeta:						# Check formdata against default workflow. Missing values
+			if self.formdata.has_key(plugin):				# are set to there default ones.
+				for options in self.optionmeta[plugin]:
+					if not self.formdata[plugin].has_key(options): 
+						self.formdata[plugin][options] = self.optionmeta[plugin][options]
+			else:
+				self.formdata[plugin] = dict(self.optionmeta[plugin])	# If complete plugin is missing in formdata than
+																		# default values are parsed in			
 	
 	def _GetDirSize(self,pdb):
 		
-		"""Get the total size of the uploaded directory"""
+		"""Get the total size of the uploaded files, archive members uncompressed"""
 		
 		kb = 0
 		for files in pdb:
-			kb = kb + os.stat(files)[6]	
+			kb = kb + InputSize(files)	
 		return kb/1024.0
 			
 	def _ManageUploads(self):
@@ -308,28 +370,29 @@ class WebServer:
 					upload = open(filename,'w')
 					upload.write(self.formdata['1'][n]['file'])
 					upload.close()
-					if os.path.splitext(filename)[1] == '.zip':
-						cmd = 'unzip '+filename
-						os.system(cmd)
-						if os.path.isdir(os.path.splitext(filename)[0]):
-							curdir = os.getcwd()
-							os.chdir(curdir+os.path.splitext(filename)[0])
-							pdb = glob.glob("*.pdb")
-							os.chdir(curdir)
-						else:
-							pdb = glob.glob("*.pdb")
+					self.uploadsize = self.uploadsize+len(self.formdata['1'][n]['file'])
+					if IsArchive(filename):
+						# The PDB files are read from the archive by the plugins, not extracted.
+						# The archive is closed again, the server process must not keep it open
+						try:
+							pdb = [files for files in ExpandInput([filename]) if SplitExt(files)[1] == '.pdb']
+							size = self._GetDirSize(pdb)
+						except:
+							pdb = []
+						finally:
+							Close(filename)
 						if len(pdb) > 0:
-							if self._GetDirSize(pdb) > MAXMB:
+							if size > MAXMB:
 								self.error = self.error+("Total size of uploaded files exeeds limit of %1.0f MB" % MAXMB)
 							else:
-								for files in pdb:
-									self.filestring = self.filestring+files+" "
+								for files in pdb:	# Member names are quoted for the shell command
+									self.filestring = self.filestring+pipes.quote(files)+" "
 								self.formdata['1']['upload'] = self.DARTDIR+'/server-tmp/'+filename
 						else:
 							self.error = self.error+"No valid upload found\n"	
 					else:
 						self.formdata['1']['upload'] = self.DARTDIR+'server-tmp/'+filename
-						self.filestring = self.filestring+filename					
+						self.filestring = self.filestring+pipes.quote(filename)					
 				else:
 					self.formdata['1']['upload'] = None
 			
@@ -363,16 +426,153 @@ class WebServer:
 		
 		outfile.write('</main>\n')						
 
-	def MakeWebForm(self,verbose=False,xml=None):
+	def _LogStepTimes(self, filelist):
+	
+		"""Log the run time of every plugin in the workflow as recorded in Filelist.xml"""
+		
+		if not os.path.isfile(filelist):
+			return
+		
+		xml = Xpath(filelist)
+		xml.Evaluate(query={1:{'element':'plugin','attr':None}})
+		for node in xml.nodeselection[1]:
+			xml.getAttr(node=node,selection='ID',export='string')
+		plugins = xml.result
+		xml.ClearResult()
+		for node in xml.nodeselection[1]:
+			xml.getAttr(node=node,selection='time',export='string')
+		times = xml.result
+		xml.ClearResult()
+		
+		if len(times) == len(plugins):
+			for step in range(len(plugins)):
+				LogEvent(self.DARTDIR, self.jobid, 'STEP', plugin=plugins[step], time=times[step])
+
+	def _WriteStatus(self, state, **fields):
+	
+		"""Update the job status in server-tmp/status/<jobid>.json"""
+		
+		self.status['state'] = state
+		self.status['updated'] = time.time()
+		self.status.update(fields)
+		
+		statusdir = os.path.join(self.DARTDIR,'server-tmp','status')
+		if not os.path.isdir(statusdir):
+			try:
+				os.makedirs(statusdir)
+			except OSError:
+				pass
+		
+		statusfile = os.path.join(statusdir,'%s.json' % self.jobid)
+		outfile = open(statusfile+'.tmp','w')
+		json.dump(self.status, outfile, sort_keys=True, indent=1)
+		outfile.close()
+		os.rename(statusfile+'.tmp',statusfile)
+	
+	def _PublishSteps(self, dirname):
+	
+		"""Compress the output of every workflow step completed since the last call, as 
+		   recorded in Filelist.xml, and move it to the download location as soon as the
+		   step is done. Progress is reported in the job status"""
+		
+		filelist = os.path.join(dirname,'Filelist.xml')
+		if not os.path.isfile(filelist):
+			return
+		
+		xml = Xpath(filelist)
+		xml.Evaluate(query={1:{'element':'plugin','attr':None}})
+		for node in xml.nodeselection[1]:
+			xml.getAttr(node=node,selection='ID',export='string')
+		plugins = xml.result
+		xml.ClearResult()
+		for node in xml.nodeselection[1]:
+			xml.getAttr(node=node,selection='nr',export='string')
+		steps = [int(float(step)) for step in xml.result]
+		xml.ClearResult()
+		for node in xml.nodeselection[1]:
+			xml.getAttr(node=node,selection='time',export='string')
+		times = xml.result
+		xml.ClearResult()
+		
+		if not (len(plugins) == len(steps) == len(times)):
+			return
+		
+		published = False
+		for n in range(len(steps)):
+			if steps[n] <= self.status['completed']:
+				continue
+			
+			result = {'step':steps[n],'plugin':plugins[n],'time':float(times[n]),'archive':None}
+			stepdir = os.path.join(dirname,"jobnr%i-%s" % (steps[n],plugins[n]))
+			if os.path.isdir(stepdir):
+				archive = "%s%s_step%i-%s.zip" % (dirname,self.jobid,steps[n],plugins[n])
+				if ZipDirectory(archive,stepdir):
+					shutil.move(archive,self.DARTDIR+'/results/')
+					result['archive'] = os.path.join(FTP_LOCATION,archive)
+			
+			self.status['results'].append(result)
+			self.status['completed'] = steps[n]
+			published = True
+		
+		if published:
+			self._WriteStatus(self.status['state'])
+	
+	def Metrics(self,verbose=True,export='text'):
+	
+		"""Report server metrics as plain text or JSON"""
+		
+		if verbose == True:
+			if export == 'json':
+				print "Content-Type: application/json\n"
+			else:
+				print "Content-Type: text/plain\n"
+		
+		ServerMetrics(self.DARTDIR).Report(export=export)
+
+	def LoadWorkflow(self,xml=None):
+	
+		"""Load the workflow model from the workflow XML file (cached) or an XML string"""
+		
+		if isinstance(xml, str) and os.path.isfile(xml):
+			self.SetWorkflowModel(self._CachedWorkflow(xml)['model'])
+		else:
+			self.xml = Xpath(xml)
+			self._MainXMLdataHandler()
+			self._PluginXMLdataHandler()
+			self._PrecomputeOptions()
+	
+	def SetWorkflowModel(self,model):
 	
-		"""Control module for generating a webform from XMLdata"""
+		"""Use a workflow model, either a dictionary of model attributes or an other,
+		   already loaded, WebServer instance. The model is copied as processing of 
+		   webform data modifies it"""
+		
+		for attr in MODELATTR:
+			if isinstance(model, dict):
+				setattr(self, attr, copy.deepcopy(model[attr]))
+			else:
+				setattr(self, attr, copy.deepcopy(getattr(model, attr)))
+	
+	def MakeWebForm(self,verbose=False,xml=None,form=None):
+	
+		"""Control module for generating a webform from XMLdata. Forms generated from
+		   workflow files are rendered once and served from cache until the file changes"""
 		
-		self.xml = Xpath(xml)
 		self.verbose = verbose
 		
-		self._MainXMLdataHandler()
-		self._PluginXMLdataHandler()
-		self._WriteHTML()
+		if isinstance(xml, str) and os.path.isfile(xml):
+			entry = self._CachedWorkflow(xml)
+			if entry['html'] is None or not entry['html'][0] == self.formaction:
+				self.SetWorkflowModel(entry['model'])
+				entry['html'] = (self.formaction, self._RenderHTML())	# One rendering per workflow
+			self.metadata = entry['model']['metadata']
+			html = entry['html'][1]
+		else:
+			if xml is not None:
+				self.LoadWorkflow(xml)
+			html = self._RenderHTML()
+		
+		self._WriteHTML(html, form)
 
 	def CleanJobs(self):
 
@@ -402,6 +602,12 @@ class WebServer:
 		for newline in newlines:
 			readfile.write("%s    %s    %s\n" % (newline[0],newline[1],newline[2]))
 		readfile.close()
+		
+		partial = glob.glob(self.DARTDIR+'/results/*_step*.zip')			# Step archives and job status files,
+		partial.extend(glob.glob(self.DARTDIR+'/server-tmp/status/*.json'))	# also of failed jobs
+		for target in partial:
+			if curtime - os.path.getmtime(target) >= float(CLEANTIME):
+				os.remove(target)
 
 	def RunDART(self, pythondict):
 		
@@ -416,24 +622,64 @@ class WebServer:
 	
 		"""Prepaire temporary working directory"""
 		os.chdir(self.DARTDIR+'/server-tmp/')		# Move to server temporary directory
-		os.mkdir('job'+self.jobid)			# Create temporary working directory
+		while True:					# Create temporary working directory, jobs submitted
+			if not len(glob.glob('%s/results/*%s.zip' % (self.DARTDIR,self.jobid))):
+				try:				# in the same second get the next free job ID
+					os.mkdir('job'+self.jobid)
+					break
+				except OSError:
+					if not os.path.isdir('job'+self.jobid):
+						raise
+			self.jobid = str(int(self.jobid)+1)
 		os.chdir('job'+self.jobid)			# Move to the temporary working directory
+		LogEvent(self.DARTDIR, self.jobid, 'QUEUED')
+		
+		dirname = os.path.splitext(self.metadata['name'])[0]
+		self.status = {'jobid':self.jobid,'user':self.user,'workflow':dirname,'submitted':time.time(),
+		               'steps':len(self.metadata['workflowsequence']),'completed':0,'results':[]}
+		self._WriteStatus('QUEUED')
 
 		"""Write all nessacary files to temporary working directory"""
 		self._ManageUploads()
 		self._WriteNewXML()
 		
-		dirname = os.path.splitext(self.metadata['name'])[0]
+		"""Queue the job, jobs are started fair-share between users"""
+		scheduler = JobScheduler(self.DARTDIR)
+		models = scheduler.EstimateModels(self.formdata, self.metadata['workflowsequence'], len(shlex.split(self.filestring)))
+		refused = scheduler.Submit(self.jobid, self.user, models)
+		if refused:
+			os.chdir(self.DARTDIR+'/server-tmp/')
+			shutil.rmtree('job'+self.jobid)
+			LogEvent(self.DARTDIR, self.jobid, 'FAILED', user=self.user, models=models, reason='refused')
+			self._WriteStatus('FAILED', error=refused.strip())
+			return ("The job was refused by the server: %s" % refused)
 		
 		"""Run DART in server mode"""
-		if self.formdata['1']['upload']: 
-		  cmd = "%s %s/RunDART.py -w workflow.xml -f %s > dart.out" % (PYTHON, self.DARTDIR, self.filestring)
-		else:
-		  cmd = "%s %s/RunDART.py -w workflow.xml > dart.out" % (PYTHON, self.DARTDIR)
-		os.system(cmd)
+		try:
+			if not scheduler.WaitForSlot(self.jobid):		# Job removed from the queue while waiting,
+				os.chdir(self.DARTDIR+'/server-tmp/')		# never run it without a slot
+				shutil.rmtree('job'+self.jobid)
+				LogEvent(self.DARTDIR, self.jobid, 'FAILED', user=self.user, models=models, reason='dequeued')
+				self._WriteStatus('FAILED', error='The job was removed from the queue before it could start')
+				return "The job was removed from the server queue before it could start"
+			LogEvent(self.DARTDIR, self.jobid, 'RUNNING', upload=self.uploadsize, user=self.user, models=models)
+			self._WriteStatus('RUNNING')
+			if self.formdata['1']['upload']: 
+			  cmd = "ulimit -t %i; %s %s/RunDART.py -w workflow.xml -f %s > dart.out" % (MAXCPUTIME, PYTHON, self.DARTDIR, self.filestring)
+			else:
+			  cmd = "ulimit -t %i; %s %s/RunDART.py -w workflow.xml > dart.out" % (MAXCPUTIME, PYTHON, self.DARTDIR)
+			process = subprocess.Popen(cmd, shell=True)
+			while process.poll() is None:			# Publish the results of every finished
+				time.sleep(POLLTIME)			# step while the job is running
+				self._PublishSteps(dirname)
+			status = process.returncode
+			self._PublishSteps(dirname)
+		finally:
+			scheduler.Finish(self.jobid)
 		
 		"""Rename project directory, compress and move to FTP directory"""
 		if os.path.isdir(os.path.splitext(self.metadata['name'])[0]) and os.path.isfile('dart.out'):
+			self._LogStepTimes(os.path.join(dirname,'Filelist.xml'))
 			shutil.move('dart.out',dirname)							# Move dart.out file inside job directory
 			os.rename(dirname,dirname+self.jobid)						# Rename job directory to include jobid
 			shutil.copy(self.DARTDIR+'/server-tmp/readme.txt',dirname+self.jobid)		# Copy a version of the readme file to the job directory
@@ -466,7 +712,100 @@ class WebServer:
 			##sso = ssoxs_connect('3d_dart')							# WeNMR SSO account, job done		
 			##sso.accounting(status=5, jid=self.jobid, url=downloadpath)
 			
+			if not status == 0:								# Output of a failed job is kept for
+				LogEvent(self.DARTDIR, self.jobid, 'FAILED', exit=status)		# download but the job is failed
+				self._WriteStatus('FAILED', download=downloadpath, error="DART exited with status %s" % status)
+				return ("An error orccured during processing, the output is available at: %s" % downloadpath)
+			
+			LogEvent(self.DARTDIR, self.jobid, 'FINISHED', exit=status)
+			self._WriteStatus('FINISHED', download=downloadpath)
 			return downloadpath								# Report download location to user
 		else:
+			LogEvent(self.DARTDIR, self.jobid, 'FAILED', exit=status)
+			self._WriteStatus('FAILED', error=self.error.strip())
 			return ("An error orccured during processing: %s" % self.error) 
 	
+
+def JobStatus(DARTDIR, jobid=None, user=None):
+
+	"""Return the status dictionary of a job or, without job ID, a list with the status
+	   of all jobs of user"""
+	
+	statusdir = os.path.join(DARTDIR,'server-tmp','status')
+	if jobid is not None:
+		statusfile = os.path.join(statusdir,'%s.json' % os.path.basename(str(jobid)))
+		if not os.path.isfile(statusfile):
+			return None
+		return json.load(open(statusfile,'r'))
+	
+	jobs = []
+	for statusfile in sorted(glob.glob(os.path.join(statusdir,'*.json'))):
+		status = json.load(open(statusfile,'r'))
+		if user is None or status.get('user') == user:
+			jobs.append(status)
+	return jobs
+
+def ZipDirectory(archive, directory):
+
+	"""Write directory and all files below it to a zip archive, the member names are the
+	   paths as given like zip -r does. Returns False if the archive could not be written"""
+	
+	try:
+		zipped = zipfile.ZipFile(archive,'w',zipfile.ZIP_DEFLATED,allowZip64=True)
+		try:
+			for root, dirs, files in os.walk(directory):
+				dirs.sort()
+				zipped.write(root)
+				for name in sorted(files):
+					zipped.write(os.path.join(root,name))
+		finally:
+			zipped.close()
+	except (IOError, OSError, zipfile.LargeZipFile):
+		if os.path.isfile(archive):
+			os.remove(archive)
+		return False
+	
+	return True
+
+def RemoteUser(remote_env):
+
+	"""Return the name the server accounts jobs to: the authenticated user (REMOTE_USER) or
+	   else the remote address of the request. remote_env is a dictionary such as os.environ
+	   or a list of 'KEY=value' strings"""
+	
+	env = {}
+	if remote_env is None:
+		pass
+	elif hasattr(remote_env, 'get'):
+		env = remote_env
+	else:
+		for n in remote_env:
+			if '=' in n:
+				key, value = n.strip().split('=', 1)
+				env[key] = value
+	
+	for key in ('REMOTE_USER', 'REMOTE_ADDR'):
+		if env.get(key):
+			return env[key]
+	return 'anonymous'
+
+def FieldStorageToDict(form):
+
+	"""Convert a cgi.FieldStorage instance to the dictionary of webform data expected by
+	   WebServer.RunDART. Uploaded files are stored as a dictionary with the file name and
+	   the file content, empty file fields as None"""
+
+	pythondict = {}
+	for key in form.keys():
+		item = form[key]
+		if type(item) == type([]):
+			item = item[0]
+		if item.filename is not None:
+			if item.filename:
+				pythondict[key] = {'name':os.path.basename(item.filename), 'file':item.value}
+			else:
+				pythondict[key] = None
+		else:
+			pythondict[key] = item.value
+
+	return pythondict
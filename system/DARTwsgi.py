@@ -0,0 +1,178 @@
+#!/usr/bin/env python2.7
+
+USAGE = """
+==========================================================================================
+
+Author:               3D-DART contributors
+Copyright (C):        2026 (DART project)
+DART version:         1.3 development (19-10-2026)
+DART system module:   DARTwsgi.py
+Module function:      Long-lived WSGI application for the DART web front end. All
+                      workflows in the DART workflows directory are parsed once when
+                      the application is created and kept in the process wide
+                      workflow cache of DARTserver, together with the rendered
+                      webforms. Edited workflow files are picked up automatically.
+                      Requests are handled as:
+                      - GET  <script>?workflow=<name>  HTML webform of the workflow
+                      - POST <script>                  submit webform, run DART job, the
+                                                       job ID is returned in the X-DART-Job
+                                                       response header
+                      - GET  <script>/metrics          server metrics (?format=json)
+                      - GET  <script>/status           JSON status of the jobs of the user
+                                                       (?job=<jobid> for a single job)
+                      Job execution changes the working directory of the process, run
+                      the application in a preforking (single threaded) WSGI server
+                      such as gunicorn or mod_wsgi in prefork mode:
+                      gunicorn --preload -w 4 -b :8080 DARTwsgi:application
+                      For local testing run this module, it starts the wsgiref server
+                      and handles every request in a forked process.
+                      The webform is submitted to FORMACTION in Constants.py, set it to
+                      the URL the application is served at. The request headers are
+                      never used to build the form.
+                      The CGI entry point keeps using the WebServer class directly.
+Dependencies:         Standard python modules
+
+==========================================================================================
+"""
+
+"""Import modules"""
+import os, sys, cgi, glob, json, StringIO
+from DARTserver import WebServer, FieldStorageToDict, JobStatus, RemoteUser
+from ServerMetrics import ServerMetrics
+from Constants import *
+
+DEFAULTWORKFLOW = 'NAensemblebuild'
+
+class DARTApplication:
+
+	"""WSGI application object around the DART WebServer class. Workflow models are loaded
+	   once and shared by all requests handled by the process"""
+
+	def __init__(self, DARTDIR=None, formaction=FORMACTION):
+
+		self.DARTDIR = DARTDIR
+		self.formaction = formaction
+		self.workflows = {}
+
+		for xml in glob.glob(os.path.join(self.DARTDIR, 'workflows', '*.xml')):
+			self.LoadWorkflow(xml)
+
+	def LoadWorkflow(self, xml):
+
+		"""Register the workflow XML file under its basename and warm the workflow cache"""
+
+		name = os.path.splitext(os.path.basename(xml))[0]
+		WebServer(DARTDIR=self.DARTDIR).LoadWorkflow(xml)
+		self.workflows[name] = xml
+
+	def _Respond(self, start_response, status, body, content='text/html', headers=[]):
+
+		start_response(status, [('Content-Type', content), ('Content-Length', str(len(body)))]+headers)
+		return [body]
+
+	def WebForm(self, environ, start_response):
+
+		"""Return the HTML webform of the requested workflow"""
+
+		query = cgi.parse_qs(environ.get('QUERY_STRING', ''))
+		name = os.path.splitext(query.get('workflow', [DEFAULTWORKFLOW])[0])[0]
+		if not self.workflows.has_key(name):
+			return self._Respond(start_response, '404 Not Found', "No DART workflow named %s\n" % name, 'text/plain')
+
+		server = WebServer(DARTDIR=self.DARTDIR)
+		server.formaction = self.formaction
+		form = StringIO.StringIO()
+		server.MakeWebForm(xml=self.workflows[name], form=form)
+
+		return self._Respond(start_response, '200 OK', form.getvalue())
+
+	def Submit(self, environ, start_response):
+
+		"""Convert the posted webform to a DART workflow and run it"""
+
+		form = cgi.FieldStorage(fp=environ['wsgi.input'], environ=environ, keep_blank_values=True)
+		pythondict = FieldStorageToDict(form)
+
+		remote_env = ["%s=%s\n" % (key, environ[key]) for key in ('REMOTE_ADDR', 'REMOTE_USER', 'HTTP_USER_AGENT') if environ.has_key(key)]
+		server = WebServer(DARTDIR=self.DARTDIR, remote_env=remote_env)
+		for key in pythondict:
+			if pythondict[key] == 'submit':
+				name = os.path.splitext(key)[0]
+				if self.workflows.has_key(name):
+					server.LoadWorkflow(self.workflows[name])
+
+		curdir = os.getcwd()
+		try:
+			result = server.RunDART(pythondict)
+		finally:
+			os.chdir(curdir)
+
+		body = "<html>\n<body>\n<p>%s</p>\n</body>\n</html>\n" % cgi.escape(str(result))
+		return self._Respond(start_response, '200 OK', body, headers=[('X-DART-Job', server.jobid)])
+
+	def Metrics(self, environ, start_response):
+
+		query = cgi.parse_qs(environ.get('QUERY_STRING', ''))
+		export = query.get('format', ['text'])[0]
+
+		out = StringIO.StringIO()
+		ServerMetrics(self.DARTDIR).Report(export=export, out=out)
+
+		if export == 'json':
+			return self._Respond(start_response, '200 OK', out.getvalue(), 'application/json')
+		return self._Respond(start_response, '200 OK', out.getvalue(), 'text/plain')
+
+	def Status(self, environ, start_response):
+
+		"""Return the status and the published partial results of a job, or of all jobs
+		   of the user, as JSON"""
+
+		query = cgi.parse_qs(environ.get('QUERY_STRING', ''))
+		user = RemoteUser(environ)
+
+		if query.has_key('job'):
+			status = JobStatus(self.DARTDIR, jobid=query['job'][0])
+			if status is None or not status.get('user') == user:
+				return self._Respond(start_response, '404 Not Found', "No DART job %s\n" % query['job'][0], 'text/plain')
+		else:
+			status = JobStatus(self.DARTDIR, user=user)
+
+		return self._Respond(start_response, '200 OK', json.dumps(status, sort_keys=True, indent=1)+"\n", 'application/json')
+
+	def __call__(self, environ, start_response):
+
+		path = environ.get('PATH_INFO', '')
+		method = environ.get('REQUEST_METHOD', 'GET')
+
+		if path.rstrip('/').endswith('/metrics'):
+			return self.Metrics(environ, start_response)
+		elif path.rstrip('/').endswith('/status'):
+			return self.Status(environ, start_response)
+		elif method == 'POST':
+			return self.Submit(environ, start_response)
+		elif method in ('GET', 'HEAD'):
+			return self.WebForm(environ, start_response)
+		else:
+			return self._Respond(start_response, '405 Method Not Allowed', "Method not allowed\n", 'text/plain')
+
+"""Module level WSGI application, workflows are loaded at import time"""
+DARTDIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+application = DARTApplication(DARTDIR)
+
+if __name__ == '__main__':
+
+	"""Serve the application with the wsgiref reference server for local testing. Requests
+	   are handled in forked processes, threads would share the working directory of a job"""
+	from SocketServer import ForkingMixIn
+	from wsgiref.simple_server import make_server, WSGIServer
+
+	class ForkingWSGIServer(ForkingMixIn, WSGIServer):
+		pass
+
+	port = 8080
+	if len(sys.argv) > 1:
+		port = int(sys.argv[1])
+
+	print("--> Serving DART on http://localhost:%i/" % port)
+	make_server('', port, DARTApplication(DARTDIR, formaction="http://localhost:%i/" % port),
+	            server_class=ForkingWSGIServer).serve_forever()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python2.7
+
+USAGE = """
+==========================================================================================
+
+Author:               3D-DART contributors
+Copyright (C):        2026 (DART project)
+DART version:         1.3 development (19-10-2026)
+DART system module:   Ensemble.py
+Module function:      DART ensemble container (.dens): all models of an ensemble with the
+                      same atoms in one file. The atom table columns are stored once as
+                      shared topology, the coordinates of all models as one float32
+                      block of models x atoms x 3 and per model metadata (model number,
+                      source file) as JSON at the end of the file. The reader memory maps
+                      the topology and the coordinate block: the coordinates of a model
+                      are a view on the mapped file and only the models that are used are
+                      read from disk.
+                      File layout: 64 byte prelude (magic, version, number of atoms and
+                      models, offsets), topology record array, coordinate block, JSON.
+                      The writer adds models one at a time and writes to a temporary file
+                      that replaces the container on Close.
+Examples:             Ensemble.py ensemble.dens
+Dependencies:         NumPy, DART package (AtomTable)
+
+==========================================================================================
+"""
+
+"""Import modules"""
+import os, sys, struct, tempfile, json
+import numpy
+from AtomTable import AtomTable, COLUMNS
+
+ENSEMBLEEXT = '.dens'
+MAGIC = 'DARTENS\n'
+VERSION = 1
+PRELUDE = struct.Struct('<8s7Q')	# magic, version, atoms, models, topology, coordinate and metadata offset, metadata size
+ALIGN = 64
+
+"""Columns that must be equal for all models of a container"""
+TOPOLOGY = ['label', 'atname', 'resname', 'chain', 'resnum', 'resext']
+
+def IsEnsemble(filename):
+
+	"""True if filename has the DART ensemble container extension"""
+
+	return isinstance(filename, basestring) and filename.lower().endswith(ENSEMBLEEXT)
+
+def _Pad(out):
+
+	position = out.tell()
+	if position % ALIGN:
+		out.write('\0'*(ALIGN-position % ALIGN))
+
+	return out.tell()
+
+class EnsembleContainer:
+
+	"""Write the models of an ensemble to a DART ensemble container. The first model added
+	   sets the topology, later models must have the same atoms. Use Close() when done"""
+
+	def __init__(self, filename):
+
+		self.filename = filename
+		self.natoms = None
+		self.models = []
+		self.records = {}
+		self.topology = None
+		self.coordstart = None
+
+		handle, self.tmpfile = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filename)), suffix='.tmp')
+		self.out = os.fdopen(handle, 'wb')
+		self.out.write('\0'*PRELUDE.size)
+
+	def _WriteTopology(self, atoms):
+
+		hetatm = atoms.label == 'HETATM'
+		width = max([1]+[len(line) for line in atoms.line[hetatm].tolist()])
+
+		topology = numpy.zeros(len(atoms), dtype=COLUMNS+[('line','S%i' % width)])
+		for name, dtype in COLUMNS:
+			topology[name] = getattr(atoms, name)
+		topology['line'][hetatm] = atoms.line[hetatm].tolist()
+
+		self.topostart = _Pad(self.out)
+		self.out.write(topology.tostring())
+		self.coordstart = _Pad(self.out)
+
+		self.natoms = len(atoms)
+		self.topology = topology
+		self.topodtype = topology.dtype.descr
+
+	def AddModel(self, atoms, records=None, **metadata):
+
+		"""Add the coordinates of an AtomTable as next model. The records (header, title and
+		   footer lines) of the first model are kept, metadata is stored with the model.
+		   Raises ValueError if the atoms do not match the topology"""
+
+		if self.natoms is None:
+			self._WriteTopology(atoms)
+			if records is not None:
+				self.records = dict(records)
+		elif not len(atoms) == self.natoms:
+			raise ValueError("model has %i atoms, ensemble topology %i" % (len(atoms), self.natoms))
+		else:
+			for name in TOPOLOGY:
+				if not (getattr(atoms, name) == self.topology[name]).all():
+					raise ValueError("model does not match the %s column of the ensemble topology" % name)
+
+		self.out.write(numpy.ascontiguousarray(atoms.coord, dtype='<f4').tostring())
+
+		metadata.setdefault('model', len(self.models)+1)
+		self.models.append(metadata)
+
+	def Close(self):
+
+		"""Write metadata and prelude and move the container in place"""
+
+		if self.natoms is None:
+			self._WriteTopology(AtomTable())
+
+		metadata = json.dumps({'topology':self.topodtype, 'models':self.models, 'records':self.records})
+		metastart = _Pad(self.out)
+		self.out.write(metadata)
+
+		self.out.seek(0)
+		self.out.write(PRELUDE.pack(MAGIC, VERSION, self.natoms, len(self.models), self.topostart,
+		                            self.coordstart, metastart, len(metadata)))
+		self.out.close()
+
+		umask = os.umask(0)
+		os.umask(umask)
+		os.chmod(self.tmpfile, 0666 & ~umask)
+		os.rename(self.tmpfile, self.filename)
+
+class Ensemble:
+
+	"""Read a DART ensemble container. The topology and coordinates are memory mapped read
+	   only, coord[model] is the (atoms,3) float32 coordinate view of a model by position"""
+
+	def __init__(self, filename):
+
+		self.filename = filename
+
+		readfile = open(filename, 'rb')
+		magic, version, natoms, nmodels, topostart, coordstart, metastart, metasize = PRELUDE.unpack(readfile.read(PRELUDE.size))
+		if not magic == MAGIC:
+			readfile.close()
+			raise ValueError("%s is not a DART ensemble container" % filename)
+		if version > VERSION:
+			readfile.close()
+			raise ValueError("DART ensemble container version %i not supported" % version)
+		readfile.seek(metastart)
+		metadata = json.loads(readfile.read(metasize))
+		readfile.close()
+
+		self.natoms = natoms
+		self.models = metadata['models']
+		self.records = dict([(str(key), [str(line) for line in lines]) for key, lines in metadata['records'].items()])
+
+		dtype = numpy.dtype([(str(name), str(kind)) for name, kind in metadata['topology']])
+		if natoms:
+			self.topology = numpy.memmap(filename, dtype=dtype, mode='r', offset=topostart, shape=(natoms,))
+		else:
+			self.topology = numpy.zeros(0, dtype=dtype)
+		if natoms and nmodels:
+			self.coord = numpy.memmap(filename, dtype='<f4', mode='r', offset=coordstart, shape=(nmodels, natoms, 3))
+		else:
+			self.coord = numpy.zeros((nmodels, natoms, 3), dtype='<f4')
+
+	def __len__(self):
+
+		return len(self.models)
+
+	def ModelNumbers(self):
+
+		return [metadata['model'] for metadata in self.models]
+
+	def Position(self, model):
+
+		"""Position of model number model in the container"""
+
+		return self.ModelNumbers().index(model)
+
+	def Coordinates(self, position):
+
+		"""(atoms,3) coordinates of the model at position, a view on the mapped file"""
+
+		return self.coord[position]
+
+	def Table(self, position):
+
+		"""AtomTable of the model at position to parse or edit as a structure read from a PDB
+		   file. The columns are copies of the topology, the HETATM records get the coordinates
+		   of the model"""
+
+		table = AtomTable()
+		for name, dtype in COLUMNS:
+			setattr(table, name, numpy.array(self.topology[name], dtype=dtype))
+		table.line = numpy.empty(self.natoms, dtype=object)
+		hetatm = numpy.flatnonzero(self.topology['label'] == 'HETATM')
+		table.line[hetatm] = self.topology['line'][hetatm].tolist()
+
+		return table.Moved(self.coord[position])
+
+	def Records(self):
+
+		"""Header, title, footer, END and MODEL records of the ensemble as PDBio.ParsePDB"""
+
+		records = {'header':[], 'title':[], 'footer':[], 'end':[], 'model':[]}
+		records.update(self.records)
+
+		return records
+
+if __name__ == '__main__':
+
+	"""Print a summary of DART ensemble containers"""
+
+	if len(sys.argv) < 2:
+		print USAGE
+		sys.exit(0)
+
+	for filename in sys.argv[1:]:
+		ensemble = Ensemble(filename)
+		print "--> %s: %i models of %i atoms" % (filename, len(ensemble), ensemble.natoms)
+		for metadata in ensemble.models:
+			print "    * Model %4i %s" % (metadata['model'], metadata.get('name', ''))
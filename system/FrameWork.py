@@ -15,7 +15,7 @@ Module depenencies:	Standard python2.5 modules
 """
 
 """Import modules"""
-from time import ctime
+from time import ctime, time
 from Xpath import Xpath
 from XMLwriter import Node
 from Utils import MakeBackup
@@ -232,9 +232,9 @@ class PluginExecutor:
 		os.mkdir(jobdir)
 		os.chdir(jobdir)
 
-	def _WriteOutput(self, outputlist, plugin, step):
+	def _WriteOutput(self, outputlist, plugin, step, runtime=0.0):
 		
-		plugintag = Node("plugin", ID=plugin, nr=str(step))
+		plugintag = Node("plugin", ID=plugin, nr=str(step), time="%1.3f" % runtime)
 
 		if len(outputlist) == 0:
 			plugintag += Node("file", "None")
@@ -246,11 +246,14 @@ class PluginExecutor:
 
 	def _OutputToFile(self):
 	
-		"""Write XML list of files for each plugin to file"""
+		"""Write XML list of files for each plugin to file. The file is replaced in one go
+		   as it is rewritten after every step and may be read by the DART server while
+		   the workflow is running"""
 		
-		outfile = file('Filelist.xml','w')
-		outfile.write(self.xmlroot.xml())
-		outfile.close
+		outfile = file('Filelist.xml.tmp','w')
+		self.xmlroot.write(outfile)
+		outfile.close()
+		os.rename('Filelist.xml.tmp','Filelist.xml')
 	
 	def PluginExecutor(self):
 		
@@ -274,12 +277,12 @@ class PluginExecutor:
        	 	step = 1
         	while step < (steps+1):
 			plugin = self.maindict['workflowsequence'][float(step)]
+	        	starttime = time()
 	        	outputlist = self._Executor(plugin, mainxml, step)
-	        	self._WriteOutput(outputlist, plugin, step)
+	        	self._WriteOutput(outputlist, plugin, step, time()-starttime)
+			self._OutputToFile()
 			step = step+1	
 	
-		self._OutputToFile()
-	
 if __name__ == "__main__":
 	
 	"""For testing the script"""
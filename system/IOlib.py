@@ -4,6 +4,8 @@ import os,sys,re
 from Utils import *
 from numpy import *
 from Constants import *
+from Archive import ExpandInput, InputExists, SplitExt
+from Ensemble import IsEnsemble
 
 def WritePar(database,filename,verbose=False):
 	
@@ -42,12 +44,20 @@ class InputOutputControl:
 	
 		self.checkedinput = {}
 	
+	def _Extension(self,files):
+
+		"""Extension of an input file, DART ensemble containers stand in for PDB files"""
+
+		if IsEnsemble(files):
+			return '.pdb'
+		return SplitExt(files)[1]
+
 	def _CheckFile(self,files,requirements):
 		
 		if requirements == None or requirements == 'None':
 			extensions = []
 			for n in files:
-				ext = os.path.splitext(n)[1]
+				ext = self._Extension(n)
 				if ext in extensions:
 					pass
 				else:
@@ -61,8 +71,8 @@ class InputOutputControl:
 				self.checkedinput[requirement] = []
 		
 		for n in files:
-			if os.path.isfile(n):
-				extension = os.path.splitext(n)[1]
+			if InputExists(n):
+				extension = self._Extension(n)
 				if self.checkedinput.has_key(extension):
 					self.checkedinput[extension].append(n)
 				elif self.checkedinput.has_key(os.path.basename(n)):
@@ -79,6 +89,7 @@ class InputOutputControl:
 		elif type(files) == type([]):
 			filelist = files
 
+		filelist = ExpandInput(filelist)
 		for files in filelist:
 			if os.path.basename(files) == 'selection.list':
 				readfile = file(files,'r')
@@ -0,0 +1,230 @@
+#!/usr/bin/env python2.7
+
+USAGE = """
+==========================================================================================
+
+Author:               3D-DART contributors
+Copyright (C):        2026 (DART project)
+DART version:         1.3 development (19-10-2026)
+DART system module:   JobScheduler.py
+Module function:      Fair-share scheduling of DART server jobs. Every job is registered
+                      in the spool directory server-tmp/queue/ with the user that
+                      submitted it (authenticated user or remote address) and its
+                      estimated number of models. Waiting jobs are started when a
+                      slot is available, in order of a weighted score:
+
+                      score = waiting time - COSTWEIGHT * models
+                                           - USERWEIGHT * models running for the user
+
+                      Small analysis jobs therefore overtake bulk model generation jobs
+                      while waiting time prevents starvation of the latter. Limits:
+                      MAXJOBS running jobs in total, MAXUSERJOBS per user, MAXBULKJOBS
+                      jobs of more than BULKMODELS models and MAXJOBMODELS models per
+                      job (jobs estimated above it are refused). All limits are defined
+                      in Constants.py. The spool is shared between CGI and WSGI server
+                      processes and protected with a file lock.
+Dependencies:         Standard python modules (fcntl, UNIX only)
+
+==========================================================================================
+"""
+
+"""Import modules"""
+import os, time, glob, fcntl, errno
+from Constants import *
+
+class JobScheduler:
+
+	"""File based fair-share job queue shared by all DART server processes"""
+
+	def __init__(self, DARTDIR=None):
+
+		self.DARTDIR = DARTDIR
+		self.queuedir = os.path.join(DARTDIR, 'server-tmp', 'queue')
+
+		if not os.path.isdir(self.queuedir):
+			try:
+				os.makedirs(self.queuedir)
+			except OSError:
+				pass
+
+	def _Lock(self):
+
+		lock = open(os.path.join(self.queuedir, 'queue.lock'), 'a')
+		fcntl.flock(lock, fcntl.LOCK_EX)
+		return lock
+
+	def _Unlock(self, lock):
+
+		fcntl.flock(lock, fcntl.LOCK_UN)
+		lock.close()
+
+	def _Alive(self, pid):
+
+		"""Check if the server process owning a job still exists"""
+
+		try:
+			os.kill(pid, 0)
+		except OSError, err:
+			return err.errno == errno.EPERM
+		return True
+
+	def _ReadJobs(self):
+
+		"""Read all jobs in the spool. Jobs of server processes that died are removed"""
+
+		jobs = {}
+		for jobfile in glob.glob(os.path.join(self.queuedir, '*.job')):
+			job = {}
+			readfile = open(jobfile, 'r')
+			for line in readfile:
+				if '=' in line:
+					key, value = line.strip().split('=', 1)
+					job[key] = value
+			readfile.close()
+
+			try:
+				job['pid'] = int(job['pid'])
+				job['models'] = float(job['models'])
+				job['submitted'] = float(job['submitted'])
+			except (KeyError, ValueError):
+				continue
+
+			if self._Alive(job['pid']):
+				jobs[job['jobid']] = job
+			else:
+				os.remove(jobfile)
+
+		return jobs
+
+	def _WriteJob(self, job):
+
+		jobfile = os.path.join(self.queuedir, '%s.job' % job['jobid'])
+		outfile = open(jobfile+'.tmp', 'w')
+		for key in ['jobid', 'user', 'models', 'submitted', 'pid', 'state']:
+			outfile.write("%s=%s\n" % (key, job[key]))
+		outfile.close()
+		os.rename(jobfile+'.tmp', jobfile)
+
+	def _Score(self, job, usage, now):
+
+		return (now-job['submitted'])-(COSTWEIGHT*job['models'])-(USERWEIGHT*usage.get(job['user'], (0, 0.0))[1])
+
+	def _NextJob(self, jobs):
+
+		"""Return the job ID of the queued job that should start next or None when no
+		   job can be started"""
+
+		running = [job for job in jobs.values() if job['state'] == 'RUNNING']
+		if len(running) >= MAXJOBS:
+			return None
+
+		usage = {}
+		bulk = 0
+		for job in running:
+			count, models = usage.get(job['user'], (0, 0.0))
+			usage[job['user']] = (count+1, models+job['models'])
+			if job['models'] > BULKMODELS:
+				bulk += 1
+
+		now = time.time()
+		candidates = []
+		for job in jobs.values():
+			if not job['state'] == 'QUEUED':
+				continue
+			if usage.get(job['user'], (0, 0.0))[0] >= MAXUSERJOBS:
+				continue
+			if job['models'] > BULKMODELS and bulk >= MAXBULKJOBS:
+				continue
+			candidates.append((-self._Score(job, usage, now), job['submitted'], job['jobid']))
+
+		if not len(candidates):
+			return None
+
+		candidates.sort()
+		return candidates[0][2]
+
+	def EstimateModels(self, formdata, workflowsequence, nfiles=0):
+
+		"""Estimate the number of models a job will generate or analyse. Model building
+		   plugins contribute their requested number of models, otherwise the number
+		   of uploaded files is used"""
+
+		models = 0.0
+		for job in workflowsequence:
+			options = formdata.get(str(job), {})
+			if str(options.get('useplugin', True)) == 'False':
+				continue
+			if workflowsequence[job] == 'ModelNucleicAcids':
+				try:
+					models = models+float(options.get('number', 0))
+				except (TypeError, ValueError):
+					models = models+float(MAXMODELS)
+
+		return max(models, float(nfiles), 1.0)
+
+	def Submit(self, jobid, user, models):
+
+		"""Register the job in the queue. Returns an error message when the job is refused
+		   and an empty string otherwise"""
+
+		if models > MAXJOBMODELS:
+			return "The job is estimated to generate %i models, exceeding the limit of %i models per job\n" % (models, MAXJOBMODELS)
+
+		job = {'jobid':jobid, 'user':str(user).replace(' ', '_'), 'models':models, 'submitted':time.time(),
+		       'pid':os.getpid(), 'state':'QUEUED'}
+
+		lock = self._Lock()
+		try:
+			self._WriteJob(job)
+		finally:
+			self._Unlock(lock)
+
+		return ""
+
+	def WaitForSlot(self, jobid, poll=POLLTIME):
+
+		"""Block until the job is selected to run and mark it as running"""
+
+		while True:
+			lock = self._Lock()
+			try:
+				jobs = self._ReadJobs()
+				if not jobs.has_key(jobid):
+					return False
+				if self._NextJob(jobs) == jobid:
+					jobs[jobid]['state'] = 'RUNNING'
+					self._WriteJob(jobs[jobid])
+					return True
+			finally:
+				self._Unlock(lock)
+			time.sleep(poll)
+
+	def Finish(self, jobid):
+
+		"""Remove the job from the queue"""
+
+		lock = self._Lock()
+		try:
+			jobfile = os.path.join(self.queuedir, '%s.job' % jobid)
+			if os.path.isfile(jobfile):
+				os.remove(jobfile)
+		finally:
+			self._Unlock(lock)
+
+	def Status(self):
+
+		"""Return the number of queued and running jobs per user"""
+
+		lock = self._Lock()
+		try:
+			jobs = self._ReadJobs()
+		finally:
+			self._Unlock(lock)
+
+		status = {}
+		for job in jobs.values():
+			if not status.has_key(job['user']):
+				status[job['user']] = {'QUEUED':0, 'RUNNING':0}
+			status[job['user']][job['state']] += 1
+
+		return status
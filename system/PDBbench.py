@@ -0,0 +1,196 @@
+#!/usr/bin/env python2.7
+
+USAGE = """
+==========================================================================================
+
+Author:               3D-DART contributors
+Copyright (C):        2026 (DART project)
+DART version:         1.3 development (19-10-2026)
+DART system module:   PDBbench.py
+Module function:      Benchmark of the vectorised PDB parser of PDBio against the line
+                      by line parser it replaced in PDBeditor, kept here as reference.
+                      An ensemble of --models copies of a structure is written as
+                      MODEL/ENDMDL blocks, parsed with both parsers and the resulting
+                      atom tables are compared column by column. Reports parse time
+                      and atoms per second of both parsers.
+Examples:             PDBbench.py --models 2000
+                      PDBbench.py --pdb ensemble.pdb --repeat 5
+Dependencies:         NumPy, DART package (AtomTable, PDBio)
+
+==========================================================================================
+"""
+
+"""Import modules"""
+import os, sys, re, time, tempfile
+from optparse import OptionParser
+from AtomTable import AtomTable, COLUMNS
+from PDBio import ParsePDB, TERROW
+
+def LineParser(lines):
+
+	"""Reference line by line PDB parser. Returns the AtomTable and a dictionary with the
+	   header, title, footer, end and model lines"""
+
+	atom_hetatm = re.compile('(ATOM  |TER   |HETATM)')
+	head = re.compile('^(HEADER|COMPND|SOURCE|JRNL|HELIX|REMARK|SEQRES|CRYST1|SCALE|ORIG)')
+	title = re.compile('^TITLE')
+	foot = re.compile('(CONECT|MASTER)')
+	end = re.compile('(END)')
+	model = re.compile('(MODEL)')
+	element = re.compile('[A-Za-z ][A-Za-z]')
+
+	records = {'header':[], 'title':[], 'footer':[], 'end':[], 'model':[]}
+	columns = {}
+	for name, dtype in COLUMNS:
+		columns[name] = []
+	coord = []
+	rawline = []
+
+	for line in lines:
+		if atom_hetatm.match(line):
+			line = line.rstrip('\r\n')
+			if line.startswith("TER"):
+				continue
+
+			if len(line) > 22 and len(columns['chain']) and not columns['chain'][-1] == line[21]:
+				for name, dtype in COLUMNS:
+					columns[name].append(TERROW[name])
+				coord.append((0.000, 0.000, 0.000))
+				rawline.append(None)
+
+			columns['label'].append(line[0:6])
+			columns['atnum'].append(int(line[6:12]))
+			columns['atname'].append(line[12:16])
+			columns['atalt'].append(line[16:17])
+			columns['resname'].append(line[17:21])
+			columns['chain'].append(line[21])
+			columns['resnum'].append(int(line[22:26]))
+			columns['resext'].append(line[26:27])
+
+			try:
+				coord.append((float(line[30:38]), float(line[38:46]), float(line[46:54])))
+			except ValueError:
+				print "    * ERROR: coordinate error in line:"
+				print "     ", line
+				coord.append((0.000, 0.000, 0.000))
+
+			try:
+				columns['occ'].append(float(line[54:60]))
+			except ValueError:
+				columns['occ'].append(1.00)
+
+			try:
+				columns['b'].append(float(line[60:66]))
+			except ValueError:
+				columns['b'].append(0.00)
+
+			columns['hdoc_chain'].append(line[72:73])
+
+			if element.match(line[76:78]):
+				columns['elem'].append(line[76:78])
+			else:
+				columns['elem'].append(line[12:14])
+
+			if line.startswith("HETATM"):
+				rawline.append(line)
+			else:
+				rawline.append(None)
+
+		elif head.match(line):
+			records['header'].append(line[:-1])
+		elif foot.match(line):
+			records['footer'].append(line[:-1])
+		elif end.match(line):
+			records['end'].append(line[:-1])
+		elif model.match(line[:-1]):
+			records['model'].append(line)
+		elif title.match(line):
+			records['title'].append(line[:-1])
+
+	return AtomTable().Fill(columns, coord, rawline), records
+
+def Compare(reference, table):
+
+	"""Return the names of the columns that differ between two atom tables"""
+
+	differ = []
+	for name in [name for name, dtype in COLUMNS]+['coord', 'line']:
+		if not getattr(reference, name).shape == getattr(table, name).shape:
+			differ.append(name)
+		elif not (getattr(reference, name) == getattr(table, name)).all():
+			differ.append(name)
+
+	return differ
+
+def MakeEnsemble(pdb, models, outfile):
+
+	"""Write models copies of the ATOM/HETATM records of pdb as MODEL/ENDMDL ensemble"""
+
+	atoms = [line for line in open(pdb, 'r') if line.startswith('ATOM  ') or line.startswith('HETATM')]
+
+	out = open(outfile, 'w')
+	out.write("REMARK DART parser benchmark ensemble of %i models\n" % models)
+	for model in range(1, models+1):
+		out.write("MODEL %i\n" % model)
+		out.writelines(atoms)
+		out.write("ENDMDL\n")
+	out.write("END\n")
+	out.close()
+
+def Benchmark(pdb, repeat=3, out=sys.stdout):
+
+	"""Time both parsers on pdb, best of repeat runs, and check that the results are equal"""
+
+	data = open(pdb, 'r').read()
+
+	timing = {}
+	for name in ('line', 'vectorised'):
+		best = None
+		for run in range(repeat):
+			start = time.time()
+			if name == 'line':
+				table, records = LineParser(data.splitlines(True))
+			else:
+				table, records = ParsePDB(data)
+			runtime = time.time()-start
+			if best is None or runtime < best:
+				best = runtime
+		timing[name] = (best, table, records)
+
+	natoms = int(timing['line'][1].IsAtom().sum())
+	out.write("--> Parsed %s: %i atoms, %i bytes\n" % (os.path.basename(pdb), natoms, len(data)))
+	for name in ('line', 'vectorised'):
+		out.write("    * %-10s parser: %8.3f s %12.0f atoms/s\n" % (name, timing[name][0], natoms/max(timing[name][0], 1e-9)))
+	out.write("    * Speedup: %1.1f\n" % (timing['line'][0]/max(timing['vectorised'][0], 1e-9)))
+
+	differ = Compare(timing['line'][1], timing['vectorised'][1])
+	if not timing['line'][2] == timing['vectorised'][2]:
+		differ.append('records')
+	if len(differ):
+		out.write("    * ERROR: parsers differ in: %s\n" % ', '.join(differ))
+	else:
+		out.write("    * Atom tables and records identical\n")
+
+	return timing
+
+if __name__ == '__main__':
+
+	DARTDIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+	parser = OptionParser(usage=USAGE)
+	parser.add_option("-f", "--pdb", action="store", dest="pdb", type="string", default=os.path.join(DARTDIR, 'example', 'struct_1.pdb'), help="Structure used to build the ensemble, or ensemble file with --nobuild")
+	parser.add_option("-m", "--models", action="store", dest="models", type="int", default=2000, help="Number of models in the benchmark ensemble")
+	parser.add_option("-r", "--repeat", action="store", dest="repeat", type="int", default=3, help="Number of timed runs per parser")
+	parser.add_option("-n", "--nobuild", action="store_true", dest="nobuild", default=False, help="Benchmark on the supplied file as is")
+	(options, args) = parser.parse_args()
+
+	if options.nobuild:
+		Benchmark(options.pdb, repeat=options.repeat)
+	else:
+		handle, ensemble = tempfile.mkstemp(suffix='.pdb')
+		os.close(handle)
+		try:
+			MakeEnsemble(options.pdb, options.models, ensemble)
+			Benchmark(ensemble, repeat=options.repeat)
+		finally:
+			os.remove(ensemble)
@@ -0,0 +1,630 @@
+#!/usr/bin/env python2.7
+
+USAGE = """
+==========================================================================================
+
+Author:               3D-DART contributors
+Copyright (C):        2026 (DART project)
+DART version:         1.3 development (19-10-2026)
+DART system module:   PDBio.py
+Module function:      Vectorised reader for fixed-column PDB files. The file is handled
+                      as one byte buffer: line boundaries are located with NumPy, the
+                      ATOM and HETATM records are cut in fixed columns for blocks of
+                      CHUNK lines at a time and numeric columns are converted with
+                      digit arithmetic instead of per-line float() and int() calls.
+                      The result is an AtomTable identical to the one of the line by
+                      line parser of PDBeditor: a TER row is inserted at every change
+                      of chain ID, TER records are not stored and header, title,
+                      footer, END and MODEL lines are collected separately.
+                      Ensemble files are split in a single streaming pass over the
+                      MODEL or TER blocks; the byte offsets of the blocks are kept in
+                      an index file next to the ensemble so selected models can be
+                      read later without scanning the file again.
+                      Atom tables are written back in blocks of CHUNK records: the fixed
+                      columns of the ATOM records of a block are filled in one byte array
+                      and written as one buffer.
+                      The DART XML representation (chain, resid and atom elements) is
+                      written the same way, without building a document tree first.
+                      Atom and residue numbers beyond 99999 and 9999 are read and written
+                      in the hybrid-36 notation of the wwPDB (A0000, a0000 ...).
+Dependencies:         NumPy, DART package (AtomTable)
+
+==========================================================================================
+"""
+
+"""Import modules"""
+import os, re
+import numpy
+from AtomTable import AtomTable, COLUMNS
+
+CHUNK = 262144		# Number of lines cut into columns at once
+INDEXEXT = '.idx'	# Extension of the model offset index written next to an ensemble
+PARSERVERSION = 1	# Increase on every change of the ParsePDB output, invalidates the structure cache
+
+"""Record classification, identical to the PDBeditor line parser"""
+HEAD = re.compile('^(HEADER|COMPND|SOURCE|JRNL|HELIX|REMARK|SEQRES|CRYST1|SCALE|ORIG)')
+TITLE = re.compile('^TITLE')
+FOOT = re.compile('(CONECT|MASTER)')
+END = re.compile('(END)')
+MODEL = re.compile('(MODEL)')
+
+"""PDB ATOM record format"""
+PDBLINE = '%-6s%5i %-4s%1s%-4s%1s%4i%1s   %8.3f%8.3f%8.3f%6.2f%6.2f%10s%2s\n'
+
+"""DART XML elements as written by XMLwriter.Node.xml(): sorted attributes, two space indent"""
+XMLCHAIN = '  <chain ID="%s">\n'
+XMLRESID = '    <resid ID="%s" nr="%i">\n'
+XMLATOM = '      <atom ID="%s" b="%s" corx="%s" cory="%s" corz="%s" nr="%i" occ="%s"/>\n'
+XMLESCAPE = [('&', '&amp;'), ('<', '&lt;'), ('"', '&quot;'), ('>', '&gt;')]
+
+"""Atom table row inserted at a change of chain ID"""
+TERROW = {'label':'TER   ', 'atnum':0, 'atname':'', 'atalt':'', 'resname':'', 'chain':'',
+          'resnum':0, 'resext':'', 'occ':0.0, 'b':0.0, 'hdoc_chain':'', 'elem':''}
+
+"""Hybrid-36 digits, the upper case range follows 9999(9), the lower case range follows it"""
+DIGITS36 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+def Hybrid36Decode(text, width):
+
+	"""Convert a hybrid-36 number field of width characters (5 for atom, 4 for residue
+	   numbers) to an integer. Decimal numbers are converted as is"""
+
+	text = text.strip()
+	if not text or not text[0].isalpha():
+		return int(text)
+
+	if len(text) == width and text[0].isupper() and text.isupper():
+		return int(text, 36)-10*36**(width-1)+10**width
+	if len(text) == width and text[0].islower() and text.islower():
+		return int(text, 36)+16*36**(width-1)+10**width
+	raise ValueError("invalid literal for hybrid-36 number: '%s'" % text)
+
+def Hybrid36Encode(values, width):
+
+	"""Format integers in [10**width, 10**width+52*36**(width-1)) as hybrid-36 fields.
+	   Returns the (N,width) uint8 field"""
+
+	values = numpy.asarray(values, dtype='i8')-10**width
+	span = 26*36**(width-1)
+	lower = values >= span
+	values = numpy.where(lower, values-span, values)+10*36**(width-1)
+
+	field = numpy.empty((len(values),width), dtype='u1')
+	upper = numpy.frombuffer(DIGITS36, dtype='u1')
+	digits = numpy.where(upper >= 65, upper+32, upper).astype('u1')
+	for col in range(width-1, -1, -1):
+		value = values % 36
+		field[:,col] = numpy.where(lower, digits[value], upper[value])
+		values = values//36
+
+	return field
+
+def _Gather(buf, starts, lengths, first, last):
+
+	"""Return columns first:last of the lines as (N,last-first) uint8 array. Columns beyond
+	   the end of a line are NUL"""
+
+	cols = numpy.arange(first, last)
+	inline = cols[None,:] < lengths[:,None]
+	index = starts[:,None]+cols[None,:]
+	index[~inline] = 0
+
+	field = buf[index]
+	field[~inline] = 0
+
+	return field
+
+def _Strings(field):
+
+	"""View a (N,w) uint8 field as array of strings of width w"""
+
+	return numpy.ascontiguousarray(field).view('S%i' % field.shape[1]).ravel()
+
+def _Numbers(field):
+
+	"""Convert a right justified (N,w) uint8 number field to floats using digit arithmetic.
+	   Returns the values, a mask of the fields that hold a plain decimal number and a
+	   mask of the blank fields. All other fields (exponents, hybrid-36) have to be
+	   converted by the caller"""
+
+	digits = field.astype('i2')-48
+	isdigit = (digits >= 0) & (digits <= 9)
+	blank = (field == 32) | (field == 0)
+	minus = field == 45
+	point = field == 46
+
+	valid = (isdigit | blank | minus | point).all(axis=1) & isdigit.any(axis=1) & (point.sum(axis=1) <= 1) & (minus.sum(axis=1) <= 1)
+
+	"""No blanks inside the number and a minus sign only in front"""
+	width = field.shape[1]
+	filled = ~blank
+	first = numpy.argmax(filled, axis=1)
+	last = width-1-numpy.argmax(filled[:,::-1], axis=1)
+	valid = valid & (filled.sum(axis=1) == last-first+1)
+	valid = valid & (~minus.any(axis=1) | minus[numpy.arange(len(field)),first])
+
+	value = numpy.zeros(len(field), dtype='i8')
+	for col in range(field.shape[1]):
+		value = numpy.where(isdigit[:,col], value*10+digits[:,col], value)
+	decimals = (isdigit & (numpy.cumsum(point, axis=1) > 0)).sum(axis=1)
+
+	number = value/(10.0**decimals)		# Division of exact integers is correctly rounded,
+	number = numpy.where(minus.any(axis=1), -number, number)	# equal to float() of the text
+
+	return number, valid, blank.all(axis=1)
+
+def _Floats(field, default=None, error=None):
+
+	"""Convert a number field to floats. Fields that are no plain decimal number are
+	   converted with float(); if that fails the default is used or, without default,
+	   error(row) is called and 0.0 is used"""
+
+	number, valid, empty = _Numbers(field)
+	if default is not None:
+		number[empty] = default
+		valid = valid | empty
+
+	if not valid.all():
+		text = _Strings(field)
+		for row in numpy.flatnonzero(~valid):
+			try:
+				number[row] = float(text[row])
+			except ValueError:
+				if default is not None:
+					number[row] = default
+				else:
+					if error is not None:
+						error(row)
+					number[row] = 0.0
+
+	return number
+
+def _Ints(field, width):
+
+	"""Convert an integer field, fields that are no plain integer are converted as
+	   hybrid-36 number of width digits"""
+
+	number, valid, empty = _Numbers(field)
+	valid = valid & ~(field == 46).any(axis=1)
+	number = number.astype('i8')
+	if not valid.all():
+		text = _Strings(field)
+		for row in numpy.flatnonzero(~valid):
+			number[row] = Hybrid36Decode(text[row], width)
+
+	return number
+
+def Field(column):
+
+	"""View a string column as (N,itemsize) uint8 field, NUL padded"""
+
+	column = numpy.ascontiguousarray(column)
+	return column.view('u1').reshape(len(column), column.itemsize)
+
+def Justify(column, width, right=False):
+
+	"""Return a string column blank padded to width, left or right justified"""
+
+	return _Strings(_Text(column, width, right))
+
+def FloatColumn(column, default=None, error=None):
+
+	"""Convert a string column to floats as _Floats"""
+
+	return _Floats(Field(column), default, error)
+
+def IntColumn(column, width=5):
+
+	"""Convert a string column to integers as _Ints"""
+
+	return _Ints(Field(column), width)
+
+def LineIndex(data):
+
+	"""Return start offsets and lengths (without line terminator) of all lines in data"""
+
+	buf = numpy.frombuffer(data, dtype='u1')
+	ends = numpy.flatnonzero(buf == 10)
+	if len(buf) and not buf[-1] == 10:
+		ends = numpy.append(ends, len(buf))
+
+	starts = numpy.empty(len(ends), dtype='i8')
+	if len(ends):
+		starts[0] = 0
+		starts[1:] = ends[:-1]+1
+
+	lengths = ends-starts
+	carriage = numpy.zeros(len(ends), dtype=bool)
+	nonempty = lengths > 0
+	carriage[nonempty] = buf[ends[nonempty]-1] == 13
+	lengths = lengths-carriage
+
+	return buf, starts, lengths
+
+def _ParseAtoms(data, buf, starts, lengths, errors):
+
+	"""Cut the ATOM/HETATM lines given by starts and lengths in columns"""
+
+	columns = {}
+	columns['label'] = _Strings(_Gather(buf, starts, lengths, 0, 6))
+	columns['atnum'] = _Ints(_Gather(buf, starts, lengths, 6, 12), 5)
+	columns['atname'] = _Strings(_Gather(buf, starts, lengths, 12, 16))
+	columns['atalt'] = _Strings(_Gather(buf, starts, lengths, 16, 17))
+	columns['resname'] = _Strings(_Gather(buf, starts, lengths, 17, 21))
+	columns['chain'] = _Strings(_Gather(buf, starts, lengths, 21, 22))
+	columns['resnum'] = _Ints(_Gather(buf, starts, lengths, 22, 26), 4)
+	columns['resext'] = _Strings(_Gather(buf, starts, lengths, 26, 27))
+
+	def error(row):
+		if not errors.has_key(row):
+			errors[row] = data[starts[row]:starts[row]+lengths[row]]
+
+	coord = numpy.empty((len(starts),3), dtype='f8')
+	for axis, first in ((0,30), (1,38), (2,46)):
+		coord[:,axis] = _Floats(_Gather(buf, starts, lengths, first, first+8), error=error)
+	if len(errors):
+		coord[sorted(errors.keys())] = 0.0
+
+	columns['occ'] = _Floats(_Gather(buf, starts, lengths, 54, 60), default=1.00)
+	columns['b'] = _Floats(_Gather(buf, starts, lengths, 60, 66), default=0.00)
+	columns['hdoc_chain'] = _Strings(_Gather(buf, starts, lengths, 72, 73))
+
+	"""Element from columns 77-78 if it looks like an element, otherwise from the atom name"""
+	elem = _Gather(buf, starts, lengths, 76, 78)
+	alpha = ((elem >= 65) & (elem <= 90)) | ((elem >= 97) & (elem <= 122))
+	valid = alpha[:,1] & (alpha[:,0] | (elem[:,0] == 32))
+	columns['elem'] = numpy.where(valid, _Strings(elem), columns['atname'].astype('S2'))
+
+	return columns, coord
+
+def ParsePDB(data):
+
+	"""Parse the content of a PDB file. Returns the AtomTable and a dictionary with the
+	   header, title, footer, end and model lines"""
+
+	records = {'header':[], 'title':[], 'footer':[], 'end':[], 'model':[]}
+	buf, starts, lengths = LineIndex(data)
+
+	parts = []
+	coords = []
+	rawlines = []
+	for first in range(0, len(starts), CHUNK):
+		chunkstarts = starts[first:first+CHUNK]
+		chunklengths = lengths[first:first+CHUNK]
+
+		record = _Strings(_Gather(buf, chunkstarts, chunklengths, 0, 6))
+		atom = (record == 'ATOM  ') | (record == 'HETATM')
+		other = ~(atom | (record == 'TER   '))
+
+		"""Header, footer, END and MODEL records, unterminated last line kept as is"""
+		for row in numpy.flatnonzero(other):
+			line = data[chunkstarts[row]:chunkstarts[row]+chunklengths[row]]
+			if data[chunkstarts[row]+chunklengths[row]:chunkstarts[row]+chunklengths[row]+1] == '\r':
+				line = line+'\r'
+			if HEAD.match(line):
+				records['header'].append(line)
+			elif FOOT.match(line):
+				records['footer'].append(line)
+			elif END.match(line):
+				records['end'].append(line)
+			elif MODEL.match(line):
+				records['model'].append(line+'\n')
+			elif TITLE.match(line):
+				records['title'].append(line)
+
+		if not atom.any():
+			continue
+
+		chunkerrors = {}
+		columns, coord = _ParseAtoms(data, buf, chunkstarts[atom], chunklengths[atom], chunkerrors)
+		for row in sorted(chunkerrors.keys()):
+			print "    * ERROR: coordinate error in line:"
+			print "     ", chunkerrors[row]
+
+		atomstarts = chunkstarts[atom]
+		atomlengths = chunklengths[atom]
+		rawline = numpy.empty(len(coord), dtype=object)
+		for row in numpy.flatnonzero(columns['label'] == 'HETATM'):
+			rawline[row] = data[atomstarts[row]:atomstarts[row]+atomlengths[row]]
+
+		columns['length'] = atomlengths
+		parts.append(columns)
+		coords.append(coord)
+		rawlines.append(rawline)
+
+	return JoinAtoms(parts, coords, rawlines), records
+
+def JoinAtoms(parts, coords, rawlines):
+
+	"""Join the column dictionaries, coordinates and raw records of the parsed chunks of a
+	   file to one AtomTable and insert a TER row before every atom that changes the chain
+	   ID. The length column holds the length of the atom records"""
+
+	table = AtomTable()
+	if not len(parts):
+		return table
+
+	columns = {}
+	for name in [name for name, dtype in COLUMNS]+['length']:
+		columns[name] = numpy.concatenate([part[name] for part in parts])
+	coord = numpy.concatenate(coords)
+	rawline = numpy.concatenate(rawlines)
+
+	breaks = numpy.flatnonzero((columns['chain'][1:] != columns['chain'][:-1]) & (columns['length'][1:] > 22))+1
+
+	for name, dtype in COLUMNS:
+		setattr(table, name, numpy.insert(columns[name].astype(dtype), breaks, TERROW[name]))
+	table.coord = numpy.insert(coord, breaks, 0.0, axis=0)
+	table.line = numpy.insert(rawline, breaks, None)
+
+	return table
+
+def _Text(column, width, right=False):
+
+	"""Return a string column as (N,width) uint8 field padded with blanks, left justified as
+	   %-ws or right justified as %ws"""
+
+	field = numpy.zeros((len(column),width), dtype='u1')
+	chars = numpy.ascontiguousarray(column.astype('S%i' % width)).view('u1').reshape(len(column),width)
+	if right:
+		length = (chars != 0).sum(axis=1)
+		for shift in range(0, width+1):
+			rows = length == width-shift
+			field[rows,shift:] = chars[rows,:width-shift]
+	else:
+		field[:] = chars
+	field[field == 0] = 32
+
+	return field
+
+def _Fixed(values, width, decimals):
+
+	"""Format numbers right justified in width with a fixed number of decimals, as the
+	   %w.df and %wi formats. Returns the (N,width) uint8 field and a mask of the rows
+	   that could not be formatted exactly (too wide, not finite or too close to a
+	   rounding tie) and have to be formatted with the % operator"""
+
+	values = numpy.asarray(values, dtype='f8')
+	scaled = numpy.abs(values)*10**decimals
+	finite = numpy.isfinite(scaled)
+	finite[finite] = scaled[finite] < 1e15
+	scaled[~finite] = 0.0
+	rounded = numpy.floor(scaled+0.5)
+	exact = finite & (numpy.abs(scaled-numpy.floor(scaled)-0.5) > 1e-6)
+	negative = numpy.signbit(values)
+
+	number = rounded.astype('i8')
+	field = numpy.empty((len(values),width), dtype='u1')
+	field.fill(32)
+	used = numpy.zeros(len(values), dtype=bool)
+	for col in range(width-1, -1, -1):
+		position = width-1-col
+		if decimals and position == decimals:
+			field[:,col] = 46
+			continue
+		digit = (number > 0) | (position <= decimals+(decimals > 0))
+		field[digit,col] = 48+(number[digit] % 10)
+		number = number//10
+		sign = ~digit & negative & ~used
+		field[sign,col] = 45
+		used = used | sign
+	fits = (number == 0) & (used | ~negative)
+
+	return field, ~(exact & fits)
+
+def FormatAtoms(table, nohetatm=False):
+
+	"""Iterate over the atom records of an AtomTable formatted as PDB text, one string per
+	   block of CHUNK rows. ATOM rows are formatted as PDBLINE by filling the fixed columns
+	   of a byte array, chain break rows are written as TER and HETATM rows as read unless
+	   nohetatm is set. Rows with numbers that do not fit the fixed columns are formatted
+	   with PDBLINE itself so the output is always identical to the % operator"""
+
+	for first in range(0, len(table), CHUNK):
+		block = table.Take(slice(first, first+CHUNK))
+		atom = block.label == 'ATOM  '
+		hetatm = block.label == 'HETATM'
+
+		lines = numpy.empty(len(block), dtype=object)
+		lines[block.label == 'TER   '] = 'TER   \n'
+		if not nohetatm:
+			lines[hetatm] = [line+'\n' for line in block.line[hetatm].tolist()]
+
+		if atom.any():
+			lines[atom] = FormatRecords(block.Take(atom))
+
+		lines = [line for line in lines.tolist() if line is not None]
+		if len(lines):
+			yield ''.join(lines)
+
+def _XMLText(text, escaped):
+
+	"""Attribute value with XML special characters escaped, escaped caches the results"""
+
+	if not escaped.has_key(text):
+		value = text
+		for char, entity in XMLESCAPE:
+			value = value.replace(char, entity)
+		escaped[text] = value
+
+	return escaped[text]
+
+def FormatXML(table):
+
+	"""Iterate over the DART XML representation of an AtomTable, one string per block of CHUNK
+	   rows. A chain element starts at every change of chain ID, a resid element at every
+	   change of residue number, chain break rows are skipped. Only one block is formatted at
+	   a time, the output is identical to XMLwriter.Node.xml() of PDBeditor.PDB2XML"""
+
+	escaped = {}
+	lastchain = None
+	lastresnum = None
+
+	for first in range(0, len(table), CHUNK):
+		block = table.Take(slice(first, first+CHUNK))
+		block = block.Take(block.IsAtom())
+
+		atoms = block.Lists(['atnum', 'atname', 'resname', 'chain', 'resnum', 'occ', 'b'])
+		coord = block.coord.tolist()
+
+		lines = []
+		for i in xrange(len(block)):
+			if lastchain is None or not atoms['chain'][i] == lastchain:
+				if lastchain is None:
+					lines.append('<DART_pdbx>\n')
+				else:
+					lines.append('    </resid>\n  </chain>\n')
+				lastchain = atoms['chain'][i]
+				lastresnum = atoms['resnum'][i]
+				lines.append(XMLCHAIN % _XMLText(lastchain, escaped))
+				lines.append(XMLRESID % (_XMLText(atoms['resname'][i], escaped), lastresnum))
+			elif not atoms['resnum'][i] == lastresnum:
+				lastresnum = atoms['resnum'][i]
+				lines.append('    </resid>\n')
+				lines.append(XMLRESID % (_XMLText(atoms['resname'][i], escaped), lastresnum))
+
+			lines.append(XMLATOM % (_XMLText(atoms['atname'][i], escaped), atoms['b'][i], coord[i][0],
+			             coord[i][1], coord[i][2], atoms['atnum'][i], atoms['occ'][i]))
+
+		yield ''.join(lines)
+
+	if lastchain is None:
+		yield '<DART_pdbx/>\n'
+	else:
+		yield '    </resid>\n  </chain>\n</DART_pdbx>\n'
+
+def FormatRecords(atoms):
+
+	"""Format all rows of an AtomTable as PDBLINE, returns an object array of lines. Atom and
+	   residue numbers that do not fit their columns are written as hybrid-36 number"""
+
+	record = numpy.empty((len(atoms),79), dtype='u1')
+	record.fill(32)
+	record[:,78] = 10
+	fallback = numpy.zeros(len(atoms), dtype=bool)
+
+	record[:,0:6] = _Text(atoms.label, 6)
+	record[:,12:16] = _Text(atoms.atname, 4)
+	record[:,16:17] = _Text(atoms.atalt, 1)
+	record[:,17:21] = _Text(atoms.resname, 4)
+	record[:,21:22] = _Text(atoms.chain, 1)
+	record[:,26:27] = _Text(atoms.resext, 1)
+	record[:,76:78] = _Text(atoms.elem, 2, right=True)
+	for column, first, width, decimals in ((atoms.atnum,6,5,0), (atoms.resnum,22,4,0), (atoms.coord[:,0],30,8,3),
+	                                        (atoms.coord[:,1],38,8,3), (atoms.coord[:,2],46,8,3), (atoms.occ,54,6,2),
+	                                        (atoms.b,60,6,2)):
+		field, failed = _Fixed(column, width, decimals)
+		if not decimals:
+			hybrid = failed & (column >= 10**width) & (column < 10**width+52*36**(width-1))
+			if hybrid.any():
+				field[hybrid] = Hybrid36Encode(column[hybrid], width)
+				failed = failed & ~hybrid
+		record[:,first:first+width] = field
+		fallback = fallback | failed
+
+	formatted = numpy.ascontiguousarray(record).view('S79').ravel().astype(object)
+	for row in numpy.flatnonzero(fallback):
+		formatted[row] = PDBLINE % (atoms.label[row], atoms.atnum[row], atoms.atname[row], atoms.atalt[row],
+		                 atoms.resname[row], atoms.chain[row], atoms.resnum[row], atoms.resext[row],
+		                 atoms.coord[row,0], atoms.coord[row,1], atoms.coord[row,2], atoms.occ[row],
+		                 atoms.b[row], '', atoms.elem[row])
+
+	return formatted
+
+def Blocks(readfile, mode='MODEL'):
+
+	"""Iterate over the ATOM/HETATM lines of an ensemble file, yielding (block, offset, line)
+	   with block the model number counted from 1 and offset the byte offset of the line.
+	   A new block starts at every line starting with mode (MODEL or TER) that follows a
+	   block with atoms. Only one line is held in memory"""
+
+	atom_hetatm = re.compile('(ATOM  |HETATM)')
+	model = re.compile('(' + mode.upper() + ')')
+
+	block = 1
+	filled = False
+	offset = 0
+	for line in readfile:
+		stripped = line.strip()
+		if model.match(stripped):
+			if filled:
+				block += 1
+				filled = False
+		elif atom_hetatm.match(stripped):
+			filled = True
+			yield block, offset, line
+		offset += len(line)
+
+def _IndexStamp(ensemble, mode):
+
+	stat = os.stat(ensemble)
+	return "# DART model index %s %i %i" % (mode.upper(), stat.st_size, int(stat.st_mtime))
+
+def WriteIndex(ensemble, mode, index):
+
+	"""Write the (start, end) byte offsets of the blocks of ensemble to its index file"""
+
+	try:
+		out = open(ensemble+INDEXEXT, 'w')
+		out.write(_IndexStamp(ensemble, mode)+'\n')
+		for start, end in index:
+			out.write("%i %i\n" % (start, end))
+		out.close()
+	except IOError:
+		print "    * WARNING: could not write model index file", ensemble+INDEXEXT
+
+def ReadIndex(ensemble, mode):
+
+	"""Return the block offsets from the index file of ensemble or None if there is no
+	   index or the ensemble changed since it was written"""
+
+	if not os.path.isfile(ensemble+INDEXEXT):
+		return None
+
+	readfile = open(ensemble+INDEXEXT, 'r')
+	try:
+		if not readfile.readline().strip() == _IndexStamp(ensemble, mode):
+			return None
+		return [tuple([int(offset) for offset in line.split()]) for line in readfile]
+	finally:
+		readfile.close()
+
+def ModelIndex(ensemble, mode='MODEL'):
+
+	"""Return a list of (start, end) byte offsets of the atom records of every block in the
+	   ensemble file. Read from the index file if it is up to date, otherwise the ensemble
+	   is scanned once and the index file written"""
+
+	index = ReadIndex(ensemble, mode)
+	if index is not None:
+		return index
+
+	index = []
+	readfile = open(ensemble, 'rb')
+	for block, offset, line in Blocks(readfile, mode):
+		if block > len(index):
+			index.append([offset, offset])
+		index[-1][1] = offset+len(line)
+	readfile.close()
+
+	index = [tuple(offsets) for offsets in index]
+	WriteIndex(ensemble, mode, index)
+
+	return index
+
+def ReadBlock(readfile, start, end):
+
+	"""Iterate over the ATOM/HETATM lines of a block given by its byte offsets"""
+
+	readfile.seek(start)
+	for line in Blocks(_Range(readfile, end-start)):
+		yield line[2]
+
+def _Range(readfile, size):
+
+	while size > 0:
+		line = readfile.readline()
+		if not line:
+			return
+		size -= len(line)
+		yield line
@@ -0,0 +1,402 @@
+#!/usr/bin/env python2.7
+
+USAGE = """
+==========================================================================================
+
+Author:               3D-DART contributors
+Copyright (C):        2026 (DART project)
+DART version:         1.3 development (19-10-2026)
+DART system module:   Selection.py
+Module function:      Atom selection language. A selection expression is compiled once and
+                      evaluated to a NumPy boolean mask over the atoms of an atom table.
+                      Values are matched against the distinct values of a column, never
+                      atom by atom. Masks are cached by topology (the identifying columns
+                      of the table) and expression, the models of an ensemble share them.
+                      Selections can be written as CNS selection strings for HADDOCK and
+                      simple selections as ProFit atoms and zone.
+
+                      Keywords (values separated by commas or blanks):
+                        chain A,B          chain ID (segid in CNS)
+                        resname ADE,THY    residue name
+                        resnum 1:10,15     residue numbers and ranges (also 1-10, resid)
+                        name P,C*,H?'      atom names, * and ? (or %) as wildcards
+                        element C,N        element, from the atom name if not given
+                        hetero             HETATM records
+                        all                all atoms
+                      Combined with not, and, or and parentheses, not binds strongest and
+                      and binds stronger than or. TER rows are never selected.
+Examples:             Selection.py "chain B and not name P,O1P,O2P" 1a1t.pdb
+Dependencies:         NumPy, DART package (AtomTable)
+
+==========================================================================================
+"""
+
+"""Import modules"""
+import sys, re, hashlib
+import numpy
+
+MAXMASKS = 512		# Number of cached masks, the cache is cleared when full
+
+KEYWORDS = {'chain':'chain', 'segid':'chain', 'resname':'resname', 'resnum':'resnum', 'resid':'resnum',
+            'name':'name', 'element':'element'}
+FLAGS = ['all', 'hetero']
+OPERATORS = ['not', 'and', 'or', '(', ')']
+
+"""Columns that identify the topology of an atom table"""
+TOPOLOGY = ['label', 'atname', 'resname', 'chain', 'resnum', 'resext', 'elem']
+
+RANGE = re.compile(r'^(-?\d+)[:-](-?\d+)$')
+TOKEN = re.compile(r'[()]|[^\s(),]+')
+
+"""Compiled expressions and cached masks by (topology, expression)"""
+SELECTIONS = {}
+MASKS = {}
+
+def Topology(table):
+
+	"""Key of the topology of an atom table: a digest of its identifying columns"""
+
+	digest = hashlib.md5(str(len(table)))
+	for name in TOPOLOGY:
+		digest.update(numpy.ascontiguousarray(getattr(table, name)).tostring())
+
+	return digest.hexdigest()
+
+def _Pattern(value):
+
+	"""Regular expression of a value with * and ? (or %) wildcards, None for plain values"""
+
+	if not ('*' in value or '?' in value or '%' in value):
+		return None
+
+	pattern = ''
+	for char in value:
+		if char == '*':
+			pattern += '.*'
+		elif char in '?%':
+			pattern += '.'
+		else:
+			pattern += re.escape(char)
+
+	return re.compile(pattern+'$')
+
+class _Columns:
+
+	"""Distinct values of the columns of one atom table, computed once per evaluation"""
+
+	def __init__(self, table):
+
+		self.table = table
+		self.unique = {}
+
+	def Unique(self, field):
+
+		"""(distinct values, inverse index) of a stripped string column"""
+
+		if not self.unique.has_key(field):
+			table = self.table
+			if field == 'name':
+				values, inverse = numpy.unique(table.atname, return_inverse=True)
+				values = [value.strip() for value in values.tolist()]
+			elif field == 'resname':
+				values, inverse = numpy.unique(table.resname, return_inverse=True)
+				values = [value.strip() for value in values.tolist()]
+			elif field == 'chain':
+				values, inverse = numpy.unique(table.chain, return_inverse=True)
+				values = values.tolist()
+			elif field == 'element':
+				elems, elem = numpy.unique(table.elem, return_inverse=True)
+				atnames, atname = numpy.unique(table.atname, return_inverse=True)
+				pairs, inverse = numpy.unique(elem*len(atnames)+atname, return_inverse=True)
+				values = [_Element(elems[pair // len(atnames)], atnames[pair % len(atnames)]) for pair in pairs.tolist()]
+			self.unique[field] = (values, inverse)
+
+		return self.unique[field]
+
+def _Element(elem, atname):
+
+	"""Element symbol, the first letter of the atom name when the element column is blank"""
+
+	elem = elem.strip()
+	if elem:
+		return elem.upper()
+	for char in atname.strip():
+		if char.isalpha():
+			return char.upper()
+
+	return ''
+
+class Selection:
+
+	"""A compiled selection expression, evaluate with Mask or write as CNS selection"""
+
+	def __init__(self, expression):
+
+		self.expression = expression
+		self.tokens = TOKEN.findall(expression)
+		self.position = 0
+		self.tree = self._Or()
+		if self.position < len(self.tokens):
+			self._Error("unexpected '%s'" % self.tokens[self.position])
+		del self.tokens
+
+	def _Error(self, message):
+
+		raise ValueError("atom selection '%s': %s" % (self.expression, message))
+
+	def _Next(self):
+
+		if self.position < len(self.tokens):
+			return self.tokens[self.position].lower()
+		return None
+
+	def _Or(self):
+
+		terms = [self._And()]
+		while self._Next() == 'or':
+			self.position += 1
+			terms.append(self._And())
+		if len(terms) == 1:
+			return terms[0]
+		return ('or', terms)
+
+	def _And(self):
+
+		factors = [self._Not()]
+		while self._Next() == 'and':
+			self.position += 1
+			factors.append(self._Not())
+		if len(factors) == 1:
+			return factors[0]
+		return ('and', factors)
+
+	def _Not(self):
+
+		token = self._Next()
+		if token == 'not':
+			self.position += 1
+			return ('not', self._Not())
+		if token == '(':
+			self.position += 1
+			tree = self._Or()
+			if not self._Next() == ')':
+				self._Error("missing ')'")
+			self.position += 1
+			return tree
+		if token in FLAGS:
+			self.position += 1
+			return (token,)
+		if KEYWORDS.has_key(token):
+			self.position += 1
+			values = []
+			while self._Next() is not None and not self._Next() in OPERATORS:
+				if KEYWORDS.has_key(self._Next()) or self._Next() in FLAGS:
+					break
+				values.append(self.tokens[self.position])
+				self.position += 1
+			if not len(values):
+				self._Error("no values for %s" % token)
+			return self._Values(KEYWORDS[token], values)
+		if token is None:
+			self._Error("unexpected end")
+		self._Error("unknown keyword '%s'" % self.tokens[self.position])
+
+	def _Values(self, field, values):
+
+		"""Primitive (field, values), residue numbers as (first, last) ranges"""
+
+		if field == 'resnum':
+			ranges = []
+			for value in values:
+				match = RANGE.match(value)
+				try:
+					if match:
+						ranges.append((int(match.group(1)), int(match.group(2))))
+					else:
+						ranges.append((int(value), int(value)))
+				except ValueError:
+					self._Error("residue number '%s'" % value)
+			return (field, ranges)
+
+		if field == 'element':
+			values = [value.upper() for value in values]
+
+		return (field, values)
+
+	def _Match(self, columns, field, values):
+
+		"""Mask of a keyword, values are matched on the distinct values of the column"""
+
+		table = columns.table
+		if field == 'resnum':
+			mask = numpy.zeros(len(table), dtype=bool)
+			for first, last in values:
+				mask |= (table.resnum >= min(first, last)) & (table.resnum <= max(first, last))
+			return mask
+
+		distinct, inverse = columns.Unique(field)
+		plain = set([value for value in values if _Pattern(value) is None])
+		patterns = [_Pattern(value) for value in values if _Pattern(value) is not None]
+
+		hits = numpy.zeros(len(distinct), dtype=bool)
+		for position, value in enumerate(distinct):
+			hits[position] = value in plain or any([pattern.match(value) for pattern in patterns])
+
+		return hits[inverse]
+
+	def _Evaluate(self, tree, columns):
+
+		kind = tree[0]
+		if kind == 'or':
+			mask = self._Evaluate(tree[1][0], columns)
+			for term in tree[1][1:]:
+				mask = mask | self._Evaluate(term, columns)
+			return mask
+		if kind == 'and':
+			mask = self._Evaluate(tree[1][0], columns)
+			for factor in tree[1][1:]:
+				mask = mask & self._Evaluate(factor, columns)
+			return mask
+		if kind == 'not':
+			return ~self._Evaluate(tree[1], columns)
+		if kind == 'all':
+			return numpy.ones(len(columns.table), dtype=bool)
+		if kind == 'hetero':
+			return columns.table.label == 'HETATM'
+
+		return self._Match(columns, kind, tree[1])
+
+	def Mask(self, atoms, topology=None):
+
+		"""Boolean mask of the selected atoms of an AtomTable (or of the atom table of a
+		   PDBeditor object). The mask is cached and read only, topology is the key of the
+		   table if already known (see Topology)"""
+
+		table = getattr(atoms, 'atoms', atoms)
+		if topology is None:
+			topology = Topology(table)
+
+		key = (topology, self.expression)
+		if not MASKS.has_key(key):
+			if len(MASKS) >= MAXMASKS:
+				MASKS.clear()
+			mask = self._Evaluate(self.tree, _Columns(table)) & table.IsAtom()
+			mask.setflags(write=False)
+			MASKS[key] = mask
+
+		return MASKS[key]
+
+	def _CNS(self, tree):
+
+		kind = tree[0]
+		if kind == 'or':
+			return ' or '.join([self._CNS(term) for term in tree[1]])
+		if kind == 'and':
+			factors = []
+			for factor in tree[1]:
+				if factor[0] == 'or':
+					factors.append('(%s)' % self._CNS(factor))
+				else:
+					factors.append(self._CNS(factor))
+			return ' and '.join(factors)
+		if kind == 'not':
+			if tree[1][0] in ('or', 'and'):
+				return 'not (%s)' % self._CNS(tree[1])
+			return 'not %s' % self._CNS(tree[1])
+		if kind == 'all':
+			return 'all'
+		if kind in ('element', 'hetero'):
+			self._Error("%s selections can not be written as CNS selection" % kind)
+
+		if kind == 'resnum':
+			terms = []
+			for first, last in tree[1]:
+				if first == last:
+					terms.append('resid %i' % first)
+				else:
+					terms.append('resid %i:%i' % (first, last))
+		else:
+			keyword = {'chain':'segid', 'resname':'resname', 'name':'name'}[kind]
+			terms = ['%s %s' % (keyword, value.replace('?', '%')) for value in tree[1]]
+
+		if len(terms) == 1:
+			return terms[0]
+		return '(%s)' % ' or '.join(terms)
+
+	def CNS(self):
+
+		"""The selection as CNS selection string, chains are written as segid"""
+
+		return self._CNS(self.tree)
+
+	def ProFit(self):
+
+		"""The selection as ProFit (atoms, zone). Only a conjunction of at most one chain, one
+		   residue range and one name or not name keyword can be written, zone is None when
+		   the selection has no chain or residues"""
+
+		if self.tree[0] == 'and':
+			factors = self.tree[1]
+		else:
+			factors = [self.tree]
+
+		chain = resnum = None
+		atoms = '*'
+		for factor in factors:
+			kind = factor[0]
+			if kind == 'chain' and chain is None and len(factor[1]) == 1:
+				chain = factor[1][0]
+			elif kind == 'resnum' and resnum is None and len(factor[1]) == 1:
+				resnum = (min(factor[1][0]), max(factor[1][0]))
+			elif kind == 'name' and atoms == '*':
+				atoms = ','.join([value.replace('%', '?') for value in factor[1]])
+			elif kind == 'not' and factor[1][0] == 'name' and atoms == '*':
+				atoms = '^'+','.join([value.replace('%', '?') for value in factor[1][1]])
+			elif not kind == 'all':
+				self._Error("can not be written as ProFit atoms and zone")
+
+		if resnum is not None:
+			zone = '%s%i-%s%i' % (chain or '', resnum[0], chain or '', resnum[1])
+		elif chain is not None:
+			zone = chain+'*'
+		else:
+			zone = None
+
+		return atoms, zone
+
+def Compile(expression):
+
+	"""Compiled Selection of an expression, every expression is compiled once"""
+
+	if not SELECTIONS.has_key(expression):
+		SELECTIONS[expression] = Selection(expression)
+
+	return SELECTIONS[expression]
+
+def Select(atoms, expression, topology=None):
+
+	"""Boolean mask of the atoms selected by expression, see Selection.Mask"""
+
+	return Compile(expression).Mask(atoms, topology)
+
+if __name__ == '__main__':
+
+	"""Print the CNS form of a selection and the number of atoms it selects in PDB files"""
+
+	if len(sys.argv) < 2:
+		print USAGE
+		sys.exit(0)
+
+	import os
+	sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'plugins'))
+	from PDBeditor import PDBeditor
+
+	selection = Compile(sys.argv[1])
+	try:
+		print "--> CNS selection: %s" % selection.CNS()
+	except ValueError:
+		pass
+	for files in sys.argv[2:]:
+		pdb = PDBeditor()
+		pdb.ReadPDB(files)
+		print "    * %s: %i atoms selected" % (files, selection.Mask(pdb).sum())
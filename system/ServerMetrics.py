@@ -0,0 +1,211 @@
+#!/usr/bin/env python2.7
+
+USAGE = """
+==========================================================================================
+
+Author:               3D-DART contributors
+Copyright (C):        2026 (DART project)
+DART version:         1.3 development (19-10-2026)
+DART system module:   ServerMetrics.py
+Module function:      Collects capacity planning numbers for the DART web service from
+                      the job event log (server-tmp/DARTmetrics.log) written by the
+                      WebServer class. Reports the number of queued, running and
+                      finished jobs, job duration and per-plugin step time percentiles,
+                      upload sizes, failure counts and disk usage of the results/ and
+                      server-tmp/ directories as plain text or JSON.
+Dependencies:         Standard python modules
+
+==========================================================================================
+"""
+
+"""Import modules"""
+import os, sys, time
+
+METRICSLOG = 'DARTmetrics.log'
+PERCENTILES = [50, 90, 99]
+
+def LogEvent(DARTDIR, jobid, event, **fields):
+
+	"""Append a job event to the metrics log as a single line: time, job ID, event and
+	   optional key=value fields"""
+
+	line = "%1.3f %s %s" % (time.time(), jobid, event)
+	for key in sorted(fields.keys()):
+		line = line+(" %s=%s" % (key, str(fields[key]).replace(' ','_')))
+
+	log = open(os.path.join(DARTDIR, 'server-tmp', METRICSLOG), 'a')
+	log.write(line+"\n")
+	log.close()
+
+def Percentile(values, percent):
+
+	"""Return the percentile of a list of values using linear interpolation between
+	   the closest ranks"""
+
+	if not len(values):
+		return None
+
+	values = sorted(values)
+	rank = (len(values)-1)*(percent/100.0)
+	lower = int(rank)
+	upper = min(lower+1, len(values)-1)
+
+	return values[lower]+(values[upper]-values[lower])*(rank-lower)
+
+def DiskUsage(path):
+
+	"""Return the total size in bytes of all files below path"""
+
+	size = 0
+	for root, dirs, files in os.walk(path):
+		for name in files:
+			try:
+				size = size+os.lstat(os.path.join(root, name))[6]
+			except OSError:
+				pass
+	return size
+
+class ServerMetrics:
+
+	"""Parse the DART server job event log and summarize it"""
+
+	def __init__(self, DARTDIR=None):
+
+		self.DARTDIR = DARTDIR
+
+		self.jobs = {}
+		self.steptimes = {}
+
+		self._ReadLog()
+
+	def _ReadLog(self):
+
+		"""Read all events from the metrics log into a job centric dictionary"""
+
+		logfile = os.path.join(self.DARTDIR, 'server-tmp', METRICSLOG)
+		if not os.path.isfile(logfile):
+			return
+
+		readfile = open(logfile, 'r')
+		for line in readfile:
+			line = line.split()
+			if len(line) < 3:
+				continue
+
+			fields = {}
+			for field in line[3:]:
+				if '=' in field:
+					key, value = field.split('=', 1)
+					fields[key] = value
+
+			stamp, jobid, event = float(line[0]), line[1], line[2]
+			if event == 'FINISHED' and not fields.get('exit', '0') == '0':
+				event = 'FAILED'		# Jobs logged as finished with a nonzero exit status
+			if not self.jobs.has_key(jobid):
+				self.jobs[jobid] = {'status':None, 'upload':None}
+			job = self.jobs[jobid]
+
+			if event == 'STEP':
+				plugin = fields.get('plugin', 'unknown')
+				if not self.steptimes.has_key(plugin):
+					self.steptimes[plugin] = []
+				self.steptimes[plugin].append(float(fields.get('time', 0)))
+			else:
+				job['status'] = event
+				job[event] = stamp
+				if fields.has_key('upload'):
+					job['upload'] = int(fields['upload'])
+		readfile.close()
+
+	def _Summary(self, values):
+
+		summary = {'count':len(values)}
+		for percent in PERCENTILES:
+			summary['p%i' % percent] = Percentile(values, percent)
+		if len(values):
+			summary['max'] = max(values)
+		else:
+			summary['max'] = None
+
+		return summary
+
+	def Collect(self):
+
+		"""Return a dictionary with all metrics"""
+
+		states = {'QUEUED':0, 'RUNNING':0, 'FINISHED':0, 'FAILED':0}
+		durations = []
+		uploads = []
+
+		for jobid in self.jobs:
+			job = self.jobs[jobid]
+			if states.has_key(job['status']):
+				states[job['status']] += 1
+			if job['status'] in ('FINISHED','FAILED') and job.has_key('RUNNING'):
+				durations.append(job[job['status']]-job['RUNNING'])
+			if job['upload'] is not None:
+				uploads.append(job['upload'])
+
+		metrics = {}
+		metrics['jobs'] = {'queued':states['QUEUED'], 'running':states['RUNNING'],
+		                   'finished':states['FINISHED'], 'failed':states['FAILED']}
+		metrics['duration'] = self._Summary(durations)
+		metrics['upload'] = self._Summary(uploads)
+		metrics['upload']['total'] = sum(uploads)
+		metrics['steps'] = {}
+		for plugin in self.steptimes:
+			metrics['steps'][plugin] = self._Summary(self.steptimes[plugin])
+		metrics['disk'] = {'results':DiskUsage(os.path.join(self.DARTDIR, 'results')),
+		                   'server-tmp':DiskUsage(os.path.join(self.DARTDIR, 'server-tmp'))}
+
+		return metrics
+
+	def _FormatValue(self, value):
+
+		if value is None:
+			return '---'
+		return "%1.2f" % value
+
+	def _FormatSummary(self, name, summary, out):
+
+		out.write("%-24s %6i" % (name, summary['count']))
+		for percent in PERCENTILES:
+			out.write(" %10s" % self._FormatValue(summary['p%i' % percent]))
+		out.write(" %10s\n" % self._FormatValue(summary['max']))
+
+	def Report(self, export='text', out=sys.stdout):
+
+		"""Write the metrics to out as plain text (export='text') or JSON (export='json')"""
+
+		metrics = self.Collect()
+
+		if export == 'json':
+			import json
+			out.write(json.dumps(metrics, sort_keys=True, indent=1))
+			out.write("\n")
+			return
+
+		out.write("DART server metrics %s\n" % time.ctime())
+		out.write("jobs queued: %i running: %i finished: %i failed: %i\n" % (metrics['jobs']['queued'],
+		          metrics['jobs']['running'], metrics['jobs']['finished'], metrics['jobs']['failed']))
+		out.write("disk used results: %i bytes server-tmp: %i bytes\n\n" % (metrics['disk']['results'], metrics['disk']['server-tmp']))
+
+		header = "%-24s %6s" % ('', 'count')
+		for percent in PERCENTILES:
+			header = header+(" %10s" % ('p%i' % percent))
+		out.write(header+(" %10s\n" % 'max'))
+
+		self._FormatSummary('job duration (s)', metrics['duration'], out)
+		self._FormatSummary('upload size (bytes)', metrics['upload'], out)
+		for plugin in sorted(metrics['steps'].keys()):
+			self._FormatSummary('step %s (s)' % plugin, metrics['steps'][plugin], out)
+
+if __name__ == '__main__':
+
+	"""Print the metrics of the DART installation the module is part of"""
+
+	DARTDIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	if len(sys.argv) > 1 and sys.argv[1] == 'json':
+		ServerMetrics(DARTDIR).Report(export='json')
+	else:
+		ServerMetrics(DARTDIR).Report()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python2.7
+
+USAGE = """
+==========================================================================================
+
+Author:               3D-DART contributors
+Copyright (C):        2026 (DART project)
+DART version:         1.3 development (19-10-2026)
+DART system module:   Structure.py
+Module function:      Query interface on the atom table of a parsed structure: chains,
+                      residues, atoms by name and coordinate arrays. Chains, residues
+                      and atoms follow the hierarchy of the DART XML representation
+                      (PDBeditor PDB2XML): a new residue starts at every change of chain
+                      ID or residue number, identifiers are returned without padding
+                      blanks. Queries return NumPy index arrays of residues or atoms that
+                      can be passed to the other queries. Structures exported as DART XML
+                      are read back with ReadXML.
+Dependencies:         NumPy, DART package (AtomTable)
+
+==========================================================================================
+"""
+
+"""Import modules"""
+import numpy
+from xml.etree import cElementTree
+from AtomTable import AtomTable, COLUMNS
+
+class Structure:
+
+	"""Chains, residues and atoms of an AtomTable (or of the atom table of a PDBeditor
+	   object). Chain break (TER) rows are left out"""
+
+	def __init__(self, atoms):
+
+		atoms = getattr(atoms, 'atoms', atoms)
+		self.table = atoms.Take(atoms.IsAtom())
+
+		self.chain = numpy.where(self.table.chain == ' ', '', self.table.chain)
+		self.resnum = self.table.resnum
+
+		new = numpy.ones(len(self.table), dtype=bool)
+		new[1:] = (self.chain[1:] != self.chain[:-1]) | (self.resnum[1:] != self.resnum[:-1])
+		self.resstart = numpy.flatnonzero(new)
+		self.residue = numpy.cumsum(new)-1
+
+		self._atname = None
+
+	def __len__(self):
+
+		return len(self.table)
+
+	def Chains(self):
+
+		"""Chain IDs in order of appearance"""
+
+		chains = []
+		for chain in self.chain[self.resstart].tolist():
+			if not chain in chains:
+				chains.append(chain)
+
+		return chains
+
+	def Residues(self, chain=None):
+
+		"""Index array of the residues, all or of one chain"""
+
+		if chain is None:
+			return numpy.arange(len(self.resstart))
+
+		return numpy.flatnonzero(self.chain[self.resstart] == chain)
+
+	def ResidueNames(self, residues=None):
+
+		"""Residue names of the residues as list of strings"""
+
+		if residues is None:
+			residues = self.Residues()
+
+		return [name.strip() for name in self.table.resname[self.resstart[residues]].tolist()]
+
+	def ResidueNumbers(self, residues=None):
+
+		"""Residue numbers of the residues as list of integers"""
+
+		if residues is None:
+			residues = self.Residues()
+
+		return self.resnum[self.resstart[residues]].tolist()
+
+	def Atoms(self, name=None, chain=None, residues=None):
+
+		"""Index array of the atoms with atom name name, optionally limited to a chain or
+		   to the residues in an index array"""
+
+		select = numpy.ones(len(self.table), dtype=bool)
+		if name is not None:
+			if self._atname is None:
+				self._atname = numpy.char.strip(self.table.atname)
+			select &= self._atname == name
+		if chain is not None:
+			select &= self.chain == chain
+		if residues is not None:
+			inresidue = numpy.zeros(len(self.resstart), dtype=bool)
+			inresidue[residues] = True
+			select &= inresidue[self.residue]
+
+		return numpy.flatnonzero(select)
+
+	def AtomResidues(self, atoms):
+
+		"""Residue index of the atoms in an index array"""
+
+		return self.residue[atoms]
+
+	def Coordinates(self, atoms=None):
+
+		"""(N,3) coordinate array of the atoms, all or those in an index array"""
+
+		if atoms is None:
+			return self.table.coord
+
+		return self.table.coord[atoms]
+
+def ReadXML(source):
+
+	"""Read a DART XML representation of a structure (file name or open file) back to a
+	   Structure"""
+
+	columns = dict([(name, []) for name, dtype in COLUMNS])
+	coord = []
+
+	for chain in cElementTree.parse(source).getroot().findall('chain'):
+		for resid in chain.findall('resid'):
+			for atom in resid.findall('atom'):
+				columns['label'].append('ATOM  ')
+				columns['atnum'].append(int(atom.get('nr')))
+				columns['atname'].append(atom.get('ID'))
+				columns['atalt'].append(' ')
+				columns['resname'].append(resid.get('ID'))
+				columns['chain'].append(chain.get('ID'))
+				columns['resnum'].append(int(resid.get('nr')))
+				columns['resext'].append(' ')
+				columns['occ'].append(float(atom.get('occ')))
+				columns['b'].append(float(atom.get('b')))
+				columns['hdoc_chain'].append(' ')
+				columns['elem'].append(atom.get('ID')[:2])
+				coord.append((float(atom.get('corx')), float(atom.get('cory')), float(atom.get('corz'))))
+
+	return Structure(AtomTable().Fill(columns, coord))
@@ -0,0 +1,238 @@
+#!/usr/bin/env python2.7
+
+USAGE = """
+==========================================================================================
+
+Author:               3D-DART contributors
+Copyright (C):        2026 (DART project)
+DART version:         1.3 development (19-10-2026)
+DART system module:   StructureCache.py
+Module function:      Persistent cache of parsed PDB files. The atom table of a parsed file
+                      is stored as one NumPy .npy file with a record array of all columns,
+                      the header, title, footer, END and MODEL lines in a pickle next to
+                      it. Entries are keyed by the SHA1 hash of the file content and the
+                      parser version of PDBio, a changed file or parser never returns a
+                      stale table. Cached tables are memory mapped copy-on-write: the
+                      columns of the returned AtomTable are views on the mapped file and
+                      only the pages that are read (or edited) are loaded.
+                      The cache is off unless a cache directory is configured with
+                      STRUCTURECACHE in Constants.py or the DART_STRUCTURECACHE
+                      environment variable. When the cache grows beyond MAXCACHESIZE MB
+                      the least recently used entries are removed. The size is counted
+                      per process from the stored entries, the cache directory is only
+                      scanned once and when the count passes the limit. A cache that can
+                      not be written is silently skipped.
+Examples:             StructureCache.py --info
+                      StructureCache.py --clear
+Dependencies:         NumPy, DART package (AtomTable, PDBio)
+
+==========================================================================================
+"""
+
+"""Import modules"""
+import os, sys, glob, hashlib, tempfile, cPickle
+import numpy
+from optparse import OptionParser
+from Constants import *
+from AtomTable import AtomTable, COLUMNS
+from PDBio import ParsePDB, PARSERVERSION
+
+TABLEEXT = '.npy'	# Extension of the cached atom table
+RECORDEXT = '.rec'	# Extension of the cached header, title, footer, END and MODEL lines
+
+"""Size in bytes of the cache directories as counted by this process"""
+CACHESIZE = {}
+
+def CacheDir():
+
+	"""Return the configured cache directory or None if the cache is disabled"""
+
+	cachedir = os.environ.get('DART_STRUCTURECACHE', STRUCTURECACHE)
+	if not cachedir:
+		return None
+
+	return os.path.abspath(os.path.expanduser(cachedir))
+
+class StructureCache:
+
+	"""Content addressed store of parsed atom tables"""
+
+	def __init__(self, cachedir=None, maxsize=MAXCACHESIZE):
+
+		if cachedir is None:
+			cachedir = CacheDir()
+
+		self.cachedir = cachedir
+		self.maxsize = maxsize*1024*1024
+
+		if self.cachedir and not os.path.isdir(self.cachedir):
+			try:
+				os.makedirs(self.cachedir)
+			except OSError:
+				self.cachedir = None
+
+	def Key(self, data):
+
+		"""Cache key of the content of a PDB file"""
+
+		return "%s-p%i" % (hashlib.sha1(data).hexdigest(), PARSERVERSION)
+
+	def _Path(self, key, extension):
+
+		return os.path.join(self.cachedir, key+extension)
+
+	def Load(self, key):
+
+		"""Return the cached (AtomTable, records) of key or None when not in the cache"""
+
+		if not self.cachedir:
+			return None
+
+		try:
+			array = numpy.load(self._Path(key, TABLEEXT), mmap_mode='c')
+			records = cPickle.load(open(self._Path(key, RECORDEXT), 'rb'))
+			os.utime(self._Path(key, TABLEEXT), None)
+		except (IOError, OSError, ValueError, EOFError, cPickle.UnpicklingError):
+			return None
+
+		table = AtomTable()
+		for name, dtype in COLUMNS:
+			setattr(table, name, array[name])
+		table.coord = array['coord']
+
+		table.line = numpy.empty(len(array), dtype=object)
+		hetatm = numpy.flatnonzero(array['label'] == 'HETATM')
+		table.line[hetatm] = array['line'][hetatm].tolist()
+
+		return table, records
+
+	def Store(self, key, table, records):
+
+		"""Write the atom table and records to the cache. Empty tables are not stored"""
+
+		if not self.cachedir or not len(table):
+			return
+
+		hetatm = table.label == 'HETATM'
+		width = max([1]+[len(line) for line in table.line[hetatm].tolist()])
+
+		array = numpy.zeros(len(table), dtype=COLUMNS+[('coord','f8',(3,)), ('line','S%i' % width)])
+		for name, dtype in COLUMNS:
+			array[name] = getattr(table, name)
+		array['coord'] = table.coord
+		array['line'][hetatm] = table.line[hetatm].tolist()
+
+		# Write to temporary files first, concurrent readers only see complete entries
+		try:
+			stored = 0
+			for extension, dump in ((RECORDEXT, lambda out: cPickle.dump(records, out, 2)),
+			                        (TABLEEXT, lambda out: numpy.save(out, array))):
+				handle, tmpfile = tempfile.mkstemp(dir=self.cachedir, suffix='.tmp')
+				out = os.fdopen(handle, 'wb')
+				try:
+					dump(out)
+					out.close()
+					stored += os.path.getsize(tmpfile)
+					os.rename(tmpfile, self._Path(key, extension))
+				except:
+					out.close()
+					os.remove(tmpfile)
+					raise
+		except (IOError, OSError):
+			return
+
+		if not CACHESIZE.has_key(self.cachedir):
+			CACHESIZE[self.cachedir] = sum([size for used, size, key in self.Entries()])
+		else:
+			CACHESIZE[self.cachedir] += stored
+		if CACHESIZE[self.cachedir] > self.maxsize:
+			self.Evict()
+
+	def Entries(self):
+
+		"""Return the cached entries as list of (last used, size in bytes, key), least
+		   recently used first"""
+
+		entries = []
+		if not self.cachedir:
+			return entries
+
+		for tablefile in glob.glob(os.path.join(self.cachedir, '*'+TABLEEXT)):
+			key = os.path.basename(tablefile)[:-len(TABLEEXT)]
+			try:
+				used = os.path.getmtime(tablefile)
+				size = os.path.getsize(tablefile)
+				if os.path.isfile(self._Path(key, RECORDEXT)):
+					size += os.path.getsize(self._Path(key, RECORDEXT))
+			except OSError:
+				continue
+			entries.append((used, size, key))
+
+		entries.sort()
+		return entries
+
+	def Remove(self, key):
+
+		for extension in (TABLEEXT, RECORDEXT):
+			try:
+				os.remove(self._Path(key, extension))
+			except OSError:
+				pass
+
+	def Evict(self):
+
+		"""Remove least recently used entries until the cache is smaller than maxsize"""
+
+		entries = self.Entries()
+		total = sum([size for used, size, key in entries])
+		for used, size, key in entries:
+			if total <= self.maxsize:
+				break
+			self.Remove(key)
+			total -= size
+		CACHESIZE[self.cachedir] = total
+
+	def Clear(self):
+
+		for used, size, key in self.Entries():
+			self.Remove(key)
+		CACHESIZE[self.cachedir] = 0
+
+	def Parse(self, data):
+
+		"""Return the (AtomTable, records) of the PDB file content data from the cache, parse
+		   and store it if not cached yet"""
+
+		if not self.cachedir:
+			return ParsePDB(data)
+
+		key = self.Key(data)
+		cached = self.Load(key)
+		if cached is not None:
+			return cached
+
+		table, records = ParsePDB(data)
+		self.Store(key, table, records)
+
+		return table, records
+
+if __name__ == '__main__':
+
+	parser = OptionParser(usage=USAGE)
+	parser.add_option("-d", "--cachedir", action="store", dest="cachedir", type="string", help="Cache directory, default from Constants.py or DART_STRUCTURECACHE")
+	parser.add_option("-i", "--info", action="store_true", dest="info", default=False, help="Print the number of cached structures and cache size")
+	parser.add_option("-c", "--clear", action="store_true", dest="clear", default=False, help="Remove all cached structures")
+	(options, args) = parser.parse_args()
+
+	cache = StructureCache(cachedir=options.cachedir)
+	if not cache.cachedir:
+		print "    * WARNING: structure cache disabled or cache directory not writable"
+		sys.exit(0)
+
+	if options.clear:
+		cache.Clear()
+		print "--> Structure cache %s cleared" % cache.cachedir
+	else:
+		entries = cache.Entries()
+		print "--> Structure cache %s: %i structures, %1.1f of %i MB" % (cache.cachedir, len(entries),
+		      sum([size for used, size, key in entries])/1048576.0, cache.maxsize/1048576)
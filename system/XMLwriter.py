@@ -22,7 +22,9 @@ Module function:	Rapidly assemble XML using minimal coding.
 					Node("tag", attr1 = "attr1", attr2 = "attr2")
 
 					To produce xml from a finished Node n, say n.xml() (for 
-					nicely formatted output) or n.rawxml().
+					nicely formatted output) or n.rawxml(). To write it to a
+					file, say n.write(outfile) or n.write(outfile, indent=None)
+					for the raw form.
 
 					You can read and modify the attributes of an xml Node using 
 					getAttribute(), setAttribute(), or delAttribute().
@@ -48,6 +50,10 @@ Module function:	Rapidly assemble XML using minimal coding.
 					This implementation uses xml.dom.minidom which is available
 					in the standard Python 2.4 library. However, it can be 
 					retargeted to use other XML libraries without much effort.
+					Nodes have no instance dictionary (__slots__) and are
+					serialized directly, in the format of minidom, without
+					building a minidom tree. The minidom is only made for dom()
+					and parsed by create().
 Module depenencies:	python2.4 xml.dom.minidom modules
 
 for further information, please contact:
@@ -60,11 +66,23 @@ for further information, please contact:
 from xml.dom.minidom import getDOMImplementation, parseString
 import copy, re
 
+def _escape(data):
+    """
+    Escape text for XML character data and attribute values as
+    minidom does.
+    """
+    if not data:
+        return ''
+    return data.replace("&", "&amp;").replace("<", "&lt;"). \
+                replace("\"", "&quot;").replace(">", "&gt;")
+
 class Node(object):
     """
     Everything is a Node. The XML is maintained as (very efficient)
     Python objects until an XML representation is needed.
     """
+    __slots__ = ('tag', 'attributes', 'children', 'value')
+
     def __init__(self, tag, value = None, **attributes):
         self.tag = tag.strip()
         self.attributes = attributes
@@ -185,11 +203,44 @@ class Node(object):
                 element.appendChild(child.dom()) # Generate children as well
         return element
 
+    def write(self, out, indent = '  '):
+        """
+        Write the XML of this node to a file-like object, formatted
+        as xml() with this indent or as rawxml() if indent is None.
+        """
+        if indent is None:
+            self._write(out.write, '', '', '')
+        else:
+            self._write(out.write, '', indent, '\n')
+
+    def _write(self, write, margin, indent, newl):
+        """
+        Write the element, its attributes in sorted order and its
+        value or subnodes as minidom writexml.
+        """
+        write(margin + "<" + self.tag)
+        for key in sorted(self.attributes):
+            write(" %s=\"%s\"" % (key, _escape(self.attributes[key])))
+        if self.value:
+            assert not self.children, "cannot have value and children: " + str(self)
+            write(">%s</%s>%s" % (_escape(self.value), self.tag, newl))
+        elif self.children:
+            write(">" + newl)
+            for child in self.children:
+                child._write(write, margin + indent, indent, newl)
+            write("%s</%s>%s" % (margin, self.tag, newl))
+        else:
+            write("/>" + newl)
+
     def xml(self, separator = '  '):
-        return self.dom().toprettyxml(separator)
+        parts = []
+        self._write(parts.append, '', separator, '\n')
+        return ''.join(parts)
 
     def rawxml(self):
-        return self.dom().toxml()
+        parts = []
+        self._write(parts.append, '', '', '')
+        return ''.join(parts)
 
     #staticmethod
     def create(dom):
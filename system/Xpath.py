@@ -40,16 +40,32 @@ Module function:	Independent Xpath-like implementation for quering XML documents
 					Evaluate with the optione source=<node adress>. The function
 					ClearResult will empty the lists of stored results ready for
 					excepting a new query on stored nodes
-Module depenencies:	Standard python2.4 modules
+					Documents are parsed with cElementTree and every query is compiled
+					once to tag and attribute matchers. The nodes in nodeselection
+					are light wrappers of the ElementTree elements with the toxml
+					method of DOM nodes. DOMXpath is the original minidom
+					implementation for code that needs DOM nodes.
+					Queries on the document for elements with attribute values
+					use an index of (element, attribute, value) to the nodes. The
+					index is build on first use and kept with the document, a
+					repeated query does not scan the document again.
+Module depenencies:	Standard python2.5 modules
 
 ==========================================================================================
 """
 
 """Import modules"""
 from xml.dom import EMPTY_NAMESPACE, minidom, Node
-import sys,string
+from xml.etree import cElementTree
+import os,sys,string,re,StringIO
 
-class Xpath:
+"""Inputs opened with urllib, other strings are file names or XML text"""
+URL = re.compile(r'^(http|https|ftp|file)://', re.IGNORECASE)
+
+"""Compiled queries by query representation"""
+QUERIES = {}
+
+class DOMXpath:
 	
 	"""Independent Xpath-like implementation for quering XML documents.
            Load XML document as file, string or URL. XML documents can be
@@ -286,6 +302,291 @@ class Xpath:
 	     		for node in self.nodeselection[level-1]:
 					self._WalkTree(parent=node,level=level)
 
+class XMLNode(object):
+	
+	"""Node of a query result: an ElementTree element with the tagName and toxml of a DOM
+	   element node"""
+	
+	__slots__ = ('element',)
+	
+	def __init__(self, element):
+		
+		self.element = element
+	
+	@property
+	def tagName(self):
+		
+		return self.element.tag
+	
+	def toxml(self):
+		
+		"""The element as XML text, without the text that follows it"""
+		
+		tail = self.element.tail
+		self.element.tail = None
+		try:
+			return cElementTree.tostring(self.element)
+		finally:
+			self.element.tail = tail
+
+def _AttributeTests(attrquery):
+	
+	"""The attribute part of a node query as list of (name, value(s), multiple values)"""
+	
+	if attrquery == None:
+		return None
+	
+	tests = []
+	for name, value in attrquery.items():
+		if type(value) == type([]):
+			try:
+				value = frozenset(value)
+			except TypeError:
+				pass
+			tests.append((name, value, True))
+		else:
+			tests.append((name, value, False))
+	
+	return tests
+
+def _AttributeMatcher(tests):
+	
+	"""Compile attribute tests to a function of an element. An element matches if any of the
+	   queried attributes has (one of) the queried value(s)"""
+	
+	if tests == None:
+		return None
+	
+	def match(element):
+		get = element.get
+		for name, value, multiple in tests:
+			attribute = get(name)
+			if attribute is None:
+				continue
+			if multiple:
+				if attribute.strip() in value:
+					return True
+			elif attribute.strip() == value:
+				return True
+		return False
+	
+	return match
+
+def Compile(query):
+	
+	"""Compile a query to a list of (level, element name, attribute tests, attribute matcher)
+	   in level order, every query is compiled once"""
+	
+	key = repr(query)
+	if not QUERIES.has_key(key):
+		compiled = []
+		for level in sorted(query.keys()):
+			tests = _AttributeTests(query[level]['attr'])
+			compiled.append((level, query[level]['element'], tests, _AttributeMatcher(tests)))
+		QUERIES[key] = compiled
+	
+	return QUERIES[key]
+
+class Xpath(DOMXpath):
+	
+	"""Xpath on an ElementTree parsed document, the query syntax and results are those of
+	   DOMXpath. Inline XML, file names and open files are recognized without network access,
+	   only http, https, ftp and file URLs are opened with urllib"""
+	
+	def __init__(self, inputfile):
+		
+		self.indexes = {}
+		DOMXpath.__init__(self, inputfile)
+	
+	def _OpenXMLdoc(self, inputfile):
+		
+		source = self._OpenAnything(inputfile)
+		if isinstance(source, basestring):
+			return cElementTree.ElementTree(cElementTree.fromstring(source))
+		
+		xmldoc = cElementTree.parse(source)
+		if not source is sys.stdin:
+			source.close()
+		return xmldoc
+	
+	def _OpenAnything(self, inputfile):
+		
+		"""Open file, stdin or URL as file object, XML text is returned as string"""
+		
+		if hasattr(inputfile, "read"):
+			return inputfile
+		
+		if inputfile == '-':
+			return sys.stdin
+		
+		inputfile = str(inputfile)
+		if inputfile.lstrip().startswith('<'):
+			return inputfile
+		
+		if URL.match(inputfile):
+			import urllib
+			return urllib.urlopen(inputfile)
+		
+		if os.path.isfile(inputfile):
+			return open(inputfile)
+		
+		return inputfile
+	
+	def _Index(self, document, element, name):
+		
+		"""Elements with name element in document order and the index of their (stripped)
+		   values of attribute name to their positions. Build on first use"""
+		
+		key = (id(document), element, name)
+		if not self.indexes.has_key(key):
+			nodes = list(document.iter(element))
+			index = {}
+			for position, node in enumerate(nodes):
+				value = node.get(name)
+				if value is not None:
+					index.setdefault(value.strip(), []).append(position)
+			self.indexes[key] = (document, nodes, index)
+		
+		return self.indexes[key][1:]
+	
+	def _Lookup(self, document, element, tests):
+		
+		"""Elements of the document matching attribute tests from the attribute indexes, in
+		   document order. None if a queried value can not be looked up"""
+		
+		nodes = []
+		positions = []
+		lookups = 0
+		for name, value, multiple in tests:
+			nodes, index = self._Index(document, element, name)
+			if not multiple:
+				value = [value]
+			try:
+				for single in value:
+					positions.extend(index.get(single, []))
+					lookups += 1
+			except TypeError:
+				return None
+		
+		if lookups > 1:
+			positions = sorted(set(positions))
+		
+		return [nodes[position] for position in positions]
+	
+	def _Children(self, parent, element, tests, matcher):
+		
+		"""Elements below parent matching a compiled node query, all descendants with the
+		   element name or the direct children if the name is None. Element and attribute
+		   queries on the document are answered from the attribute indexes"""
+		
+		if isinstance(parent, cElementTree.ElementTree):
+			if not element == None and not tests == None:
+				nodes = self._Lookup(parent, element, tests)
+				if not nodes == None:
+					return [XMLNode(node) for node in nodes]
+			if element == None:
+				nodes = [parent.getroot()]
+			else:
+				nodes = parent.iter(element)
+		elif element == None:
+			nodes = list(parent)
+		else:
+			nodes = [node for child in parent for node in child.iter(element)]
+		
+		if matcher == None:
+			return [XMLNode(node) for node in nodes]
+		return [XMLNode(node) for node in nodes if matcher(node)]
+	
+	def _Element(self, node):
+		
+		if isinstance(node, XMLNode):
+			return node.element
+		return node
+	
+	def getAttr(self,node=None,selection=None,export='list'):
+		
+		"""Append attributes and values to result (all or a selection) and export
+		   as continues list of values or list of lists (default)"""
+		
+		tmp = []
+		for attr, value in self._Element(node).attrib.items():
+			if not selection == None:
+				if attr in selection:
+					if export == 'string':
+						self.result.append(self._TypeCheck(value))
+					elif export == 'list':
+						tmp.append(self._TypeCheck(value))
+			else:
+				if export == 'string':
+					self.result.append(self._TypeCheck(attr))
+					self.result.append(self._TypeCheck(value))
+				elif export == 'list':
+					tmp.append(self._TypeCheck(attr))
+					tmp.append(self._TypeCheck(value))
+		
+		if len(tmp) > 0:
+			self.result.append(tmp)
+	
+	def getElem(self,node=None,selection=None,export='list'):
+		
+		"""Append element names to result (all or selection) and export as continues list
+		   of values or list of lists (default)"""
+		
+		element = self._Element(node).tag
+		if not selection == None and not element in selection:
+			return
+		
+		if export == 'string':
+			self.result.append(self._TypeCheck(element))
+		elif export == 'list':
+			self.result.append([self._TypeCheck(element)])
+	
+	def getData(self,node=None,selection=None,export='list'):
+		
+		"""Append the data fields of the node to result and export as continues list
+		   of values or list of lists (default). As DOMXpath the last text seen is taken
+		   again for every child element"""
+		
+		element = self._Element(node)
+		
+		tmp = []
+		data = element.text
+		if data:
+			tmp.append(data)
+		for child in element:
+			if data:
+				tmp.append(data)
+			if child.tail:
+				data = child.tail
+				tmp.append(data)
+		
+		if not selection == None:
+			tmp = [data for data in tmp if data in selection]
+		tmp = [self._TypeCheck(data) for data in tmp]
+		
+		if len(tmp) > 0:
+			if export == 'string':
+				strContent = string.join(tmp)
+				self.result.append(strContent.strip())
+			elif export == 'list':
+				self.result.append(tmp)
+	
+	def Evaluate(self,source=None,query=None):
+		
+		"""Main routine"""
+		
+		self.query = query
+		if source == None:
+			source = self.XMLdata
+		
+		"""Walk the XML tree level by level"""
+		self.nodeselection[0] = [source]
+		for level, element, tests, matcher in Compile(query):
+			nodes = []
+			for parent in self.nodeselection[level-1]:
+				nodes.extend(self._Children(self._Element(parent), element, tests, matcher))
+			self.nodeselection[level] = nodes
+
 if __name__ == '__main__':
 	
 	"""For testing purposes"""
@@ -0,0 +1,81 @@
+#!/usr/bin/env python2.7
+
+"""
+Write tests/data/baseline.json: the MD5 digests of the output of the baseline DART code for
+the structures in example/. Run it with the path of a checkout of the baseline code:
+
+	git worktree add /tmp/dart-baseline <baseline commit>
+	python2.7 tests/make_baseline.py /tmp/dart-baseline
+"""
+
+import os, sys, json, tempfile, shutil
+
+import support
+
+def RestoreFirstAtoms(ensemble):
+
+	"""The baseline SplitPDB skipped the line after every MODEL statement, the first atom
+	   of each model (fixed with the streaming split). Put it back in the split models"""
+
+	lines = open(ensemble).readlines()
+	starts = [nr for nr, line in enumerate(lines) if line.startswith('MODEL')]
+	for model, nr in enumerate(starts):
+		outfile = os.path.splitext(ensemble)[0] + '_' + str(model+1) + '.pdb'
+		split = open(outfile).read()
+		out = open(outfile, 'w')
+		out.write(lines[nr+1] + split)
+		out.close()
+
+def main(baselinedir):
+
+	support.DARTPath(os.path.abspath(baselinedir))
+	from PDBeditor import PDBeditor
+
+	digests = {'read_write':{}, 'haddock':{}, 'edits':{}, 'xml':{}, 'split':{}}
+	workdir = tempfile.mkdtemp(prefix='dartbaseline')
+	curdir = os.getcwd()
+	os.chdir(workdir)
+	try:
+		for example in support.EXAMPLES:
+			name = support.Name(example)
+
+			pdb = PDBeditor()
+			pdb.ReadPDB(example)
+			pdb.WritePDB(file_out='write.pdb')
+			digests['read_write'][name] = support.Digest('write.pdb')
+
+			for edit in ('haddock', 'edits'):
+				pdb = PDBeditor()
+				pdb.ReadPDB(example)
+				support.Edit(pdb, edit).WritePDB(file_out=edit+'.pdb', **support.WRITE[edit])
+				digests[edit][name] = support.Digest(edit+'.pdb')
+
+			pdb = PDBeditor()
+			pdb.ReadPDB(example)
+			out = open('pdb.xml', 'w')
+			out.write(pdb.PDB2XML().xml())
+			out.close()
+			digests['xml'][name] = support.Digest('pdb.xml')
+
+		support.Join(PDBeditor, support.EXAMPLES, 'ensemble.pdb')
+		digests['joined'] = support.Digest('ensemble.pdb')
+		PDBeditor().SplitPDB(ensemble='ensemble.pdb', mode='MODEL')
+		RestoreFirstAtoms('ensemble.pdb')
+		for model in range(1, len(support.EXAMPLES)+1):
+			digests['split'][str(model)] = support.Digest('ensemble_%i.pdb' % model)
+	finally:
+		os.chdir(curdir)
+		shutil.rmtree(workdir)
+
+	out = open(support.BASELINE, 'w')
+	json.dump(digests, out, sort_keys=True, indent=1)
+	out.write('\n')
+	out.close()
+
+if __name__ == '__main__':
+
+	if len(sys.argv) < 2:
+		print __doc__
+		sys.exit(0)
+
+	main(sys.argv[1])
@@ -0,0 +1,140 @@
+"""
+Shared setup of the DART regression tests. The tests compare the output of the current
+code with digests of the output of the baseline DART code on the structures in example/,
+see make_baseline.py. Run the tests from the DART directory with:
+
+	python2.7 -m unittest discover -s tests
+"""
+
+import os, sys, glob, json, hashlib, shutil, tempfile, StringIO
+
+TESTDIR = os.path.dirname(os.path.abspath(__file__))
+DARTDIR = os.path.dirname(TESTDIR)
+EXAMPLES = sorted(glob.glob(os.path.join(DARTDIR, 'example', '*.pdb')))
+BASELINE = os.path.join(TESTDIR, 'data', 'baseline.json')
+
+def DARTPath(dartdir=DARTDIR):
+
+	"""Make the DART package and plugins of dartdir importable"""
+
+	for path in (os.path.join(dartdir, 'plugins'), dartdir):
+		if not path in sys.path:
+			sys.path.insert(0, path)
+
+def Digest(filename):
+
+	return hashlib.md5(open(filename, 'rb').read()).hexdigest()
+
+def Baseline():
+
+	"""Digests of the baseline output by operation and example name"""
+
+	return json.load(open(BASELINE))
+
+def Name(example):
+
+	return os.path.splitext(os.path.basename(example))[0]
+
+"""PDBeditor edits as method calls, in the order of the PDBeditor plugin"""
+EDITS = {'haddock':[('NAresid1to3', ()), ('IUPACtoCNS', ()), ('Reatom', (1,)), ('CorrectConect', (1,))],
+         'edits':[('NAresid3to1', ()), ('XsegChain', ()), ('SetchainID', ('B', 'D')), ('Reres', (5,)),
+                  ('Reatom', (100,)), ('CorrectConect', (100,))]}
+
+"""WritePDB options of the edited structures"""
+WRITE = {'haddock':{'noheader':True, 'nohetatm':True}, 'edits':{}}
+
+def Edit(pdb, edit):
+
+	for method, args in EDITS[edit]:
+		getattr(pdb, method)(*args)
+
+	return pdb
+
+def Join(PDBeditor, examples, outfile):
+
+	"""Join structures as models of one ensemble file as the PDBeditor joinpdb option"""
+
+	for modelnr, example in enumerate(examples):
+		pdb = PDBeditor()
+		pdb.ReadPDB(example)
+		pdb.WritePDB(file_out=outfile, join=True, modelnr=modelnr+1, noheader=True, nofooter=True)
+
+class WorkDir:
+
+	"""Temporary working directory, the tests write their output in it"""
+
+	def setUp(self):
+
+		self.curdir = os.getcwd()
+		self.workdir = tempfile.mkdtemp(prefix='darttest')
+		os.chdir(self.workdir)
+
+	def tearDown(self):
+
+		os.chdir(self.curdir)
+		shutil.rmtree(self.workdir)
+
+class ServerDir(WorkDir):
+
+	"""Minimal DART installation in a temporary directory for the web server tests: the
+	   DART code, the Upload workflow (FileSelector only) and the server directories"""
+
+	def setUp(self):
+
+		WorkDir.setUp(self)
+		self.DARTDIR = os.path.join(self.workdir, 'dart')
+		for name in ('system', 'plugins'):
+			shutil.copytree(os.path.join(DARTDIR, name), os.path.join(self.DARTDIR, name), ignore=shutil.ignore_patterns('*.pyc'))
+		shutil.copy(os.path.join(DARTDIR, 'RunDART.py'), self.DARTDIR)
+		os.mkdir(os.path.join(self.DARTDIR, 'workflows'))
+		shutil.copy(os.path.join(TESTDIR, 'data', 'Upload.xml'), os.path.join(self.DARTDIR, 'workflows'))
+		os.mkdir(os.path.join(self.DARTDIR, 'results'))
+		os.mkdir(os.path.join(self.DARTDIR, 'server-tmp'))
+		for name in ('readme.txt', 'Joblist.txt'):
+			open(os.path.join(self.DARTDIR, 'server-tmp', name), 'w').close()
+
+	def RunDARTStub(self, exit):
+
+		"""Replace RunDART.py by a job that makes the Upload output directory and exits with
+		   status exit"""
+
+		out = open(os.path.join(self.DARTDIR, 'RunDART.py'), 'w')
+		out.write("import os, sys\nos.mkdir('Upload')\nsys.exit(%i)\n" % exit)
+		out.close()
+
+def Post(application, fields, files={}, remote='127.0.0.1'):
+
+	"""POST form fields and files ({name:(filename,content)}) as multipart/form-data to a
+	   WSGI application. Returns (status, headers, body)"""
+
+	boundary = 'DARTtestboundary'
+	lines = []
+	for name in fields:
+		lines.extend(['--'+boundary, 'Content-Disposition: form-data; name="%s"' % name, '', str(fields[name])])
+	for name in files:
+		lines.extend(['--'+boundary, 'Content-Disposition: form-data; name="%s"; filename="%s"' % (name, files[name][0]),
+		              'Content-Type: application/octet-stream', '', files[name][1]])
+	lines.extend(['--'+boundary+'--', ''])
+	body = '\r\n'.join(lines)
+
+	environ = {'REQUEST_METHOD':'POST', 'PATH_INFO':'/', 'QUERY_STRING':'', 'REMOTE_ADDR':remote,
+	           'CONTENT_TYPE':'multipart/form-data; boundary=%s' % boundary, 'CONTENT_LENGTH':str(len(body)),
+	           'wsgi.input':StringIO.StringIO(body)}
+
+	return Get(application, environ=environ)
+
+def Get(application, path='/', query='', environ=None, remote='127.0.0.1'):
+
+	"""Call a WSGI application, returns (status, headers, body)"""
+
+	if environ is None:
+		environ = {'REQUEST_METHOD':'GET', 'PATH_INFO':path, 'QUERY_STRING':query, 'REMOTE_ADDR':remote}
+
+	response = {}
+	def start_response(status, headers):
+		response['status'] = status
+		response['headers'] = dict(headers)
+
+	body = ''.join(application(environ, start_response))
+
+	return response['status'], response['headers'], body
@@ -0,0 +1,108 @@
+"""Input read from archives and compressed files, and archives uploaded to the web server"""
+
+import os, gzip, shutil, tarfile, zipfile, unittest
+
+import support
+support.DARTPath()
+
+from PDBeditor import PDBeditor
+from system.Archive import ExpandInput, InputExists, OpenInput, Close, ARCHIVES
+from system.DARTserver import WebServer, JobStatus
+
+def Read(filename):
+
+	pdb = PDBeditor()
+	pdb.ReadPDB(filename)
+
+	return pdb
+
+def Atoms(pdb):
+
+	"""Atom records of a structure as comparable lists"""
+
+	atoms = pdb.atoms
+	atom = atoms.IsAtom()
+
+	return [atoms.atnum[atom].tolist(), atoms.atname[atom].tolist(), atoms.resname[atom].tolist(),
+	        atoms.chain[atom].tolist(), atoms.resnum[atom].tolist(), atoms.coord[atom].round(3).tolist()]
+
+class ArchiveTest(support.WorkDir, unittest.TestCase):
+
+	def tearDown(self):
+
+		Close()
+		support.WorkDir.tearDown(self)
+
+	def testArchives(self):
+
+		names = [os.path.basename(example) for example in support.EXAMPLES]
+
+		archive = zipfile.ZipFile('examples.zip', 'w')
+		for example in support.EXAMPLES:
+			archive.write(example, os.path.basename(example))
+		archive.close()
+
+		archive = tarfile.open('examples.tar.gz', 'w:gz')
+		for example in support.EXAMPLES:
+			archive.add(example, os.path.basename(example))
+		archive.close()
+
+		for archive in ('examples.zip', 'examples.tar.gz'):
+			members = ExpandInput([archive])
+			self.assertEqual(members, [os.path.join(archive, name) for name in names])
+			for member, example in zip(members, support.EXAMPLES):
+				self.failUnless(InputExists(member))
+				self.assertEqual(OpenInput(member).read(), open(example).read())
+				self.assertEqual(Atoms(Read(member)), Atoms(Read(example)), member)
+
+		self.failUnless(len(ARCHIVES))
+		Close('examples.zip')
+		self.assertEqual([key[1] for key in ARCHIVES], [os.path.abspath('examples.tar.gz')])
+		Close()
+		self.failIf(len(ARCHIVES))
+
+	def testCompressed(self):
+
+		out = gzip.open('struct.pdb.gz', 'wb')
+		out.write(open(support.EXAMPLES[0]).read())
+		out.close()
+
+		self.assertEqual(Atoms(Read('struct.pdb.gz')), Atoms(Read(support.EXAMPLES[0])))
+
+	def testMissing(self):
+
+		shutil.copy(support.EXAMPLES[0], 'struct.pdb')
+		archive = zipfile.ZipFile('single.zip', 'w')
+		archive.write('struct.pdb')
+		archive.close()
+
+		self.failIf(InputExists('single.zip/missing.pdb'))
+		self.failIf(InputExists('missing.zip/struct.pdb'))
+		self.assertRaises(IOError, OpenInput, 'single.zip/missing.pdb')
+
+class UploadTest(support.ServerDir, unittest.TestCase):
+
+	def testArchiveUpload(self):
+
+		"""The structures in an uploaded zip archive are the input of the workflow"""
+
+		archive = zipfile.ZipFile('upload.zip', 'w')
+		for n, example in enumerate(support.EXAMPLES[:2]):
+			archive.write(example, 'm%i.pdb' % (n+1))
+		archive.close()
+
+		upload = {'name':'upload.zip', 'file':open('upload.zip', 'rb').read()}
+		server = WebServer(DARTDIR=self.DARTDIR, remote_env=['REMOTE_ADDR=127.0.0.1\n'])
+		server.RunDART({'Upload.xml':'submit', '1.upload':upload})
+
+		status = JobStatus(self.DARTDIR, server.jobid)
+		self.assertEqual(status['state'], 'FINISHED')
+		results = zipfile.ZipFile(os.path.join(self.DARTDIR, 'results', os.path.basename(status['download'])))
+		names = [os.path.basename(name) for name in results.namelist()]
+		for n, example in enumerate(support.EXAMPLES[:2]):
+			member = [name for name in results.namelist() if os.path.basename(name) == 'm%i.pdb' % (n+1)]
+			self.assertEqual(len(member), 1, names)
+			self.assertEqual(results.read(member[0]), open(example).read())
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,67 @@
+"""PDBeditor batch mode: the output of a pool of workers equals the sequential output"""
+
+import os, sys, StringIO, unittest
+
+import support
+support.DARTPath()
+
+import PDBeditor
+
+"""PDBeditor plugin options without edits"""
+PARAMS = {'splitpdb':None, 'splitmodels':None, 'pdb2haddock':False, 'NA1to3':False, 'NA3to1':False, 'IUPACtoCNS':False,
+          'xsegchain':False, 'setchainID':None, 'reres':None, 'reatom':None, 'pdb2xml':False, 'joinpdb':False,
+          'name':None, 'noheader':False, 'nofooter':False, 'nohetatm':False}
+
+class BatchTest(support.WorkDir, unittest.TestCase):
+
+	def setUp(self):
+
+		support.WorkDir.setUp(self)
+		self.baseline = support.Baseline()
+
+	def Run(self, processes, **params):
+
+		paramdict = dict(PARAMS)
+		paramdict.update(params)
+		paramdict['processes'] = processes
+
+		stdout = sys.stdout
+		try:
+			sys.stdout = StringIO.StringIO()
+			PDBeditor.PluginCore(paramdict, list(support.EXAMPLES))
+		finally:
+			sys.stdout = stdout
+
+	def testWrite(self):
+
+		for processes in (1, 3):
+			self.Run(processes, pdb2haddock=True)
+			for example in support.EXAMPLES:
+				outfile = support.Name(example)+'_fixed.pdb'
+				self.assertEqual(support.Digest(outfile), self.baseline['haddock'][support.Name(example)], (processes, example))
+				os.remove(outfile)
+
+	def testJoin(self):
+
+		"""Models are joined in input order whatever worker finishes first"""
+
+		digests = []
+		for processes in (1, 3):
+			self.Run(processes, joinpdb=True)
+			digests.append(support.Digest('joined.pdb'))
+			os.remove('joined.pdb')
+		self.assertEqual(digests, [self.baseline['joined']]*2)
+
+	def testNames(self):
+
+		"""Output names are chosen before the workers write, existing names are skipped"""
+
+		open('model.pdb', 'w').close()
+		self.Run(3, name='model.pdb')
+		self.assertEqual(sorted([name for name in os.listdir('.') if name.startswith('model')]),
+		                 ['model-%i.pdb' % n for n in range(1, len(support.EXAMPLES)+1)]+['model.pdb'])
+		self.failUnless(1 <= PDBeditor.Processes(0, 2) <= 2)
+		self.assertEqual(PDBeditor.Processes(8, 2), 2)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,217 @@
+"""Round trips of the input formats: mmCIF, hybrid-36 atom and residue numbers and DART
+ensemble containers (.dens) read as the plain PDB files in example/"""
+
+import os, sys, StringIO, unittest
+
+import support
+support.DARTPath()
+
+from PDBeditor import PDBeditor
+from system.PDBio import Hybrid36Decode, Hybrid36Encode
+from system.Ensemble import EnsembleContainer, Ensemble
+
+"""_atom_site items of the mmCIF files written by WriteCIF"""
+ATOMSITE = ['group_PDB', 'id', 'type_symbol', 'label_atom_id', 'label_alt_id', 'label_comp_id', 'label_asym_id',
+            'auth_seq_id', 'pdbx_PDB_ins_code', 'Cartn_x', 'Cartn_y', 'Cartn_z', 'occupancy', 'B_iso_or_equiv',
+            'auth_asym_id', 'pdbx_PDB_model_num']
+
+def WriteCIF(structures, outfile, chains={}):
+
+	"""Write the atoms of PDBeditor objects as the models of an mmCIF file"""
+
+	out = open(outfile, 'w')
+	out.write("data_test\nloop_\n")
+	for item in ATOMSITE:
+		out.write("_atom_site.%s\n" % item)
+
+	for model, structure in enumerate(structures):
+		atoms = structure.atoms
+		for i in range(len(atoms)):
+			if not atoms.label[i] in ('ATOM  ', 'HETATM'):
+				continue
+			name = atoms.atname[i].strip()
+			if "'" in name:
+				name = '"%s"' % name
+			chain = chains.get(atoms.chain[i], atoms.chain[i])
+			out.write("%s %i %s %s . %s %s %i ? %.3f %.3f %.3f %.2f %.2f %s %i\n" % (atoms.label[i].strip(),
+			          atoms.atnum[i], atoms.elem[i].strip() or name[0], name, atoms.resname[i].strip(), chain,
+			          atoms.resnum[i], atoms.coord[i][0], atoms.coord[i][1], atoms.coord[i][2], atoms.occ[i],
+			          atoms.b[i], chain, model+1))
+	out.write("#\n")
+	out.close()
+
+def Read(filename):
+
+	pdb = PDBeditor()
+	pdb.ReadPDB(filename)
+
+	return pdb
+
+def Quiet(function, *args):
+
+	"""Call function, returns its result and what it printed"""
+
+	stdout = sys.stdout
+	try:
+		sys.stdout = StringIO.StringIO()
+		result = function(*args)
+		return result, sys.stdout.getvalue()
+	finally:
+		sys.stdout = stdout
+
+def Atoms(pdb):
+
+	"""Atom records of a structure as comparable lists"""
+
+	atoms = pdb.atoms
+	atom = atoms.IsAtom()
+
+	return [atoms.atnum[atom].tolist(), atoms.atname[atom].tolist(), atoms.resname[atom].tolist(),
+	        atoms.chain[atom].tolist(), atoms.resnum[atom].tolist(), atoms.coord[atom].round(3).tolist()]
+
+class CIFTest(support.WorkDir, unittest.TestCase):
+
+	def testRead(self):
+
+		for example in support.EXAMPLES:
+			reference = Read(example)
+			WriteCIF([reference], 'model.cif')
+			self.assertEqual(Atoms(Read('model.cif')), Atoms(reference), example)
+
+	def testSplit(self):
+
+		structures = [Read(example) for example in support.EXAMPLES[:3]]
+		WriteCIF(structures, 'models.cif')
+
+		numbers = []
+		for model, structure in PDBeditor().IterModels('models.cif'):
+			self.assertEqual(Atoms(structure), Atoms(structures[model-1]))
+			numbers.append(model)
+		self.assertEqual(numbers, [1,2,3])
+
+		Quiet(PDBeditor().SplitPDB, 'models.cif', 'MODEL')
+		for model in (1,2,3):
+			self.assertEqual(Atoms(Read('models_%i.pdb' % model)), Atoms(structures[model-1]))
+
+		WriteCIF(structures[:1], 'single.cif')
+		Quiet(PDBeditor().SplitPDB, 'single.cif', 'MODEL')
+		self.failIf(os.path.exists('single_1.pdb'))
+
+	def testChainID(self):
+
+		"""Chain IDs of more than one character get a free one character ID for the whole file"""
+
+		structure = Read(support.EXAMPLES[0])
+		second = structure.atoms.chain[len(structure.atoms)/2:]
+		second[second == 'B'] = 'C'
+		chains = sorted(set([chain for chain in structure.atoms.chain.tolist() if chain]))
+		self.assertEqual(chains, ['B', 'C'])
+		WriteCIF([structure, structure], 'chains.cif', chains=dict([(chain, chain*2) for chain in chains]))
+
+		read, printed = Quiet(Read, 'chains.cif')
+		mapped = ['9876543210'[n] for n in range(len(chains))]
+		for model, modelstructure in Quiet(list, PDBeditor().IterModels('chains.cif'))[0]:
+			self.assertEqual(sorted(set([chain for chain in modelstructure.atoms.chain.tolist() if chain])), sorted(mapped))
+		for chain, new in zip(chains, mapped):
+			self.failUnless("mmCIF chain ID '%s' is written as chain ID '%s'" % (chain*2, new) in printed, printed)
+
+		"""A one character ID already given to a longer ID is moved as well"""
+		WriteCIF([structure], 'taken.cif', chains={chains[0]:'AAA', chains[-1]:'9'})
+		read, printed = Quiet(Read, 'taken.cif')
+		self.assertEqual(len(set([chain for chain in read.atoms.chain.tolist() if chain])), len(chains))
+		self.failUnless("mmCIF chain ID '9' is written as chain ID '8'" in printed, printed)
+
+	def testError(self):
+
+		"""Files the reader can not convert are reported, not raised"""
+
+		open('broken.cif', 'w').write("data_test\nloop_\n_atom_site.id\n_atom_site.type_symbol\n1 C\n")
+		pdb = PDBeditor()
+		count, printed = Quiet(pdb.ReadPDB, 'broken.cif')
+		self.assertEqual(count, 0)
+		self.failUnless(printed.startswith("    * ERROR: could not read broken.cif"), printed)
+		self.assertEqual(Quiet(list, pdb.IterModels('broken.cif'))[0], [])
+
+class Hybrid36Test(support.WorkDir, unittest.TestCase):
+
+	def testBoundaries(self):
+
+		for width, cases in ((5, [(100000, 'A0000'), (100035, 'A000Z'), (43770015, 'ZZZZZ'), (43770016, 'a0000'), (87440031, 'zzzzz')]),
+		                     (4, [(10000, 'A000'), (10035, 'A00Z'), (1223055, 'ZZZZ'), (1223056, 'a000'), (2436111, 'zzzz')])):
+			encoded = Hybrid36Encode([value for value, text in cases], width)
+			self.assertEqual([row.tostring() for row in encoded], [text for value, text in cases])
+			self.assertEqual([Hybrid36Decode(text, width) for value, text in cases], [value for value, text in cases])
+
+	def testRoundTrip(self):
+
+		for width in (4, 5):
+			values = range(10**width, 10**width+52*36**(width-1), 997)
+			encoded = Hybrid36Encode(values, width)
+			self.assertEqual([Hybrid36Decode(row.tostring(), width) for row in encoded], values)
+
+	def testDecimal(self):
+
+		self.assertEqual(Hybrid36Decode(' 9999', 5), 9999)
+		self.assertEqual(Hybrid36Decode('  -12', 5), -12)
+		self.assertRaises(ValueError, Hybrid36Decode, 'Aa000', 5)
+
+	def testReadWrite(self):
+
+		"""Atom and residue numbers past the decimal range are written and read as hybrid-36"""
+
+		structure = Read(support.EXAMPLES[0])
+		structure.Reatom(99990)
+		structure.Reres(9990)
+		structure.WritePDB(file_out='hybrid36.pdb')
+
+		atoms = [line for line in open('hybrid36.pdb') if line.startswith('ATOM')]
+		self.assertEqual(atoms[10][6:11], 'A0000')
+
+		read = Read('hybrid36.pdb')
+		self.assertEqual(Atoms(read), Atoms(structure))
+
+class EnsembleTest(support.WorkDir, unittest.TestCase):
+
+	def testRoundTrip(self):
+
+		structure = Read(support.EXAMPLES[0])
+		coord = structure.atoms.coord
+
+		container = EnsembleContainer('models.dens')
+		for shift in range(3):
+			container.AddModel(structure.atoms.Moved(coord+shift), records={'header':structure.header}, name='shift%i' % shift)
+		container.Close()
+
+		ensemble = Ensemble('models.dens')
+		self.assertEqual(len(ensemble), 3)
+		self.assertEqual(ensemble.ModelNumbers(), [1,2,3])
+		self.assertEqual(ensemble.Records()['header'], structure.header)
+
+		for model, read in PDBeditor().IterModels('models.dens'):
+			moved = PDBeditor()
+			moved.AddAtoms(structure.atoms.Moved(coord+model-1), {'header':[], 'title':[], 'footer':[], 'end':[], 'model':[]})
+			read.WritePDB(file_out='read.pdb', noheader=True, nofooter=True)
+			moved.WritePDB(file_out='moved_%i.pdb' % model, noheader=True, nofooter=True)
+			self.assertEqual(open('read.pdb').read(), open('moved_%i.pdb' % model).read(), model)
+
+		PDBeditor().SplitPDB(ensemble='models.dens', models=[2])
+		self.assertEqual(open('models_2.pdb').read(), open('moved_2.pdb').read())
+		self.failIf(os.path.exists('models_1.pdb'))
+
+	def testTopology(self):
+
+		atoms = Read(support.EXAMPLES[0]).atoms
+		renamed = atoms.Moved(atoms.coord)
+		renamed.resname = renamed.resname.copy()
+		renamed.resname[1] = 'XXX'
+
+		container = EnsembleContainer('mixed.dens')
+		container.AddModel(atoms)
+		self.assertRaises(ValueError, container.AddModel, atoms.Take(range(len(atoms)-1)))
+		self.assertRaises(ValueError, container.AddModel, renamed)
+		container.Close()
+
+		self.assertEqual(len(Ensemble('mixed.dens')), 1)
+
+if __name__ == '__main__':
+	unittest.main()
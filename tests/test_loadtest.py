@@ -0,0 +1,109 @@
+"""DART jobs on the canned output of the 3DNA stubs of the load test, and the load test
+against a DARTwsgi test server"""
+
+import os, socket, shutil, zipfile, unittest
+
+import support
+support.DARTPath()
+
+from system.DARTserver import WebServer, JobStatus
+from system.DARTloadtest import MakeStubs, StartServer, LoadTest, ZipUpload
+
+def FreePort():
+
+	sock = socket.socket()
+	sock.bind(('localhost', 0))
+	port = sock.getsockname()[1]
+	sock.close()
+
+	return port
+
+class StubTest(support.ServerDir, unittest.TestCase):
+
+	def setUp(self):
+
+		support.ServerDir.setUp(self)
+		shutil.copy(os.path.join(support.DARTDIR, 'workflows', 'NAensemblebuild.xml'), os.path.join(self.DARTDIR, 'workflows'))
+		self.stubdir = MakeStubs(os.path.join(self.workdir, 'stubs'), 0.0)
+		self.path = os.environ['PATH']
+		os.environ['PATH'] = self.stubdir+os.pathsep+self.path
+
+	def tearDown(self):
+
+		os.environ['PATH'] = self.path
+		support.ServerDir.tearDown(self)
+
+	def Run(self, fields, name, content):
+
+		fields['NAensemblebuild.xml'] = 'submit'
+		fields['1.upload'] = {'name':name, 'file':content}
+		server = WebServer(DARTDIR=self.DARTDIR, remote_env=['REMOTE_ADDR=127.0.0.1\n'])
+		server.RunDART(fields)
+
+		return JobStatus(self.DARTDIR, server.jobid)
+
+	def testSmallJob(self):
+
+		"""The analysis plugins run on the stub output, the modeling steps are skipped"""
+
+		status = self.Run({'5.useplugin':'False', '6.useplugin':'False'}, 'struct.pdb', open(support.EXAMPLES[0]).read())
+		self.assertEqual(status['state'], 'FINISHED')
+		self.assertEqual([result['plugin'] for result in status['results'] if result['archive']],
+		                 ['FileSelector', 'PDBeditor', 'X3DNAanalyze', 'NABendAnalyze', 'PDBeditor'])
+
+		results = zipfile.ZipFile(os.path.join(self.DARTDIR, 'results', os.path.basename(status['download'])))
+		names = [os.path.basename(name) for name in results.namelist()]
+		for extension in ('.out', '.par', '.bend'):
+			self.failUnless('struct_fixed'+extension in names, extension)
+
+	def testLargeJob(self):
+
+		"""Models are built from the analysis of an uploaded ensemble"""
+
+		status = self.Run({'5.number':'3'}, 'ensemble.zip', ZipUpload(support.EXAMPLES[:3]))
+		self.assertEqual(status['state'], 'FINISHED')
+		self.failUnless('BuildNucleicAcids' in [result['plugin'] for result in status['results']])
+
+		results = zipfile.ZipFile(os.path.join(self.DARTDIR, 'results', os.path.basename(status['download'])))
+		models = [name for name in results.namelist() if '-BuildNucleicAcids/' in name and name.endswith('.pdb')]
+		self.failUnless(len(models) >= 3, models)
+
+class LoadTestTest(support.ServerDir, unittest.TestCase):
+
+	def setUp(self):
+
+		support.ServerDir.setUp(self)
+		shutil.copy(os.path.join(support.DARTDIR, 'workflows', 'NAensemblebuild.xml'), os.path.join(self.DARTDIR, 'workflows'))
+		for directory in ('server-tmp', 'results'):
+			shutil.rmtree(os.path.join(self.DARTDIR, directory))
+		self.stubdir = MakeStubs(os.path.join(self.workdir, 'stubs'), 0.0)
+
+	def Run(self, mix, requests):
+
+		server, url = StartServer(self.DARTDIR, FreePort(), self.stubdir)
+		try:
+			test = LoadTest(url, mix=mix, clients=2, requests=requests, pdb=support.EXAMPLES[0], ensemble=support.EXAMPLES[:3], models=3)
+			test.Run()
+		finally:
+			server.kill()
+			server.wait()
+
+		return test.Collect()
+
+	def testLoadTest(self):
+
+		report = self.Run([('view', 1.0), ('small', 1.0)], 4)
+		self.failUnless(os.path.isfile(os.path.join(self.DARTDIR, 'server-tmp', 'Joblist.txt')))
+		self.assertEqual(report['total']['count'], 4)
+		self.assertEqual((report['total']['errors'], report['total']['joberrors']), (0, 0))
+
+	def testFailedJob(self):
+
+		"""A job that exits with an error is a job error"""
+
+		self.RunDARTStub(3)
+		report = self.Run([('small', 1.0)], 2)
+		self.assertEqual((report['total']['errors'], report['total']['joberrors']), (0, 2))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,92 @@
+"""PDBeditor reading, writing and edits on the atom table against the baseline output"""
+
+import unittest
+
+import support
+support.DARTPath()
+
+from PDBeditor import PDBeditor, EditPipeline, EnsembleWriter
+from system import PDBio
+
+"""The edits of support.EDITS as compiled pipelines"""
+PIPELINES = {'haddock':EditPipeline(NA1to3=True, IUPACtoCNS=True, reatom=1),
+             'edits':EditPipeline(NA3to1=True, xsegchain=True, setchainID='B,D', reres=5, reatom=100)}
+
+class PDBeditorTest(support.WorkDir, unittest.TestCase):
+
+	def setUp(self):
+
+		support.WorkDir.setUp(self)
+		self.baseline = support.Baseline()
+
+	def testReadWrite(self):
+
+		for example in support.EXAMPLES:
+			pdb = PDBeditor()
+			pdb.ReadPDB(example)
+			pdb.WritePDB(file_out='write.pdb')
+			self.assertEqual(support.Digest('write.pdb'), self.baseline['read_write'][support.Name(example)], example)
+
+	def testEdits(self):
+
+		for edit in support.EDITS:
+			for example in support.EXAMPLES:
+				pdb = PDBeditor()
+				pdb.ReadPDB(example)
+				support.Edit(pdb, edit).WritePDB(file_out='edit.pdb', **support.WRITE[edit])
+				self.assertEqual(support.Digest('edit.pdb'), self.baseline[edit][support.Name(example)], (edit, example))
+
+	def testEditPipeline(self):
+
+		"""A compiled pipeline gives the output of the edits applied one by one"""
+
+		for edit in PIPELINES:
+			for example in support.EXAMPLES:
+				pdb = PDBeditor()
+				pdb.ReadPDB(example)
+				PIPELINES[edit].Apply(pdb).WritePDB(file_out='pipeline.pdb', **support.WRITE[edit])
+				self.assertEqual(support.Digest('pipeline.pdb'), self.baseline[edit][support.Name(example)], (edit, example))
+
+	def testXML(self):
+
+		"""The streamed XML export equals the serialized PDB2XML tree"""
+
+		for example in support.EXAMPLES:
+			pdb = PDBeditor()
+			pdb.ReadPDB(example)
+
+			out = open('pdb.xml', 'w')
+			out.write(pdb.PDB2XML().xml())
+			out.close()
+			self.assertEqual(support.Digest('pdb.xml'), self.baseline['xml'][support.Name(example)], example)
+
+			"""Chain and residue breaks at the boundaries of the formatted blocks"""
+			chunk = PDBio.CHUNK
+			try:
+				for PDBio.CHUNK in (chunk, 7):
+					out = open('stream.xml', 'w')
+					pdb.WriteXML(out)
+					out.close()
+					self.assertEqual(support.Digest('stream.xml'), self.baseline['xml'][support.Name(example)], (PDBio.CHUNK, example))
+			finally:
+				PDBio.CHUNK = chunk
+
+	def testJoin(self):
+
+		support.Join(PDBeditor, support.EXAMPLES, 'joined.pdb')
+		self.assertEqual(support.Digest('joined.pdb'), self.baseline['joined'])
+
+	def testEnsembleWriter(self):
+
+		"""Structures written one by one to an open ensemble file"""
+
+		writer = EnsembleWriter('writer.pdb')
+		for example in support.EXAMPLES:
+			pdb = PDBeditor()
+			pdb.ReadPDB(example)
+			writer.Write(pdb)
+		writer.Close()
+		self.assertEqual(support.Digest('writer.pdb'), self.baseline['joined'])
+
+if __name__ == '__main__':
+	unittest.main()
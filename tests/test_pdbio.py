@@ -0,0 +1,92 @@
+"""The vectorised PDB parser against the reference line by line parser"""
+
+import sys, StringIO, unittest
+
+import support
+support.DARTPath()
+
+from system import PDBio
+from system.PDBio import ParsePDB
+from system.PDBbench import LineParser, Compare, MakeEnsemble
+
+"""ATOM records with a chain change, no occupancy and B-factor, a coordinate error, an element
+   column and a HETATM record"""
+RECORDS = ["HEADER    DART PARSER TEST",
+           "ATOM      1  P     G A   1      -0.224   9.159  -5.395  1.00  0.00           P",
+           "ATOM      2  OP1   G A   1      -0.934  10.400  -5.749",
+           "ATOM      3  OP2   G A   1       0.917   9.xyz  -6.260  1.00  0.00           O",
+           "TER",
+           "ATOM      4  P     C B   2       5.101   4.259   2.337  1.00 12.50      B    P",
+           "HETATM    5  O   HOH B 101      10.000  10.000  10.000  0.50 20.00           O",
+           "CONECT    1    2",
+           "END"]
+
+class ParserTest(support.WorkDir, unittest.TestCase):
+
+	def setUp(self):
+
+		support.WorkDir.setUp(self)
+		self.chunk = PDBio.CHUNK
+
+	def tearDown(self):
+
+		PDBio.CHUNK = self.chunk
+		support.WorkDir.tearDown(self)
+
+	def Parse(self, data):
+
+		"""Parse data with both parsers, returns their tables and records and what they print"""
+
+		stdout = sys.stdout
+		try:
+			sys.stdout = StringIO.StringIO()
+			reference = LineParser(StringIO.StringIO(data).readlines())
+			printed = sys.stdout.getvalue()
+			sys.stdout = StringIO.StringIO()
+			parsed = ParsePDB(data)
+			self.assertEqual(sys.stdout.getvalue(), printed)
+		finally:
+			sys.stdout = stdout
+
+		return reference, parsed, printed
+
+	def assertSame(self, data):
+
+		reference, parsed, printed = self.Parse(data)
+		self.assertEqual(Compare(reference[0], parsed[0]), [])
+		self.assertEqual(reference[1], parsed[1])
+
+		return parsed
+
+	def testExamples(self):
+
+		for example in support.EXAMPLES:
+			self.assertSame(open(example).read())
+
+	def testChunks(self):
+
+		"""Chain changes and records at the boundaries of the parsed blocks of lines"""
+
+		MakeEnsemble(support.EXAMPLES[0], 3, 'ensemble.pdb')
+		for chunk in (1, 7, 64):
+			PDBio.CHUNK = chunk
+			table, records = self.assertSame(open('ensemble.pdb').read())
+			self.assertEqual(len(records['model']), 3)
+
+	def testRecords(self):
+
+		data = "\n".join(RECORDS)+"\n"
+		table, records = self.assertSame(data)
+		self.assertEqual(len(table.chain), 6)
+		self.assertEqual(table.occ[1], 1.00)
+		self.assertEqual(table.coord[2].tolist(), [0.0, 0.0, 0.0])
+		self.failUnless('coordinate error' in self.Parse(data)[2])
+
+		"""Windows line ends"""
+		self.assertSame("\r\n".join(RECORDS)+"\r\n")
+
+		"""The last line is kept as is when it is not terminated"""
+		self.assertEqual(self.Parse("\n".join(RECORDS))[1][1]['end'], ['END'])
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,78 @@
+"""Publishing the output of completed workflow steps while a DART job is running"""
+
+import os, time, zipfile, unittest
+
+import support
+support.DARTPath()
+
+from system.DARTserver import WebServer, JobStatus, ZipDirectory
+
+def WriteFilelist(dirname, steps):
+
+	"""Write the Filelist.xml of the steps [(step, plugin, [files])] and their output"""
+
+	out = open(os.path.join(dirname, 'Filelist.xml'), 'w')
+	out.write('<container ID="filelist">\n')
+	for step, plugin, files in steps:
+		stepdir = os.path.join(dirname, 'jobnr%i-%s' % (step, plugin))
+		if not os.path.isdir(stepdir):
+			os.mkdir(stepdir)
+		out.write(' <plugin ID="%s" nr="%i" time="0.500">\n' % (plugin, step))
+		for name in files:
+			open(os.path.join(stepdir, name), 'w').write(name)
+			out.write('  <file>%s</file>\n' % os.path.join(stepdir, name))
+		out.write(' </plugin>\n')
+	out.write('</container>\n')
+	out.close()
+
+class PublishTest(support.ServerDir, unittest.TestCase):
+
+	def setUp(self):
+
+		support.ServerDir.setUp(self)
+		self.server = WebServer(DARTDIR=self.DARTDIR, remote_env=['REMOTE_ADDR=127.0.0.1\n'])
+		self.server.status = {'jobid':self.server.jobid, 'user':'127.0.0.1', 'workflow':'Upload', 'submitted':time.time(),
+		                      'steps':2, 'completed':0, 'results':[], 'state':'RUNNING'}
+		os.mkdir('Upload')
+
+	def Members(self, archive):
+
+		return sorted(zipfile.ZipFile(os.path.join(self.DARTDIR, 'results', archive)).namelist())
+
+	def testPublish(self):
+
+		"""Steps are published once, file names are not interpreted by a shell"""
+
+		WriteFilelist('Upload', [(1, 'FileSelector', ["model 1's.pdb", 'model;2.pdb'])])
+		self.server._PublishSteps('Upload')
+		status = JobStatus(self.DARTDIR, self.server.jobid)
+		self.assertEqual(status['completed'], 1)
+		self.assertEqual(status['results'][0]['archive'], 'Upload%s_step1-FileSelector.zip' % self.server.jobid)
+		self.assertEqual(self.Members(status['results'][0]['archive']),
+		                 ['Upload/jobnr1-FileSelector/', "Upload/jobnr1-FileSelector/model 1's.pdb", 'Upload/jobnr1-FileSelector/model;2.pdb'])
+
+		WriteFilelist('Upload', [(1, 'FileSelector', []), (2, 'PDBeditor', ['struct_fixed.pdb'])])
+		self.server._PublishSteps('Upload')
+		status = JobStatus(self.DARTDIR, self.server.jobid)
+		self.assertEqual([result['step'] for result in status['results']], [1, 2])
+		self.assertEqual(self.Members(status['results'][1]['archive']),
+		                 ['Upload/jobnr2-PDBeditor/', 'Upload/jobnr2-PDBeditor/struct_fixed.pdb'])
+
+	def testSkipped(self):
+
+		"""A step without output directory is recorded without archive"""
+
+		WriteFilelist('Upload', [(1, 'FileSelector', ['struct.pdb'])])
+		os.rename('Upload/jobnr1-FileSelector', 'Upload/output')
+		self.server._PublishSteps('Upload')
+		self.assertEqual(JobStatus(self.DARTDIR, self.server.jobid)['results'][0]['archive'], None)
+
+	def testZipFailure(self):
+
+		WriteFilelist('Upload', [(1, 'FileSelector', ['struct.pdb'])])
+		self.failUnless(ZipDirectory('step.zip', 'Upload/jobnr1-FileSelector'))
+		self.failIf(ZipDirectory(os.path.join('missing', 'step.zip'), 'Upload/jobnr1-FileSelector'))
+		self.failIf(os.path.exists('missing'))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,102 @@
+"""NAsummery segment detection against the cutoff recomputed over all distances of a segment"""
+
+import sys, StringIO, unittest
+
+import numpy
+
+import support
+support.DARTPath()
+
+from PDBeditor import PDBeditor
+from QueryPDB import NAsummery
+from system.Structure import Structure
+
+def Segments(residues, coord):
+
+	"""Segments of the residues of a chain: a segment ends when the C5'-C5' distance to the
+	   next residue is not below the mean + standard deviation + 1 of the distances in the
+	   segment so far"""
+
+	segments = []
+	segment = []
+	distances = []
+	for residue in range(len(residues)):
+		segment.append(residues[residue])
+		if residue+1 < min(len(residues), len(coord)):
+			distances.append(numpy.sqrt(((coord[residue+1]-coord[residue])**2).sum()))
+			if not distances[-1] < numpy.mean(distances)+numpy.std(distances)+1:
+				segments.append(segment)
+				segment = []
+				distances = []
+		else:
+			segments.append(segment)
+
+	return segments
+
+def Trace(structure, chain, verbose=False):
+
+	"""Segments of a chain found by NAsummery and what it prints"""
+
+	summery = NAsummery(structure=structure, verbose=verbose)
+	stdout = sys.stdout
+	try:
+		sys.stdout = StringIO.StringIO()
+		summery._BackboneTrace(chain)
+		printed = sys.stdout.getvalue()
+	finally:
+		sys.stdout = stdout
+
+	return summery.chainlib[chain], printed
+
+class BackboneTraceTest(unittest.TestCase):
+
+	def setUp(self):
+
+		self.pdb = PDBeditor()
+		self.pdb.ReadPDB(support.EXAMPLES[0])
+
+	def Reference(self, structure, chain):
+
+		residues = structure.ResidueNumbers(structure.Residues(chain))
+		coord = structure.Coordinates(structure.Atoms(name="C5'", chain=chain))
+
+		return Segments(residues, coord)
+
+	def testSegments(self):
+
+		for example in support.EXAMPLES:
+			pdb = PDBeditor()
+			pdb.ReadPDB(example)
+			structure = Structure(pdb)
+			for chain in structure.Chains():
+				self.assertEqual(Trace(structure, chain)[0], self.Reference(structure, chain), (example, chain))
+
+	def testBreak(self):
+
+		"""Residues moved away from the rest of the chain start a new segment"""
+
+		atoms = self.pdb.atoms
+		chain = atoms.chain[0]
+		first = min(atoms.resnum.tolist())
+		coord = atoms.coord.copy()
+		coord[atoms.resnum > first+4] += [25.0, 0.0, 0.0]
+		self.pdb.atoms = atoms.Moved(coord)
+
+		structure = Structure(self.pdb)
+		segments = Trace(structure, chain)[0]
+		self.assertEqual(segments, self.Reference(structure, chain))
+		self.failUnless(len(segments) > 1)
+		self.assertEqual(max(segments[0]), first+4)
+
+	def testVerbose(self):
+
+		structure = Structure(self.pdb)
+		chain = structure.Chains()[0]
+		self.failIf("Distance  Residue" in Trace(structure, chain)[1])
+		printed = Trace(structure, chain, verbose=True)[1]
+		self.failUnless("Distance  Residue" in printed)
+		self.assertEqual(len([line for line in printed.split('\n') if line.startswith('      ') and line.split()[0][0].isdigit()]),
+		                 len(structure.Residues(chain))-1)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,76 @@
+"""The residue index of an atom table against a scan over all rows"""
+
+import unittest
+
+import numpy
+
+import support
+support.DARTPath()
+
+from PDBeditor import PDBeditor, EditPipeline
+from system.AtomTable import ResidueIndex
+
+def Scan(table):
+
+	"""(chain, resnum, resext) key and rows of every run of ATOM/HETATM rows"""
+
+	residues = []
+	last = None
+	for row in numpy.flatnonzero(table.IsAtom()).tolist():
+		key = (table.chain[row], table.resnum[row], table.resext[row])
+		if last is None or not (key == residues[-1][0] and row == last+1):
+			residues.append((key, []))
+		residues[-1][1].append(row)
+		last = row
+
+	return residues
+
+class ResidueIndexTest(support.WorkDir, unittest.TestCase):
+
+	def assertIndex(self, table, index):
+
+		residues = Scan(table)
+		self.assertEqual(len(index), len(residues))
+		for n, (key, rows) in enumerate(residues):
+			self.assertEqual(index.Rows([n]).tolist(), rows)
+			self.assertEqual(range(len(table))[index.Slice(n)], rows)
+
+			"""A key found more than once maps to its first residue"""
+			self.assertEqual(index.Residue(*key), [k for k, r in residues].index(key))
+
+		for chain in set(table.chain[table.IsAtom()].tolist()):
+			self.assertEqual(index.Chain(chain).tolist(), [n for n, (key, rows) in enumerate(residues) if key[0] == chain])
+
+	def testIndex(self):
+
+		for example in support.EXAMPLES:
+			pdb = PDBeditor()
+			pdb.ReadPDB(example)
+			self.assertIndex(pdb.atoms, pdb.index)
+			self.assertEqual(pdb.index.Residue('no chain', 1), None)
+
+	def testAtom(self):
+
+		pdb = PDBeditor()
+		pdb.ReadPDB(support.EXAMPLES[0])
+		for residue in range(len(pdb.index)):
+			rows = pdb.index.Rows([residue]).tolist()
+			for row in rows:
+				name = pdb.atoms.atname[row].strip()
+				first = [r for r in rows if pdb.atoms.atname[r].strip() == name][0]
+				self.assertEqual(pdb.index.Atom(residue, name), first)
+			self.assertEqual(pdb.index.Atom(residue, 'no atom'), None)
+
+	def testEdits(self):
+
+		"""The index after chain ID and residue number edits equals a new index"""
+
+		pdb = PDBeditor()
+		pdb.ReadPDB(support.EXAMPLES[0])
+		EditPipeline(setchainID='B,D', reres=5).Apply(pdb)
+		self.assertEqual(pdb.index.Residue('D', 5), 0)
+		self.assertIndex(pdb.atoms, pdb.index)
+		self.assertEqual(pdb.index.residues, ResidueIndex(pdb.atoms).residues)
+
+if __name__ == '__main__':
+	unittest.main()
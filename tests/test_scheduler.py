@@ -0,0 +1,134 @@
+"""Fair-share job scheduling on the DART server and distinct IDs for simultaneous jobs"""
+
+import os, time, unittest
+
+import support
+support.DARTPath()
+
+from system import JobScheduler as scheduler
+from system.DARTserver import WebServer
+
+class JobSchedulerTest(support.WorkDir, unittest.TestCase):
+
+	def setUp(self):
+
+		support.WorkDir.setUp(self)
+		self.scheduler = scheduler.JobScheduler(self.workdir)
+		self.now = time.time()
+
+	def Queue(self, jobid, user, models, waited=0.0, state='QUEUED', pid=None):
+
+		"""Put a job in the spool that was submitted waited seconds ago"""
+
+		if pid is None:
+			pid = os.getpid()
+		self.scheduler._WriteJob({'jobid':jobid, 'user':user, 'models':float(models), 'submitted':self.now-waited,
+		                          'pid':pid, 'state':state})
+
+	def Clear(self):
+
+		for jobid in self.scheduler._ReadJobs():
+			self.scheduler.Finish(jobid)
+
+	def Next(self):
+
+		return self.scheduler._NextJob(self.scheduler._ReadJobs())
+
+	def testOrder(self):
+
+		"""Small jobs overtake bulk jobs, waiting time prevents starvation"""
+
+		self.Queue('bulk', 'a', 100, waited=60)
+		self.Queue('small', 'b', 1, waited=0)
+		self.assertEqual(self.Next(), 'small')
+
+		self.Queue('bulk', 'a', 100, waited=100*scheduler.COSTWEIGHT+60)
+		self.assertEqual(self.Next(), 'bulk')
+
+	def testSameScore(self):
+
+		self.Queue('2', 'a', 1, waited=10)
+		self.Queue('1', 'b', 1, waited=10)
+		self.assertEqual(self.Next(), '1')
+
+	def testUserShare(self):
+
+		"""Models running for the user count against their waiting jobs"""
+
+		self.Queue('running', 'a', 10, state='RUNNING')
+		self.Queue('user-a', 'a', 1, waited=30)
+		self.Queue('user-b', 'b', 1, waited=0)
+		self.assertEqual(self.Next(), 'user-b')
+
+	def testLimits(self):
+
+		for n in range(scheduler.MAXUSERJOBS):
+			self.Queue('running%i' % n, 'a', 1, state='RUNNING')
+		self.Queue('user-a', 'a', 1, waited=1000)
+		self.assertEqual(self.Next(), None)
+		self.Clear()
+
+		for n in range(scheduler.MAXBULKJOBS):
+			self.Queue('bulk%i' % n, 'user%i' % n, scheduler.BULKMODELS+1, state='RUNNING')
+		self.Queue('bulk', 'b', scheduler.BULKMODELS+1, waited=1000)
+		self.assertEqual(self.Next(), None)
+		self.Queue('small', 'c', 1)
+		self.assertEqual(self.Next(), 'small')
+		self.Clear()
+
+		self.Queue('small', 'c', 1)
+		for n in range(scheduler.MAXJOBS):
+			self.Queue('full%i' % n, 'full%i' % n, 1, state='RUNNING')
+		self.assertEqual(self.Next(), None)
+
+	def testSubmit(self):
+
+		self.failUnless(self.scheduler.Submit('refused', 'a', scheduler.MAXJOBMODELS+1))
+		self.assertEqual(self.scheduler.Submit('job', 'a b', 2), '')
+		self.assertEqual(self.scheduler.Status(), {'a_b':{'QUEUED':1, 'RUNNING':0}})
+
+		self.assertEqual(self.scheduler.WaitForSlot('job', poll=0), True)
+		self.assertEqual(self.scheduler.Status(), {'a_b':{'QUEUED':0, 'RUNNING':1}})
+		self.scheduler.Finish('job')
+		self.assertEqual(self.scheduler.Status(), {})
+
+		"""A job that is no longer in the queue does not get a slot"""
+		self.assertEqual(self.scheduler.WaitForSlot('job', poll=0), False)
+
+	def testDeadProcess(self):
+
+		pid = os.fork()
+		if pid == 0:
+			os._exit(0)
+		os.waitpid(pid, 0)
+
+		self.Queue('orphan', 'a', 1, pid=pid)
+		self.assertEqual(self.Next(), None)
+		self.failIf(os.path.exists(os.path.join(self.scheduler.queuedir, 'orphan.job')))
+
+	def testEstimateModels(self):
+
+		sequence = {1:'FileSelector', 2:'ModelNucleicAcids', 3:'PDBeditor'}
+		self.assertEqual(self.scheduler.EstimateModels({'2':{'number':'40'}}, sequence, 3), 40.0)
+		self.assertEqual(self.scheduler.EstimateModels({'2':{'number':'40', 'useplugin':'False'}}, sequence, 3), 3.0)
+		self.assertEqual(self.scheduler.EstimateModels({'2':{'number':'many'}}, sequence), float(scheduler.MAXMODELS))
+		self.assertEqual(self.scheduler.EstimateModels({}, {1:'FileSelector'}), 1.0)
+
+class JobIDTest(support.ServerDir, unittest.TestCase):
+
+	def testSameSecond(self):
+
+		"""Jobs submitted in the same second get the next free job ID"""
+
+		self.RunDARTStub(0)
+		servers = [WebServer(DARTDIR=self.DARTDIR, remote_env=['REMOTE_ADDR=127.0.0.1\n']) for n in range(2)]
+		servers[1].jobid = servers[0].jobid
+
+		results = [server.RunDART({'Upload.xml':'submit', '1.upload':None}) for server in servers]
+		self.assertEqual(int(servers[1].jobid), int(servers[0].jobid)+1)
+		self.assertEqual(len(set(results)), 2)
+		for result in results:
+			self.failUnless(os.path.isfile(os.path.join(self.DARTDIR, 'results', result)))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,73 @@
+"""Atom selection masks against a row by row evaluation and selections written as the ProFit
+atoms and zone of the baseline PDBFit fittings"""
+
+import re, unittest
+
+import support
+support.DARTPath()
+
+from PDBeditor import PDBeditor
+from system.Selection import Compile, Select
+
+DNABB = "P,O1P,O2P,O5',O4',O3',C5',C4',C3',C2',C1'"
+PROTBB = "N,CA,C,O"
+ALLHEAVY = "P,N*,C*,O*"
+
+"""Selection of every default PDBFit fitting and its baseline ProFit (atoms, zone)"""
+FITTINGS = [("name "+ALLHEAVY, (ALLHEAVY, None)),
+            ("chain B and name "+ALLHEAVY, (ALLHEAVY, 'B*')),
+            ("chain A and name "+ALLHEAVY, (ALLHEAVY, 'A*')),
+            ("chain B and name "+DNABB, (DNABB, 'B*')),
+            ("chain A and name "+PROTBB, (PROTBB, 'A*')),
+            ("chain B and not name "+DNABB, ('^'+DNABB, 'B*')),
+            ("chain A and not name "+PROTBB, ('^'+PROTBB, 'A*'))]
+
+"""Selections and the same selection as test of one row (label, chain, resnum, resname, name)"""
+SELECTIONS = [("all", lambda label, chain, resnum, resname, name: True),
+              ("chain B", lambda label, chain, resnum, resname, name: chain == 'B'),
+              ("resname GUA,CYT", lambda label, chain, resnum, resname, name: resname in ('GUA', 'CYT')),
+              ("resnum 2:4,7", lambda label, chain, resnum, resname, name: 2 <= resnum <= 4 or resnum == 7),
+              ("name P,C1'", lambda label, chain, resnum, resname, name: name in ('P', "C1'")),
+              ("name C?' or name O*", lambda label, chain, resnum, resname, name: re.match(r"C.'$|O", name) is not None),
+              ("not (resnum 1-3 or hetero) and name P", lambda label, chain, resnum, resname, name:
+                  not (1 <= resnum <= 3 or label == 'HETATM') and name == 'P'),
+              ("chain A or resnum 1 and name N*", lambda label, chain, resnum, resname, name:
+                  chain == 'A' or (resnum == 1 and name.startswith('N')))]
+
+class MaskTest(unittest.TestCase):
+
+	def testMasks(self):
+
+		"""TER rows are never selected"""
+
+		for example in support.EXAMPLES:
+			pdb = PDBeditor()
+			pdb.ReadPDB(example)
+			atoms = pdb.atoms
+			isatom = atoms.IsAtom().tolist()
+			rows = zip(atoms.label.tolist(), atoms.chain.tolist(), atoms.resnum.tolist(),
+			           [name.strip() for name in atoms.resname.tolist()], [name.strip() for name in atoms.atname.tolist()])
+
+			for selection, test in SELECTIONS:
+				expected = [isatom[n] and test(*row) for n, row in enumerate(rows)]
+				self.assertEqual(Select(pdb, selection).tolist(), expected, (selection, example))
+
+	def testErrors(self):
+
+		for selection in ("chain", "name P and", "(chain A", "colour red"):
+			self.assertRaises(ValueError, Compile, selection)
+
+class ProFitTest(unittest.TestCase):
+
+	def testFittings(self):
+
+		for selection, profit in FITTINGS:
+			self.assertEqual(Compile(selection).ProFit(), profit, selection)
+
+	def testUnsupported(self):
+
+		for selection in ("chain A or chain B", "chain A and chain B", "name CA and name CB"):
+			self.assertRaises(ValueError, Compile(selection).ProFit)
+
+if __name__ == '__main__':
+	unittest.main()
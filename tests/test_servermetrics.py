@@ -0,0 +1,85 @@
+"""Server metrics from the job event log, and the events logged for finished and failed jobs"""
+
+import os, json, StringIO, unittest
+
+import support
+support.DARTPath()
+
+from system.ServerMetrics import LogEvent, ServerMetrics, Percentile
+from system.DARTserver import WebServer, JobStatus
+
+class PercentileTest(unittest.TestCase):
+
+	def testPercentile(self):
+
+		self.assertEqual(Percentile([], 50), None)
+		self.assertEqual(Percentile([3.0], 99), 3.0)
+		self.assertEqual(Percentile([4, 1, 3, 2], 50), 2.5)
+		self.assertAlmostEqual(Percentile(range(101), 90), 90.0)
+
+class ServerMetricsTest(support.WorkDir, unittest.TestCase):
+
+	def setUp(self):
+
+		support.WorkDir.setUp(self)
+		os.mkdir('server-tmp')
+		os.mkdir('results')
+
+	def testCollect(self):
+
+		LogEvent(self.workdir, '1', 'QUEUED')
+		LogEvent(self.workdir, '2', 'QUEUED')
+		LogEvent(self.workdir, '2', 'RUNNING', upload=100, user='a b')
+		for jobid, exit in (('3', 0), ('4', 1)):
+			LogEvent(self.workdir, jobid, 'QUEUED')
+			LogEvent(self.workdir, jobid, 'RUNNING', upload=200)
+			LogEvent(self.workdir, jobid, 'STEP', plugin='PDBeditor', time=2.0)
+			LogEvent(self.workdir, jobid, 'FINISHED', exit=exit)
+		LogEvent(self.workdir, '5', 'FAILED', reason='refused')
+
+		metrics = ServerMetrics(self.workdir).Collect()
+		self.assertEqual(metrics['jobs'], {'queued':1, 'running':1, 'finished':1, 'failed':2})
+		self.assertEqual(metrics['duration']['count'], 2)
+		self.assertEqual(metrics['upload']['total'], 500)
+		self.assertEqual(metrics['steps']['PDBeditor']['count'], 2)
+		self.assertEqual(metrics['steps']['PDBeditor']['p50'], 2.0)
+
+		out = StringIO.StringIO()
+		ServerMetrics(self.workdir).Report(export='json', out=out)
+		self.assertEqual(json.loads(out.getvalue())['jobs']['failed'], 2)
+
+		out = StringIO.StringIO()
+		ServerMetrics(self.workdir).Report(out=out)
+		self.failUnless("finished: 1 failed: 2" in out.getvalue())
+
+class JobEventTest(support.ServerDir, unittest.TestCase):
+
+	def Run(self, exit):
+
+		self.RunDARTStub(exit)
+		server = WebServer(DARTDIR=self.DARTDIR, remote_env=['REMOTE_ADDR=127.0.0.1\n'])
+		result = server.RunDART({'Upload.xml':'submit', '1.upload':None})
+
+		return server.jobid, result
+
+	def testFinished(self):
+
+		jobid, result = self.Run(0)
+		self.assertEqual(JobStatus(self.DARTDIR, jobid)['state'], 'FINISHED')
+		self.assertEqual(ServerMetrics(self.DARTDIR).Collect()['jobs']['finished'], 1)
+
+	def testFailed(self):
+
+		"""A job that exits with an error is failed, its output is still published"""
+
+		jobid, result = self.Run(3)
+		status = JobStatus(self.DARTDIR, jobid)
+		self.assertEqual(status['state'], 'FAILED')
+		self.failUnless(os.path.isfile(os.path.join(self.DARTDIR, 'results', os.path.basename(status['download']))))
+		self.failUnless('error' in result)
+
+		metrics = ServerMetrics(self.DARTDIR).Collect()
+		self.assertEqual((metrics['jobs']['finished'], metrics['jobs']['failed']), (0, 1))
+
+if __name__ == '__main__':
+	unittest.main()
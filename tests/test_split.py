@@ -0,0 +1,61 @@
+"""Splitting and iterating ensemble files against the baseline output"""
+
+import os, shutil, unittest
+
+import support
+support.DARTPath()
+
+from PDBeditor import PDBeditor
+
+class SplitTest(support.WorkDir, unittest.TestCase):
+
+	def setUp(self):
+
+		support.WorkDir.setUp(self)
+		self.baseline = support.Baseline()
+		support.Join(PDBeditor, support.EXAMPLES, 'ensemble.pdb')
+
+	def assertSplit(self, models):
+
+		for model in models:
+			self.assertEqual(support.Digest('ensemble_%i.pdb' % model), self.baseline['split'][str(model)], model)
+
+	def testSplit(self):
+
+		PDBeditor().SplitPDB(ensemble='ensemble.pdb', mode='MODEL')
+		self.assertSplit(range(1, len(support.EXAMPLES)+1))
+
+	def testSplitIndexed(self):
+
+		"""A second split of selected models is read through the model index of the first"""
+
+		PDBeditor().SplitPDB(ensemble='ensemble.pdb', mode='MODEL')
+		for model in range(1, len(support.EXAMPLES)+1):
+			os.remove('ensemble_%i.pdb' % model)
+
+		PDBeditor().SplitPDB(ensemble='ensemble.pdb', mode='MODEL', models=[2,4])
+		self.assertSplit([2,4])
+		self.failIf(os.path.exists('ensemble_1.pdb'))
+
+	def testSplitSingle(self):
+
+		shutil.copy(support.EXAMPLES[0], 'single.pdb')
+		PDBeditor().SplitPDB(ensemble='single.pdb', mode='MODEL')
+		self.failIf(os.path.exists('single_1.pdb'))
+
+	def testIterModels(self):
+
+		numbers = []
+		for model, structure in PDBeditor().IterModels('ensemble.pdb'):
+			reference = PDBeditor()
+			reference.ReadPDB(support.EXAMPLES[model-1])
+			self.assertEqual(structure.atoms.resnum.tolist(), reference.atoms.resnum.tolist())
+			self.assertEqual(structure.atoms.coord.tolist(), reference.atoms.coord.tolist())
+			numbers.append(model)
+		self.assertEqual(numbers, range(1, len(support.EXAMPLES)+1))
+
+		numbers = [model for model, structure in PDBeditor().IterModels('ensemble.pdb', models=[3,5])]
+		self.assertEqual(numbers, [3,5])
+
+if __name__ == '__main__':
+	unittest.main()
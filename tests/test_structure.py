@@ -0,0 +1,78 @@
+"""Structure queries against the ATOM records of the example files"""
+
+import unittest
+
+import support
+support.DARTPath()
+
+from PDBeditor import PDBeditor
+from system.Structure import Structure, ReadXML
+
+def Records(example):
+
+	"""(chain, residue number, residue name, atom name, coordinates) of the ATOM and HETATM
+	   records of a PDB file"""
+
+	records = []
+	for line in open(example):
+		if line.startswith('ATOM  ') or line.startswith('HETATM'):
+			records.append((line[21].strip(), int(line[22:26]), line[17:21].strip(), line[12:16].strip(),
+			                [float(line[30:38]), float(line[38:46]), float(line[46:54])]))
+	return records
+
+def Read(example):
+
+	pdb = PDBeditor()
+	pdb.ReadPDB(example)
+
+	return pdb
+
+class StructureTest(support.WorkDir, unittest.TestCase):
+
+	def testQueries(self):
+
+		for example in support.EXAMPLES:
+			records = Records(example)
+			structure = Structure(Read(example))
+			self.assertEqual(len(structure), len(records))
+
+			"""A residue starts at every change of chain ID or residue number"""
+			starts = [record for n, record in enumerate(records) if n == 0 or not records[n-1][:2] == record[:2]]
+			self.assertEqual(structure.ResidueNames(), [record[2] for record in starts])
+			self.assertEqual(structure.ResidueNumbers(), [record[1] for record in starts])
+			self.assertEqual(structure.Chains(), sorted(set([record[0] for record in records]), key=[record[0] for record in records].index))
+
+			atoms = structure.Atoms(name="C1'")
+			self.assertEqual(structure.Coordinates(atoms).tolist(), [record[4] for record in records if record[3] == "C1'"])
+			self.assertEqual([starts[residue][1] for residue in structure.AtomResidues(atoms).tolist()],
+			                 [record[1] for record in records if record[3] == "C1'"])
+
+	def testSelection(self):
+
+		structure = Structure(Read(support.EXAMPLES[0]))
+		chain = structure.Chains()[0]
+		residues = structure.Residues(chain)[:3]
+
+		atoms = structure.Atoms(name='P', chain=chain, residues=residues)
+		self.failUnless(len(atoms) <= 3)
+		self.assertEqual(set(structure.AtomResidues(atoms).tolist()) <= set(residues.tolist()), True)
+		self.assertEqual(len(structure.Atoms(chain='no chain')), 0)
+
+	def testReadXML(self):
+
+		"""A structure read back from its DART XML representation"""
+
+		pdb = Read(support.EXAMPLES[0])
+		out = open('structure.xml', 'w')
+		pdb.WriteXML(out)
+		out.close()
+
+		structure = Structure(pdb)
+		read = ReadXML('structure.xml')
+		self.assertEqual(read.Chains(), structure.Chains())
+		self.assertEqual(read.ResidueNames(), structure.ResidueNames())
+		self.assertEqual(read.ResidueNumbers(), structure.ResidueNumbers())
+		self.assertEqual(read.Coordinates().round(3).tolist(), structure.Coordinates().round(3).tolist())
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,80 @@
+"""Storing, loading and evicting parsed structures in the structure cache"""
+
+import os, unittest
+
+import support
+support.DARTPath()
+
+from PDBeditor import PDBeditor
+from system.PDBio import ParsePDB
+from system.PDBbench import Compare
+from system.StructureCache import StructureCache
+
+class StructureCacheTest(support.WorkDir, unittest.TestCase):
+
+	def setUp(self):
+
+		support.WorkDir.setUp(self)
+		self.cache = StructureCache(cachedir=os.path.join(self.workdir, 'cache'))
+		self.data = [open(example).read() for example in support.EXAMPLES]
+
+	def testDisabled(self):
+
+		cache = StructureCache(cachedir='')
+		table, records = cache.Parse(self.data[0])
+		self.assertEqual(Compare(ParsePDB(self.data[0])[0], table), [])
+		self.assertEqual(cache.Entries(), [])
+
+	def testLoad(self):
+
+		"""A cached table equals the parsed one and is read from the cache the next time"""
+
+		key = self.cache.Key(self.data[0])
+		self.assertEqual(self.cache.Load(key), None)
+
+		self.cache.Parse(self.data[0])
+		self.assertEqual([entry[2] for entry in self.cache.Entries()], [key])
+
+		table, records = self.cache.Load(key)
+		reference = ParsePDB(self.data[0])
+		self.assertEqual(Compare(reference[0], table), [])
+		self.assertEqual(records, reference[1])
+		self.assertNotEqual(self.cache.Key(self.data[0]+"REMARK changed\n"), key)
+
+	def testReadPDB(self):
+
+		"""PDBeditor output of a cached structure equals the baseline"""
+
+		baseline = support.Baseline()
+		os.environ['DART_STRUCTURECACHE'] = self.cache.cachedir
+		try:
+			for repeat in range(2):
+				pdb = PDBeditor()
+				pdb.ReadPDBdata(self.data[0], cache=True)
+				pdb.WritePDB(file_out='write.pdb')
+				self.assertEqual(support.Digest('write.pdb'), baseline['read_write'][support.Name(support.EXAMPLES[0])])
+		finally:
+			del os.environ['DART_STRUCTURECACHE']
+		self.assertEqual(len(self.cache.Entries()), 1)
+
+	def testEvict(self):
+
+		"""The least recently used entries are removed when the cache is too large"""
+
+		keys = [self.cache.Key(data) for data in self.data[:3]]
+		for n in range(3):
+			self.cache.Parse(self.data[n])
+			os.utime(os.path.join(self.cache.cachedir, keys[n]+'.npy'), (1000+n, 1000+n))
+
+		"""Using the first entry makes the second the least recently used one"""
+		self.cache.Load(keys[0])
+		sizes = dict([(key, size) for used, size, key in self.cache.Entries()])
+		self.cache.maxsize = sizes[keys[0]]+sizes[keys[2]]
+		self.cache.Evict()
+		self.assertEqual(sorted([entry[2] for entry in self.cache.Entries()]), sorted([keys[0], keys[2]]))
+
+		self.cache.Clear()
+		self.assertEqual(self.cache.Entries(), [])
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,82 @@
+"""The process wide cache of parsed workflow models and rendered webforms"""
+
+import os, time, shutil, StringIO, unittest
+
+import support
+support.DARTPath()
+
+from system import DARTserver
+from system.DARTserver import WebServer, WORKFLOWCACHE
+
+class WorkflowCacheTest(support.WorkDir, unittest.TestCase):
+
+	def setUp(self):
+
+		support.WorkDir.setUp(self)
+		WORKFLOWCACHE.clear()
+		shutil.copy(os.path.join(support.TESTDIR, 'data', 'Upload.xml'), 'Upload.xml')
+		self.path = os.path.abspath('Upload.xml')
+
+	def tearDown(self):
+
+		WORKFLOWCACHE.clear()
+		support.WorkDir.tearDown(self)
+
+	def Form(self, formaction=DARTserver.FORMACTION):
+
+		server = WebServer()
+		server.formaction = formaction
+		form = StringIO.StringIO()
+		server.MakeWebForm(xml='Upload.xml', form=form)
+
+		return form.getvalue()
+
+	def testModel(self):
+
+		server = WebServer()
+		server.LoadWorkflow('Upload.xml')
+		entry = WORKFLOWCACHE[self.path]
+		self.assertEqual(server.metadata['workflowsequence'], {1:'FileSelector'})
+		self.assertEqual(server.optionmeta['1']['upload'], 'None')
+
+		"""Instances get a copy of the cached model"""
+		server.optionmeta['1']['upload'] = 'changed'
+		WebServer().LoadWorkflow('Upload.xml')
+		self.failUnless(WORKFLOWCACHE[self.path] is entry)
+		self.assertEqual(entry['model']['optionmeta']['1']['upload'], 'None')
+
+	def testChanged(self):
+
+		self.Form()
+		entry = WORKFLOWCACHE[self.path]
+
+		"""A new modification time with the same content keeps the entry"""
+		stamp = time.time()+10
+		os.utime('Upload.xml', (stamp, stamp))
+		self.Form()
+		self.failUnless(WORKFLOWCACHE[self.path] is entry)
+
+		"""Changed content is parsed and rendered again"""
+		content = open('Upload.xml').read().replace('Upload your file', 'Upload a structure')
+		open('Upload.xml', 'w').write(content)
+		os.utime('Upload.xml', (stamp+10, stamp+10))
+		self.failUnless('Upload a structure' in self.Form())
+		self.failIf(WORKFLOWCACHE[self.path] is entry)
+
+	def testRendered(self):
+
+		"""One rendering is kept per workflow, rendered again for another form action"""
+
+		form = self.Form('http://a.example.org/')
+		self.assertEqual(WORKFLOWCACHE[self.path]['html'], ('http://a.example.org/', form))
+		rendered = WORKFLOWCACHE[self.path]['html']
+		self.assertEqual(self.Form('http://a.example.org/'), form)
+		self.failUnless(WORKFLOWCACHE[self.path]['html'] is rendered)
+
+		other = self.Form('http://b.example.org/')
+		self.failUnless('action="http://b.example.org/"' in other)
+		self.assertEqual(WORKFLOWCACHE[self.path]['html'][0], 'http://b.example.org/')
+		self.assertEqual(len(WORKFLOWCACHE), 1)
+
+if __name__ == '__main__':
+	unittest.main()
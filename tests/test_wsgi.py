@@ -0,0 +1,52 @@
+"""The DART WSGI application: webforms, job submission, metrics and job status"""
+
+import os, json, unittest
+
+import support
+support.DARTPath()
+
+from system.DARTwsgi import DARTApplication
+
+class WSGITest(support.ServerDir, unittest.TestCase):
+
+	def setUp(self):
+
+		support.ServerDir.setUp(self)
+		self.application = DARTApplication(self.DARTDIR, formaction='http://dart.example.org/run?a=1&b=2')
+
+	def testWebForm(self):
+
+		"""The form is submitted to the configured action, never to the Host header"""
+
+		environ = {'REQUEST_METHOD':'GET', 'PATH_INFO':'/', 'QUERY_STRING':'workflow=Upload',
+		           'HTTP_HOST':'evil.example.org', 'REMOTE_ADDR':'127.0.0.1'}
+		status, headers, body = support.Get(self.application, environ=environ)
+		self.assertEqual(status, '200 OK')
+		self.failUnless('action="http://dart.example.org/run?a=1&amp;b=2"' in body)
+		self.failIf('evil' in body)
+		self.failUnless('name=1.upload' in body)
+
+		status, headers, body = support.Get(self.application, query='workflow=Missing')
+		self.assertEqual(status, '404 Not Found')
+
+	def testSubmit(self):
+
+		self.RunDARTStub(0)
+		status, headers, body = support.Post(self.application, {'Upload.xml':'submit'}, {'1.upload':('', '')})
+		self.assertEqual(status, '200 OK')
+		self.failUnless('.zip' in body)
+		self.assertEqual(os.getcwd(), self.workdir)
+
+		status, headers, body = support.Get(self.application, path='/status')
+		jobs = json.loads(body)
+		self.assertEqual([job['state'] for job in jobs], ['FINISHED'])
+
+		status, headers, body = support.Get(self.application, path='/status', query='job=%s' % jobs[0]['jobid'], remote='10.0.0.1')
+		self.assertEqual(status, '404 Not Found')
+
+		status, headers, body = support.Get(self.application, path='/metrics', query='format=json')
+		self.assertEqual(headers['Content-Type'], 'application/json')
+		self.assertEqual(json.loads(body)['jobs']['finished'], 1)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,58 @@
+"""XMLwriter Node serialization against the minidom serialization of the same tree"""
+
+import StringIO, unittest
+
+import support
+support.DARTPath()
+
+from PDBeditor import PDBeditor
+from system.XMLwriter import Node
+
+def Filelist():
+
+	"""A FrameWork file list with escaped text and attributes and an empty element"""
+
+	root = Node("container", ID="filelist")
+	plugin = Node("plugin", ID="FileSelector", nr="1", time="0.012")
+	plugin += Node("file", "/tmp/a & b.pdb")
+	plugin += Node("file", "<upload>")
+	root += plugin
+	root += Node("escaped", 'a < b & "c"', attr='x > y', quote='"')
+	root += Node("empty", flag="")
+
+	return root
+
+class XMLwriterTest(unittest.TestCase):
+
+	def assertSame(self, root):
+
+		self.assertEqual(root.xml(), root.dom().toprettyxml('  '))
+		self.assertEqual(root.xml('\t'), root.dom().toprettyxml('\t'))
+		self.assertEqual(root.rawxml(), root.dom().toxml())
+
+		out = StringIO.StringIO()
+		root.write(out)
+		self.assertEqual(out.getvalue(), root.xml())
+		out = StringIO.StringIO()
+		root.write(out, indent=None)
+		self.assertEqual(out.getvalue(), root.rawxml())
+
+	def testFilelist(self):
+
+		self.assertSame(Filelist())
+		self.assertSame(Node("single"))
+
+	def testStructure(self):
+
+		pdb = PDBeditor()
+		pdb.ReadPDB(support.EXAMPLES[0])
+		self.assertSame(pdb.PDB2XML())
+
+	def testSlots(self):
+
+		node = Node("file", "name.pdb")
+		self.failIf(hasattr(node, '__dict__'))
+		self.assertRaises(AttributeError, setattr, node, 'name', 'name.pdb')
+
+if __name__ == '__main__':
+	unittest.main()
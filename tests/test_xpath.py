@@ -0,0 +1,168 @@
+"""Xpath queries on ElementTree documents against the minidom implementation DOMXpath"""
+
+import os, glob, unittest
+
+import support
+support.DARTPath()
+
+from PDBeditor import PDBeditor
+from system.Xpath import Xpath, DOMXpath
+
+"""Mixed content: text around child elements and attribute values with white space"""
+MIXED = """<doc>
+ <item kind=" a " nr="1">first</item>
+ <item kind="b" nr="2">second <sub>child</sub> tail</item>
+ <group kind="a"><item kind="b" nr="3">third</item><item nr="4"/></group>
+</doc>"""
+
+"""Queries of the workflow files as used by FrameWork and the DART server"""
+WORKFLOW = [{1:{'element':'meta','attr':None},2:{'element':'name','attr':None}},
+            {1:{'element':'plugin','attr':{'job':'2'}},2:{'element':'parameters','attr':None},3:{'element':'option','attr':None}},
+            {1:{'element':'plugin','attr':None},2:{'element':'option','attr':{'type':['useplugin','inputfrom']}}},
+            {1:{'element':'plugin','attr':{'id':'FileSelector','job':'3'}},2:{'element':None,'attr':None}}]
+
+"""Queries of the DART XML export of a structure"""
+STRUCTURE = [{1:{'element':'chain','attr':None},2:{'element':'resid','attr':{'ID':['CYT','GUA']}},3:{'element':'atom','attr':{'ID':'P'}}},
+             {1:{'element':'resid','attr':{'nr':'3'}},2:{'element':'atom','attr':{'nr':['50','51','52']}}},
+             {1:{'element':'atom','attr':{'ID':["C1'","O4'"]}}}]
+
+MIXEDQUERIES = [{1:{'element':'item','attr':{'kind':'a'}}},
+                {1:{'element':'item','attr':{'kind':['a','b'],'nr':'4'}}},
+                {1:{'element':'group','attr':None},2:{'element':None,'attr':None}},
+                {1:{'element':None,'attr':None},2:{'element':'item','attr':{'nr':['1','3']}}}]
+
+def Results(xpath, query):
+
+	"""Number, element names and attributes of the selected nodes of every level"""
+
+	xpath.Evaluate(query=query)
+
+	results = []
+	for level in sorted(query.keys()):
+		nodes = xpath.nodeselection[level]
+		for node in nodes:
+			xpath.getElem(node=node, export='string')
+			xpath.getAttr(node=node, selection=['nr'], export='string')
+			xpath.getAttr(node=node, export='list')
+			if len(xpath.result) and type(xpath.result[-1]) == type([]):
+				"""Attribute order is not defined"""
+				pairs = xpath.result.pop()
+				xpath.result.append(sorted(zip(pairs[::2], pairs[1::2])))
+		results.append((len(nodes), xpath.result))
+		xpath.ClearResult()
+
+	return results
+
+def Data(xpath, query, level):
+
+	xpath.Evaluate(query=query)
+	for node in xpath.nodeselection[level]:
+		xpath.getData(node=node, export='list')
+	result = xpath.result
+	xpath.ClearResult()
+
+	return result
+
+class XpathTest(support.WorkDir, unittest.TestCase):
+
+	def assertSame(self, source, queries):
+
+		xpath = Xpath(source)
+		domxpath = DOMXpath(source)
+		for query in queries:
+			self.assertEqual(Results(xpath, query), Results(domxpath, query), query)
+
+	def testWorkflows(self):
+
+		workflows = glob.glob(os.path.join(support.DARTDIR, 'workflows', '*.xml'))
+		self.failUnless(workflows)
+		for workflow in workflows:
+			self.assertSame(workflow, WORKFLOW)
+
+			"""Text of the option elements, read from a node as FrameWork does"""
+			query = WORKFLOW[1]
+			self.assertEqual(Data(Xpath(workflow), query, 3), Data(DOMXpath(workflow), query, 3))
+			xpath = Xpath(workflow)
+			xpath.Evaluate(query=query)
+			option = DOMXpath(xpath.nodeselection[3][0].toxml())
+			option.Evaluate(query={1:{'element':'option','attr':None}})
+			self.assertEqual(len(option.nodeselection[1]), 1)
+
+	def testStructure(self):
+
+		pdb = PDBeditor()
+		pdb.ReadPDB(support.EXAMPLES[0])
+		out = open('structure.xml', 'w')
+		pdb.WriteXML(out)
+		out.close()
+
+		self.assertSame('structure.xml', STRUCTURE)
+		self.assertSame(open('structure.xml').read(), STRUCTURE)
+		self.failUnless(Results(Xpath('structure.xml'), STRUCTURE[0])[2][0] > 0)
+
+	def testMixed(self):
+
+		self.assertSame(MIXED, MIXEDQUERIES)
+		query = {1:{'element':'item','attr':{'nr':['1','3']}}}
+		self.assertEqual(Data(Xpath(MIXED), query, 1), Data(DOMXpath(MIXED), query, 1))
+
+	def testSource(self):
+
+		"""Queries on the stored nodes of an earlier query"""
+
+		for xpath in (Xpath(MIXED), DOMXpath(MIXED)):
+			xpath.Evaluate(query={1:{'element':'group','attr':None}})
+			group = xpath.nodeselection[1][0]
+			xpath.Evaluate(source=group, query={1:{'element':'item','attr':{'kind':'b'}}})
+			for node in xpath.nodeselection[1]:
+				xpath.getAttr(node=node, selection=['nr'], export='string')
+			self.assertEqual(xpath.result, [3])
+
+class IndexTest(unittest.TestCase):
+
+	def Numbers(self, xpath, query):
+
+		xpath.Evaluate(query=query)
+		for node in xpath.nodeselection[1]:
+			xpath.getAttr(node=node, selection=['nr'], export='string')
+		result = xpath.result
+		xpath.ClearResult()
+
+		return result
+
+	def testIndex(self):
+
+		"""The index of an element and attribute is build once for all values"""
+
+		xpath = Xpath(MIXED)
+		self.assertEqual(self.Numbers(xpath, {1:{'element':'item','attr':{'kind':'a'}}}), [1])
+		self.assertEqual(len(xpath.indexes), 1)
+		index = xpath.indexes.values()[0]
+
+		self.assertEqual(self.Numbers(xpath, {1:{'element':'item','attr':{'kind':'b'}}}), [2, 3])
+		self.assertEqual(self.Numbers(xpath, {1:{'element':'item','attr':{'kind':['b','a']}}}), [1, 2, 3])
+		self.failUnless(xpath.indexes.values()[0] is index)
+		self.assertEqual(self.Numbers(xpath, {1:{'element':'item','attr':{'kind':'c'}}}), [])
+
+	def testOrder(self):
+
+		"""Matches of several attributes in document order and once"""
+
+		xpath = Xpath(MIXED)
+		self.assertEqual(self.Numbers(xpath, {1:{'element':'item','attr':{'nr':['4','1'],'kind':'b'}}}), [1, 2, 3, 4])
+		self.assertEqual(len(xpath.indexes), 2)
+
+	def testScan(self):
+
+		"""Queries below the document level and unhashable values do not use the index"""
+
+		xpath = Xpath(MIXED)
+		self.assertEqual(self.Numbers(xpath, {1:{'element':'item','attr':{'kind':[['a'],'b']}}}), [2, 3])
+		xpath.Evaluate(query={1:{'element':'group','attr':None}})
+		group = xpath.nodeselection[1][0]
+		xpath.Evaluate(source=group, query={1:{'element':'item','attr':{'nr':'4'}}})
+		self.assertEqual(len(xpath.nodeselection[1]), 1)
+		self.assertEqual([key[1:] for key in xpath.indexes.keys()], [('item', 'kind')])
+
+if __name__ == '__main__':
+	unittest.main()